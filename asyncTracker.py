@@ -0,0 +1,405 @@
+import asyncio
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from motorDispatcher import MIN_RETRY_DELAY
+from motorTransport import (DEFAULT_UDP_PORT, UDP_ACK_MAGIC, UDP_COMMAND_MAGIC, UDP_PACKET,
+                            clamp_speed, split_host_port)
+
+
+class AsyncHttpTransport:
+    """
+    Query-string protocol over one keep-alive asyncio stream.
+    Reconnects when the ESP32 closes the connection.
+    """
+
+    name = 'http'
+
+    def __init__(self, esp32_ip, timeout=0.3):
+        self.host, self.port = split_host_port(esp32_ip, 80)
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def _request(self, path):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f"GET {path} HTTP/1.1\r\nHost: {self.host}\r\nConnection: keep-alive\r\n\r\n".encode())
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        length, keep_alive = 0, True
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode(errors='ignore').partition(':')
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == 'content-length':
+                length = int(value)
+            elif name == 'connection' and value == 'close':
+                keep_alive = False
+        if length:
+            await self.reader.readexactly(length)
+        if not keep_alive:
+            await self.close()
+        return status_line.split(b' ')[1:2] == [b'200']
+
+    async def send(self, speed_a, speed_b):
+        """Send both motor speeds. Returns True if the ESP32 accepted them"""
+        try:
+            return await asyncio.wait_for(self._send(speed_a, speed_b), self.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            await self.close()
+            return False
+
+    async def _send(self, speed_a, speed_b):
+        ok_a = await self._request(f"/control?motor=A&speed={clamp_speed(speed_a)}")
+        ok_b = await self._request(f"/control?motor=B&speed={clamp_speed(speed_b)}")
+        return ok_a and ok_b
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+            self.reader = None
+
+
+class _AckProtocol(asyncio.DatagramProtocol):
+    def __init__(self, transport_owner):
+        self.owner = transport_owner
+
+    def datagram_received(self, data, address):
+        if len(data) != UDP_PACKET.size:
+            return
+        magic, seq, _, _ = UDP_PACKET.unpack(data)
+        waiter = self.owner.ack_waiters.pop(seq, None)
+        if magic == UDP_ACK_MAGIC and waiter is not None and not waiter.done():
+            waiter.set_result(True)
+
+
+class AsyncUdpTransport:
+    """Sequenced binary datagrams (same protocol as UdpTransport) on an asyncio endpoint"""
+
+    name = 'udp'
+
+    def __init__(self, esp32_ip, port=DEFAULT_UDP_PORT, timeout=0.3, wait_ack=True):
+        host, _ = split_host_port(esp32_ip, port)
+        self.address = (host, port)
+        self.timeout = timeout
+        self.wait_ack = wait_ack
+        self.seq = 0
+        self.endpoint = None
+        self.ack_waiters = {}  # seq -> Future
+
+    async def send(self, speed_a, speed_b):
+        """Send both motor speeds. Returns True if sent (and ACKed when wait_ack is set)"""
+        loop = asyncio.get_running_loop()
+        if self.endpoint is None:
+            self.endpoint, _ = await loop.create_datagram_endpoint(
+                lambda: _AckProtocol(self), remote_addr=self.address)
+
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        seq = self.seq
+        waiter = loop.create_future()
+        if self.wait_ack:
+            self.ack_waiters[seq] = waiter
+        self.endpoint.sendto(UDP_PACKET.pack(UDP_COMMAND_MAGIC, seq, clamp_speed(speed_a), clamp_speed(speed_b)))
+        if not self.wait_ack:
+            return True
+        try:
+            return await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.ack_waiters.pop(seq, None)
+
+    async def close(self):
+        if self.endpoint is not None:
+            self.endpoint.close()
+            self.endpoint = None
+
+
+ASYNC_TRANSPORTS = {
+    'http': AsyncHttpTransport,
+    'udp': AsyncUdpTransport,
+}
+
+
+class AsyncMotorController:
+    """
+    asyncio counterpart of MotorCommandDispatcher.
+
+    submit() stores the newest speed and wakes the sender task; the task
+    sends it, or re-sends the last speed as a heartbeat when nothing new
+    arrived within heartbeat_interval. Failed sends are retried with the
+    dispatcher's backoff. stop() cancels the task and always sends a final 0.
+    """
+
+    def __init__(self, transport, heartbeat_interval=0.2):
+        self.transport = transport
+        self.heartbeat_interval = heartbeat_interval
+        self._pending_speed = None
+        self._last_sent_speed = 0
+        self._retry_delay = 0.0  # Current backoff after failed sends (0 = last send succeeded)
+        self._retry_time = 0.0  # No retry before this time.monotonic()
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+        self.commands_sent = 0
+        self.commands_failed = 0
+        self.heartbeats_sent = 0
+        self.last_latency = 0.0
+
+    def start(self):
+        self._task = asyncio.create_task(self._send_loop(), name='motor-sender')
+        return self
+
+    def submit(self, speed):
+        self._pending_speed = int(speed)
+        self._wakeup.set()
+
+    async def _send_loop(self):
+        while True:
+            backoff = self._retry_time - time.monotonic()
+            if backoff > 0:
+                # Retrying a failed send: speeds submitted meanwhile wait for the retry
+                await asyncio.sleep(backoff)
+            elif self._pending_speed is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wakeup.clear()
+
+            heartbeat = self._pending_speed is None
+            speed = self._last_sent_speed if heartbeat else self._pending_speed
+            self._pending_speed = None
+            await self._send(speed, heartbeat)
+
+    async def _send(self, speed, heartbeat=False):
+        start = time.monotonic()
+        ok = await self.transport.send(speed, speed)
+        if ok:
+            self.last_latency = time.monotonic() - start
+            self._last_sent_speed = speed
+            self.commands_sent += 1
+            if heartbeat:
+                self.heartbeats_sent += 1
+            self._retry_delay = 0.0
+            self._retry_time = 0.0
+        else:
+            self.commands_failed += 1
+            # Retry after a backoff (doubling per failure, up to heartbeat_interval)
+            self._retry_delay = min(max(2 * self._retry_delay, MIN_RETRY_DELAY), self.heartbeat_interval)
+            self._retry_time = time.monotonic() + self._retry_delay
+            if self._pending_speed is None:
+                self._pending_speed = speed
+        return ok
+
+    async def stop(self):
+        """Cancel the sender and send a final STOP (retried once if it fails)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if not await self._send(0):
+            await self._send(0)
+        await self.transport.close()
+
+
+class AsyncTrackerRuntime:
+    """
+    Tracker runtime on one asyncio loop.
+
+    - capture: frames from the LatestFrameGrabber are awaited in a thread
+      executor; the newest one is handed to the vision task
+    - vision: track_blob runs in a second executor thread for each new frame
+    - control: a scheduled timer submits the latest speed every command_interval
+    - motor I/O: AsyncMotorController over an asyncio HTTP stream or UDP endpoint
+    - UI (optional): a cooperative task pumps cv2.waitKey and Tk
+    Shutdown (key, signal or error) always ends with a STOP command.
+    """
+
+    def __init__(self, tracker, grabber, esp32_ip, transport='http', headless=False, ui_interval=1 / 60):
+        self.tracker = tracker
+        self.grabber = grabber
+        self.esp32_ip = esp32_ip
+        self.transport_kind = transport
+        self.headless = headless
+        self.ui_interval = ui_interval
+
+        self.stop_event = None
+        self.frame_ready = None
+        self.frame = None
+        self.frame_time = 0.0
+        self.frames_dropped = 0
+        self.result = (None, 0, 0, "STOP")  # center, area, speed, command
+        self.result_frame = None
+        self.emergency_stopped = False
+        self.motor = None
+
+    async def _capture(self, executor):
+        loop = asyncio.get_running_loop()
+        while not self.stop_event.is_set():
+            ret, frame, frame_time, dropped = await loop.run_in_executor(executor, self.grabber.read, 0.25)
+            if not ret:
+                continue
+            self.frame, self.frame_time, self.frames_dropped = frame, frame_time, dropped
+            self.frame_ready.set()
+
+    def _process(self, frame, frame_time):
+        tracker = self.tracker
+        tracker.set_frame_info(frame_time, self.frames_dropped)
+        center, area = tracker.track_blob(frame)
+        speed, command = tracker.calculate_motor_speed(tracker.predict_target(center), frame.shape)
+        return center, area, speed, command
+
+    async def _vision(self, executor):
+        loop = asyncio.get_running_loop()
+        while not self.stop_event.is_set():
+            await self.frame_ready.wait()
+            self.frame_ready.clear()
+            frame, frame_time = self.frame, self.frame_time
+            self.result = await loop.run_in_executor(executor, self._process, frame, frame_time)
+            self.result_frame = frame
+
+    async def _control_timer(self):
+        loop = asyncio.get_running_loop()
+        interval = self.tracker.command_interval
+        next_tick = loop.time()
+        while not self.stop_event.is_set():
+            speed = 0 if self.emergency_stopped else self.result[2]
+            self.motor.submit(speed)
+            # Fixed-rate schedule: sleep to the next tick, not for a full interval
+            next_tick += interval
+            delay = next_tick - loop.time()
+            if delay < 0:
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    async def _ui(self):
+        tracker = self.tracker
+        cv2.namedWindow('Autonomous Blob Tracker')
+        last_frame = None
+        while not self.stop_event.is_set():
+            if self.result_frame is not None and self.result_frame is not last_frame:
+                last_frame = self.result_frame
+                center, area, speed, command = self.result
+                if self.emergency_stopped:
+                    command = "STOPPED - Press SPACE to resume"
+                frame = tracker.draw_overlay(self.result_frame.copy(), center, area, command, speed)
+                cv2.imshow('Autonomous Blob Tracker', frame)
+
+            key = cv2.waitKey(1) & 0xFF
+            if tracker.root is not None:
+                try:
+                    tracker.root.update()
+                except Exception:
+                    pass
+
+            if key == ord('q'):
+                print("\nStopping motors and exiting...")
+                self.stop_event.set()
+            elif key == ord(' '):
+                self.emergency_stopped = not self.emergency_stopped
+                print("\n⚠️ EMERGENCY STOP!" if self.emergency_stopped else "\n▶ Tracking resumed")
+                if self.emergency_stopped:
+                    self.motor.submit(0)
+            elif key == ord('a'):
+                tracker.open_hsv_finder()
+            await asyncio.sleep(self.ui_interval)
+        cv2.destroyAllWindows()
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        self.stop_event = asyncio.Event()
+        self.frame_ready = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not available on this platform / thread
+
+        transport = ASYNC_TRANSPORTS[self.transport_kind](self.esp32_ip)
+        self.motor = AsyncMotorController(transport).start()
+
+        capture_executor = ThreadPoolExecutor(1, thread_name_prefix='capture')
+        vision_executor = ThreadPoolExecutor(1, thread_name_prefix='vision')
+        tasks = [
+            asyncio.create_task(self._capture(capture_executor), name='capture'),
+            asyncio.create_task(self._vision(vision_executor), name='vision'),
+            asyncio.create_task(self._control_timer(), name='control'),
+        ]
+        if not self.headless:
+            tasks.append(asyncio.create_task(self._ui(), name='ui'))
+
+        try:
+            stop_waiter = asyncio.create_task(self.stop_event.wait())
+            done, _ = await asyncio.wait(tasks + [stop_waiter], return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task is not stop_waiter and task.exception() is not None:
+                    print(f"❌ Task {task.get_name()} failed: {task.exception()!r}")
+        finally:
+            self.stop_event.set()
+            self.frame_ready.set()
+            for task in tasks + [stop_waiter]:
+                task.cancel()
+            await asyncio.gather(*tasks, stop_waiter, return_exceptions=True)
+            # Guaranteed final STOP, whatever ended the run
+            await self.motor.stop()
+            capture_executor.shutdown(wait=True)
+            vision_executor.shutdown(wait=True)
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.remove_signal_handler(signum)
+                except (NotImplementedError, RuntimeError):
+                    pass
+        print(f"✓ Motors stopped ({self.motor.commands_sent} commands, {self.motor.heartbeats_sent} heartbeats, "
+              f"{self.motor.commands_failed} failed, {self.frames_dropped} frames dropped)")
+
+
+def main_async(args):
+    """Entry point for --runtime asyncio"""
+    from blobDetection import AutonomousBlobTracker, open_camera, setup_profile
+    from frameGrabber import LatestFrameGrabber
+
+    esp32_ip = args.ip or "192.168.4.1"
+    print(f"AUTONOMOUS BLOB TRACKER (asyncio) - ESP32 {esp32_ip} via {args.transport}")
+
+    root = None
+    if not args.headless:
+        from tkinter import Tk
+        root = Tk()
+        root.withdraw()
+
+    # Commands go through the async controller, not the threaded dispatcher
+    tracker = AutonomousBlobTracker(esp32_ip, root, transport=args.transport, connect=False)
+    tracker.set_motion_model(None if args.predict == 'none' else args.predict)
+    setup_profile(tracker, args)
+    if args.control_rate > 0:
+        # The control timer already runs at a fixed rate; PI/PID terms need the threaded runtime
+        tracker.command_interval = 1.0 / args.control_rate
+    cap = open_camera(args.camera, args.width, args.height)
+    if cap is None:
+        print("❌ Error: Could not open camera")
+        return
+    grabber = LatestFrameGrabber(cap, args.vision_fps).start()
+    tracker.frame_source = grabber
+    try:
+        asyncio.run(AsyncTrackerRuntime(tracker, grabber, esp32_ip, args.transport, args.headless).run())
+    finally:
+        grabber.release()
+        if root is not None:
+            try:
+                root.destroy()
+            except Exception:
+                pass
+        print("✓ System shutdown complete")
@@ -0,0 +1,153 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from colorLut import hsv_in_range
+
+
+class HistogramBackProjector:
+    """
+    Detects a target by its learned hue/saturation distribution.
+
+    learn() builds a 2D H-S histogram from a sample of the target; pixels
+    are then scored by back-projection (how common their H-S bin was in
+    the sample) and thresholded. Brightness is ignored apart from the
+    min_value/min_saturation cut-offs, so the model holds up under
+    lighting changes that would push the target out of a fixed HSV box.
+    """
+
+    def __init__(self, hue_bins=30, saturation_bins=32, threshold=40,
+                 min_saturation=40, min_value=40, smoothing=5):
+        self.hue_bins = hue_bins
+        self.saturation_bins = saturation_bins
+        self.threshold = threshold  # Back-projection score (0-255) a pixel needs
+        self.min_saturation = min_saturation  # Hue is meaningless for grey / dark pixels
+        self.min_value = min_value
+        self.smoothing = smoothing  # Averaging kernel on the score map (0 = off)
+        self.histogram = None
+
+    def is_trained(self):
+        return self.histogram is not None
+
+    def _valid_mask(self, hsv):
+        return cv2.inRange(hsv, (0, self.min_saturation, self.min_value), (180, 255, 255))
+
+    def learn(self, frame, roi=None, mask=None):
+        """
+        Learn the target's colour from frame inside roi (x, y, w, h) and/or mask.
+        Returns the number of sample pixels used.
+        """
+        if roi is not None:
+            x, y, w, h = roi
+            frame = frame[y:y + h, x:x + w]
+            if mask is not None:
+                mask = mask[y:y + h, x:x + w]
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        sample_mask = self._valid_mask(hsv)
+        if mask is not None:
+            sample_mask = cv2.bitwise_and(sample_mask, mask)
+
+        samples = cv2.countNonZero(sample_mask)
+        if samples == 0:
+            return 0
+        histogram = cv2.calcHist([hsv], [0, 1], sample_mask, [self.hue_bins, self.saturation_bins],
+                                 [0, 180, 0, 256])
+        cv2.normalize(histogram, histogram, 0, 255, cv2.NORM_MINMAX)
+        self.histogram = histogram
+        return samples
+
+    def score(self, frame):
+        """Back-projection score map (uint8, 255 = most target-like)"""
+        if self.histogram is None:
+            raise RuntimeError("No colour model - call learn() first")
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        scores = cv2.calcBackProject([hsv], [0, 1], self.histogram, [0, 180, 0, 256], 1)
+        scores &= self._valid_mask(hsv)
+        if self.smoothing > 1:
+            scores = cv2.blur(scores, (self.smoothing, self.smoothing))
+        return scores
+
+    def classify(self, frame):
+        """Return a uint8 mask (255 = target) like cv2.inRange"""
+        _, mask = cv2.threshold(self.score(frame), self.threshold, 255, cv2.THRESH_BINARY)
+        return mask
+
+
+def make_test_scene(width=640, height=480, seed=0):
+    """
+    Synthetic scene for comparing detectors: a target lit by a strong
+    gradient, plus distractors of nearby hues and sensor noise.
+    Returns (frame, ground-truth target mask)
+    """
+    rng = np.random.default_rng(seed)
+    hsv = np.zeros((height, width, 3), np.uint8)
+    hsv[..., 0] = rng.integers(0, 180, (height, width))
+    hsv[..., 1] = rng.integers(0, 90, (height, width))
+    hsv[..., 2] = rng.integers(40, 200, (height, width))
+
+    truth = np.zeros((height, width), np.uint8)
+    cv2.circle(truth, (width // 3, height // 2), height // 6, 255, -1)
+    target = truth > 0
+    hsv[..., 0][target] = rng.integers(48, 56, np.count_nonzero(target))
+    hsv[..., 1][target] = rng.integers(110, 200, np.count_nonzero(target))
+    # Lighting gradient across the target: dim on the left, bright on the right
+    gradient = np.tile(np.linspace(70, 255, width).astype(np.uint8), (height, 1))
+    hsv[..., 2][target] = gradient[target]
+
+    # Distractors: same brightness range, hues either side of the target
+    for i, hue in enumerate((32, 70, 90)):
+        cv2.rectangle(hsv, (width // 2 + i * 60, 40), (width // 2 + i * 60 + 40, height - 40),
+                      (hue, 120, 180), -1)
+
+    frame = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
+    noise = rng.normal(0, 4, frame.shape)
+    frame = np.clip(frame.astype(np.int16) + noise.astype(np.int16), 0, 255).astype(np.uint8)
+    return frame, truth
+
+
+def benchmark(width=640, height=480, iterations=200, lower_hsv=(34, 64, 143), upper_hsv=(66, 146, 255)):
+    """Cost per frame and detection quality of inRange vs back-projection"""
+    frame, truth = make_test_scene(width, height)
+    target = truth > 0
+    background = ~target
+
+    projector = HistogramBackProjector()
+    # Learn from the central half of the target only, as a user selection would be
+    x, y, w, h = cv2.boundingRect(truth)
+    projector.learn(frame, (x + w // 4, y + h // 4, w // 2, h // 2))
+
+    # A box wide enough for the whole lit range of the target
+    wide_lower, wide_upper = (30, 64, 60), (72, 255, 255)
+    methods = [
+        (f"inRange {list(lower_hsv)}..{list(upper_hsv)}",
+         lambda f: hsv_in_range(cv2.cvtColor(f, cv2.COLOR_BGR2HSV), lower_hsv, upper_hsv)),
+        (f"inRange {list(wide_lower)}..{list(wide_upper)}",
+         lambda f: hsv_in_range(cv2.cvtColor(f, cv2.COLOR_BGR2HSV), wide_lower, wide_upper)),
+        ("back-projection", projector.classify),
+    ]
+
+    print(f"Frame {width}x{height}, OpenCV threads: {cv2.getNumThreads()}")
+    print(f"{'Method':<40}{'ms/frame':>10}{'target hit':>12}{'false pos':>11}")
+    for name, fn in methods:
+        mask = fn(frame) > 0
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn(frame)
+        per_frame = (time.perf_counter() - start) / iterations * 1000
+        hit_rate = np.count_nonzero(mask & target) / np.count_nonzero(target)
+        false_positive_rate = np.count_nonzero(mask & background) / np.count_nonzero(background)
+        print(f"{name:<40}{per_frame:>10.3f}{hit_rate * 100:>11.1f}%{false_positive_rate * 100:>10.2f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark histogram back-projection against inRange')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--single-thread', action='store_true', help='Run OpenCV single-threaded')
+    args = parser.parse_args()
+    if args.single_thread:
+        cv2.setNumThreads(1)
+    benchmark(args.width, args.height, args.iterations)
@@ -0,0 +1,236 @@
+import argparse
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from calibrationProfiles import DEFAULT_PROFILE_PATH, ProfileStore
+
+# Tracker attributes besides get_settings() that change what detection finds
+DETECTION_SETTINGS = ('pyramid_scale', 'color_classifier', 'target_policy')
+
+# Shards per worker: smaller shards even out uneven frames, larger ones seek the video less often
+SHARDS_PER_WORKER = 4
+
+# Per-process state set up by _init_worker: the tracker and the frame source
+_worker = {}
+
+
+def detection_settings(tracker):
+    """Everything a worker tracker needs to detect exactly like tracker"""
+    settings = tracker.get_settings()
+    for key in DETECTION_SETTINGS:
+        settings[key] = getattr(tracker, key)
+    return settings
+
+
+def _init_worker(settings, source):
+    """
+    Pool initializer: a detection-only tracker plus the frame source, which is
+    ('video', path), ('shm', name, shape, dtype) or ('stack', frames) in-process.
+    """
+    from blobDetection import AutonomousBlobTracker
+
+    # One core per process: keep OpenCV from spawning its own thread pool on top
+    cv2.setNumThreads(1)
+    tracker = AutonomousBlobTracker(connect=False)
+    tracker.apply_settings(settings)
+    _worker['tracker'] = tracker
+    if source[0] == 'video':
+        _worker['video'] = source[1]
+    elif source[0] == 'shm':
+        _, name, shape, dtype = source
+        _worker['shm'] = shared_memory.SharedMemory(name=name)
+        _worker['frames'] = np.ndarray(shape, dtype, _worker['shm'].buf)
+    else:
+        _worker['frames'] = source[1]
+
+
+def _release_worker():
+    _worker.pop('frames', None)  # Drop the view before closing the mapping
+    shm = _worker.pop('shm', None)
+    if shm is not None:
+        shm.close()
+    _worker.clear()
+
+
+def read_video(path, start=0, stop=None):
+    """Frames start..stop-1 of a video file (stop=None: to the end). Yields (index, frame)"""
+    cap = cv2.VideoCapture(path)
+    try:
+        if start > 0:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+        index = start
+        while stop is None or index < stop:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield index, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def detect_frame(tracker, frame):
+    """
+    (center, area, speed) for one frame on its own: a full-frame search
+    (detect_pyramid -> get_average_position) with no ROI or motion state
+    from earlier frames, and the speed calculate_motor_speed would command.
+    """
+    center, area = tracker.detect_pyramid(frame)
+    speed, _ = tracker.calculate_motor_speed(center, frame.shape)
+    return center, area, speed
+
+
+def _detect_shard(shard):
+    """Worker task: detect frames start..stop-1. Returns (indices, centers, areas, speeds) arrays"""
+    start, stop = shard
+    tracker = _worker['tracker']
+    if 'frames' in _worker:
+        frames = ((i, _worker['frames'][i]) for i in range(start, stop))
+    else:
+        frames = read_video(_worker['video'], start, stop)
+
+    indices, centers, areas, speeds = [], [], [], []
+    for index, frame in frames:
+        center, area, speed = detect_frame(tracker, frame)
+        indices.append(index)
+        centers.append(center if center is not None else (-1, -1))
+        areas.append(area)
+        speeds.append(speed)
+    return (np.array(indices, np.int32), np.array(centers, np.int32).reshape(-1, 2),
+            np.array(areas, np.int32), np.array(speeds, np.int16))
+
+
+def make_shards(frame_count, workers, shards_per_worker=SHARDS_PER_WORKER):
+    """Split frames 0..frame_count-1 into contiguous (start, stop) ranges"""
+    count = max(1, min(frame_count, workers * shards_per_worker))
+    bounds = np.linspace(0, frame_count, count + 1).astype(int)
+    return [(int(start), int(stop)) for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+
+
+def _run_shards(settings, source, shards, workers):
+    """Detect every shard (in a spawn pool if workers > 1) and join the results in frame order"""
+    if workers <= 1:
+        _init_worker(settings, source)
+        try:
+            parts = [_detect_shard(shard) for shard in shards]
+        finally:
+            _release_worker()
+    else:
+        ctx = mp.get_context('spawn')
+        with ctx.Pool(workers, initializer=_init_worker, initargs=(settings, source)) as pool:
+            parts = pool.map(_detect_shard, shards, chunksize=1)
+
+    return {
+        'frame': np.concatenate([part[0] for part in parts]),
+        'center': np.concatenate([part[1] for part in parts]),  # (x, y), -1 where no target was found
+        'area': np.concatenate([part[2] for part in parts]),  # 0 where no target was found
+        'speed': np.concatenate([part[3] for part in parts]),  # Signed motor speed, 0 = STOP
+    }
+
+
+def _worker_count(workers, frame_count):
+    return max(1, min(workers or os.cpu_count() or 1, frame_count))
+
+
+def detect_stack(frames, settings, workers=None):
+    """
+    Detect the target in every frame of an N x H x W x 3 stack.
+
+    settings come from detection_settings(tracker). Frames are detected
+    independently, so results do not depend on how they are sharded. With
+    more than one worker the stack is copied once into shared memory that
+    every worker maps, rather than pickled to each of them.
+    Returns a dict of per-frame arrays: frame, center (N x 2), area, speed.
+    """
+    frames = np.asarray(frames)
+    if frames.ndim != 4 or frames.shape[3] != 3:
+        raise ValueError(f"Expected an N x H x W x 3 frame stack, got shape {frames.shape}")
+    workers = _worker_count(workers, len(frames))
+    shards = make_shards(len(frames), workers)
+    if workers == 1:
+        return _run_shards(settings, ('stack', frames), shards, workers)
+
+    shm = shared_memory.SharedMemory(create=True, size=frames.nbytes)
+    try:
+        np.ndarray(frames.shape, frames.dtype, shm.buf)[:] = frames
+        return _run_shards(settings, ('shm', shm.name, frames.shape, frames.dtype.str), shards, workers)
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def detect_video(path, settings, workers=None):
+    """
+    Detect the target in every frame of a video file, each worker decoding
+    its own frame ranges (seeking with CAP_PROP_POS_FRAMES).
+
+    The frame count comes from the container; the last shard reads on to
+    the end of the file, and the 'frame' array maps each result row to
+    its source frame in case the container's count was off.
+    Returns a dict of per-frame arrays: frame, center (N x 2), area, speed.
+    """
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"Could not open video {path}")
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+
+    workers = _worker_count(workers, frame_count)
+    shards = make_shards(frame_count, workers) if frame_count > 0 else [(0, 0)]
+    shards[-1] = (shards[-1][0], None)
+    return _run_shards(settings, ('video', path), shards, workers)
+
+
+def summarize_results(results, elapsed):
+    found = results['area'] > 0
+    frames = len(results['frame'])
+    return {
+        'frames': frames,
+        'fps': frames / elapsed if elapsed > 0 else 0.0,
+        'detected': int(found.sum()),
+        'moving': int(np.count_nonzero(results['speed'])),
+        'mean_area': float(results['area'][found].mean()) if found.any() else 0.0,
+    }
+
+
+def main():
+    from blobDetection import AutonomousBlobTracker
+
+    parser = argparse.ArgumentParser(description='Offline blob detection over a video file, sharded across processes')
+    parser.add_argument('video', help='Video file to analyse')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per core)')
+    parser.add_argument('--output', default=None, help='Save the per-frame arrays to this .npz file')
+    parser.add_argument('--profile', default=None, help='Calibration profile to detect with (default: the last one used)')
+    parser.add_argument('--profiles-file', default=DEFAULT_PROFILE_PATH, help='Calibration profile store (JSON)')
+    parser.add_argument('--pyramid', type=int, default=1, help='Pyramid scale (1, 2 or 4)')
+    parser.add_argument('--classifier', default='hsv', choices=['hsv', 'lut'])
+    args = parser.parse_args()
+
+    tracker = AutonomousBlobTracker(connect=False)
+    store = ProfileStore(args.profiles_file)
+    if tracker.load_profile(store, args.profile):
+        print(f"✓ Loaded calibration profile '{tracker.profile_name}'")
+    tracker.pyramid_scale = args.pyramid
+    tracker.color_classifier = args.classifier
+
+    workers = args.workers or os.cpu_count() or 1
+    print(f"Analysing {args.video} with {workers} worker(s)...")
+    start = time.perf_counter()
+    results = detect_video(args.video, detection_settings(tracker), workers)
+    summary = summarize_results(results, time.perf_counter() - start)
+
+    print(f"Processed {summary['frames']} frames at {summary['fps']:.0f} fps")
+    print(f"Target found in {summary['detected']} frames (mean area {summary['mean_area']:.0f}px), "
+          f"motors commanded in {summary['moving']}")
+    if args.output:
+        np.savez_compressed(args.output, **results)
+        print(f"✓ Saved per-frame results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
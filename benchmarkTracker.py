@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+from blobDetection import AutonomousBlobTracker
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+# Colour inside the tracker's default HSV range
+TARGET_HSV = (50, 100, 200)
+
+RESOLUTIONS = [(320, 240), (640, 480), (1280, 720), (1920, 1080)]
+BLOB_FRACTIONS = {'small': 0.03, 'large': 0.12}  # Blob radius as a fraction of frame width
+NOISE_LEVELS = {'clean': 0, 'noisy': 8}
+
+
+def make_synthetic_frame(width, height, blob_radius, noise=0, hsv_color=TARGET_HSV, center=None, seed=0):
+    """Dark textured background with one filled blob of hsv_color and optional Gaussian noise"""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 60, (height, width, 3), dtype=np.uint8)
+    if center is None:
+        center = (width // 3, height * 2 // 3)
+    bgr = cv2.cvtColor(np.uint8([[hsv_color]]), cv2.COLOR_HSV2BGR)[0, 0]
+    cv2.circle(frame, center, int(blob_radius), tuple(int(c) for c in bgr), -1)
+    if noise:
+        noisy = frame.astype(np.int16) + rng.normal(0, noise, frame.shape).astype(np.int16)
+        frame = np.clip(noisy, 0, 255).astype(np.uint8)
+    return frame
+
+
+def make_tracker():
+    """Tracker with no ESP32 connection and limits wide enough for every scenario"""
+    tracker = AutonomousBlobTracker(connect=False)
+    tracker.min_blob_area = 100
+    tracker.max_blob_area = 10 ** 8
+    return tracker
+
+
+def time_calls(fn, iterations, warmup=5):
+    """Per-call latencies (seconds) for fn()"""
+    for _ in range(warmup):
+        fn()
+    latencies = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies[i] = time.perf_counter() - start
+    return latencies
+
+
+def measure_allocations(fn, iterations=5):
+    """Average peak bytes allocated (as seen by tracemalloc) during one call"""
+    fn()
+    tracemalloc.start()
+    try:
+        peaks = []
+        for _ in range(iterations):
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - baseline)
+    finally:
+        tracemalloc.stop()
+    return float(np.mean(peaks))
+
+
+def build_cases(tracker, frame):
+    """Benchmarked calls for one synthetic frame"""
+    # detect_blob returns a reused buffer: keep a copy for the get_average_position case
+    mask = tracker.detect_blob(frame).copy()
+    center, area = tracker.get_average_position(mask)
+    speed, command = tracker.calculate_motor_speed(center, frame.shape)
+    overlay_frame = frame.copy()
+
+    def full_loop():
+        m = tracker.detect_blob(frame)
+        c, a = tracker.get_average_position(m)
+        s, cmd = tracker.calculate_motor_speed(c, frame.shape)
+        tracker.draw_overlay(overlay_frame, c, a, cmd, s)
+
+    def detect_and_centroid():
+        # Steady-state detection path: runs entirely in the tracker's DetectionContext
+        return tracker.get_average_position(tracker.detect_blob(frame))
+
+    def roi_track():
+        # Locked on the target: every call searches the ROI window
+        tracker.last_position = center
+        tracker.last_area = area
+        tracker.frames_lost = 0
+        tracker.last_velocity = (0, 0)
+        tracker.track_blob(frame)
+
+    return {
+        'detect_blob': lambda: tracker.detect_blob(frame),
+        'get_average_position': lambda: tracker.get_average_position(mask),
+        'calculate_motor_speed': lambda: tracker.calculate_motor_speed(center, frame.shape),
+        'draw_overlay': lambda: tracker.draw_overlay(overlay_frame, center, area, command, speed),
+        'detect_and_centroid': detect_and_centroid,
+        'track_blob_roi': roi_track,
+        'full_loop': full_loop,
+    }
+
+
+def run_suite(iterations=100, resolutions=RESOLUTIONS, quick=False):
+    """Run every scenario. Returns {key: result dict}"""
+    tracker = make_tracker()
+    results = {}
+    blob_sizes = {'small': BLOB_FRACTIONS['small']} if quick else BLOB_FRACTIONS
+    noise_levels = {'noisy': NOISE_LEVELS['noisy']} if quick else NOISE_LEVELS
+
+    for width, height in resolutions:
+        for size_name, fraction in blob_sizes.items():
+            for noise_name, noise in noise_levels.items():
+                frame = make_synthetic_frame(width, height, width * fraction, noise)
+                scenario = f"{width}x{height}/{size_name}/{noise_name}"
+                for name, fn in build_cases(tracker, frame).items():
+                    latencies = time_calls(fn, iterations)
+                    p50, p95, p99 = np.percentile(latencies, (50, 95, 99))
+                    results[f"{scenario}/{name}"] = {
+                        'fps': float(1.0 / np.mean(latencies)),
+                        'p50_ms': float(p50 * 1000),
+                        'p95_ms': float(p95 * 1000),
+                        'p99_ms': float(p99 * 1000),
+                        'alloc_kb': measure_allocations(fn) / 1024,
+                    }
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """List of regression messages (p50 latency or allocations above baseline * (1 + tolerance))"""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        if result['p50_ms'] > reference['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{key}: p50 {result['p50_ms']:.3f}ms vs baseline {reference['p50_ms']:.3f}ms")
+        # Ignore allocation noise below 1 KB
+        if result['alloc_kb'] > reference['alloc_kb'] * (1 + tolerance) + 1:
+            regressions.append(f"{key}: allocations {result['alloc_kb']:.1f}KB vs baseline {reference['alloc_kb']:.1f}KB")
+    return regressions
+
+
+def print_results(results, baseline=None):
+    print(f"{'Benchmark':<52}{'FPS':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'alloc KB':>10}{'vs base':>9}")
+    print("=" * 108)
+    for key, result in results.items():
+        change = ''
+        if baseline and key in baseline and baseline[key]['p50_ms'] > 0:
+            change = f"{(result['p50_ms'] / baseline[key]['p50_ms'] - 1) * 100:+.0f}%"
+        print(f"{key:<52}{result['fps']:>10.0f}{result['p50_ms']:>9.3f}{result['p95_ms']:>9.3f}"
+              f"{result['p99_ms']:>9.3f}{result['alloc_kb']:>10.1f}{change:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark of the detection and control hot path')
+    parser.add_argument('--iterations', type=int, default=100, help='Timed calls per benchmark')
+    parser.add_argument('--quick', action='store_true', help='One blob size and noise level per resolution')
+    parser.add_argument('--resolution', action='append', default=None,
+                        help='WIDTHxHEIGHT to benchmark (repeatable, default: 320x240..1920x1080)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown before failing (0.25 = 25%%)')
+    parser.add_argument('--threads', type=int, default=None, help='OpenCV thread count (default: OpenCV decides)')
+    args = parser.parse_args()
+
+    if args.threads is not None:
+        cv2.setNumThreads(args.threads)
+    resolutions = RESOLUTIONS
+    if args.resolution:
+        resolutions = [tuple(int(v) for v in r.lower().split('x')) for r in args.resolution]
+
+    print(f"OpenCV {cv2.__version__}, NumPy {np.__version__}, OpenCV threads: {cv2.getNumThreads()}")
+    results = run_suite(args.iterations, resolutions, args.quick)
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n✓ Baseline saved to {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\nNo baseline at {args.baseline} - run with --save-baseline to create one")
+        return 0
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance * 100:.0f}%:")
+        for message in regressions:
+            print(f"  - {message}")
+        return 1
+    print(f"\n✓ No regressions beyond {args.tolerance * 100:.0f}% of baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+# center: (x, y) int pixels, area: pixels, bbox: (x, y, w, h), all in full-frame coordinates
+Blob = namedtuple('Blob', ['center', 'area', 'bbox'])
+
+TARGET_POLICIES = ('largest', 'nearest', 'all')
+
+
+def find_blobs(mask, min_area=0, max_area=None, scale=1, origin=(0, 0), context=None):
+    """
+    Connected components of a binary mask, each filtered by its own area.
+
+    scale/origin map mask pixels to full-frame pixels
+    (x_full = x * scale + origin_x), for downscaled or ROI masks.
+    context (DetectionContext) supplies a reusable label image.
+    Returns: list of Blob, largest first
+    """
+    # Label only the bounding box of the white pixels (usually a small part of the frame)
+    bx, by, bw, bh = cv2.boundingRect(mask)
+    if bw == 0 or bh == 0:
+        return []
+    # Separate 8-connected components are at least 2 pixels apart, so a bw x bh box holds
+    # at most ceil(bw/2) * ceil(bh/2) of them (a checkerboard of isolated pixels): use
+    # 16-bit labels (half the label memory of 32-bit) only when that cannot overflow
+    label_type = cv2.CV_16U if ((bw + 1) // 2) * ((bh + 1) // 2) < 65535 else cv2.CV_32S
+    labels = None
+    if context is not None:
+        labels = context.buffer(f'labels{label_type}', (bh, bw), np.uint16 if label_type == cv2.CV_16U else np.int32)
+    count, _, stats, centroids = cv2.connectedComponentsWithStats(
+        mask[by:by + bh, bx:bx + bw], labels=labels, connectivity=8, ltype=label_type)
+    if count <= 1:
+        return []
+
+    # Label 0 is the background
+    areas = stats[1:, cv2.CC_STAT_AREA] * (scale * scale)
+    keep = areas >= min_area
+    if max_area is not None:
+        keep &= areas <= max_area
+    indices = np.flatnonzero(keep) + 1
+    if len(indices) == 0:
+        return []
+
+    ox, oy = origin[0] + bx * scale, origin[1] + by * scale
+    blobs = []
+    for i in indices[np.argsort(-stats[indices, cv2.CC_STAT_AREA], kind='stable')]:
+        x, y, w, h, area = stats[i]
+        cx, cy = centroids[i]
+        # A downscaled pixel covers `scale` full-res pixels: map to the middle of them
+        blobs.append(Blob(center=(int(cx * scale + (scale - 1) / 2 + ox), int(cy * scale + (scale - 1) / 2 + oy)),
+                          area=int(area * scale * scale),
+                          bbox=(int(x * scale + ox), int(y * scale + oy), int(w * scale), int(h * scale))))
+    return blobs
+
+
+def select_target(blobs, policy='largest', reference=None):
+    """
+    Pick the blob to steer on.
+    'largest': biggest blob. 'nearest': closest to reference (previous target),
+    or the largest if there is no reference.
+    """
+    if not blobs:
+        return None
+    if policy == 'nearest' and reference is not None:
+        rx, ry = reference
+        return min(blobs, key=lambda b: (b.center[0] - rx) ** 2 + (b.center[1] - ry) ** 2)
+    return blobs[0]
+
+
+class MultiBlobTracker:
+    """
+    Keeps stable IDs for several blobs across frames.
+
+    Each frame, blobs are matched greedily to existing tracks by centroid
+    distance (closest pairs first, within max_distance). Unmatched blobs
+    start new tracks; tracks unseen for more than max_missing frames end.
+    """
+
+    def __init__(self, max_distance=80, max_missing=10):
+        self.max_distance = max_distance
+        self.max_missing = max_missing
+        self.tracks = {}  # id -> {'blob': Blob, 'missing': int}
+        self.next_id = 1
+
+    def update(self, blobs):
+        """Match this frame's blobs. Returns {id: Blob} for blobs seen this frame"""
+        track_ids = list(self.tracks)
+        pairs = []
+        for t, track_id in enumerate(track_ids):
+            tx, ty = self.tracks[track_id]['blob'].center
+            for b, blob in enumerate(blobs):
+                distance = ((blob.center[0] - tx) ** 2 + (blob.center[1] - ty) ** 2) ** 0.5
+                if distance <= self.max_distance:
+                    pairs.append((distance, t, b))
+        pairs.sort()
+
+        matched_tracks, matched_blobs = set(), set()
+        visible = {}
+        for _, t, b in pairs:
+            if t in matched_tracks or b in matched_blobs:
+                continue
+            matched_tracks.add(t)
+            matched_blobs.add(b)
+            track_id = track_ids[t]
+            self.tracks[track_id] = {'blob': blobs[b], 'missing': 0}
+            visible[track_id] = blobs[b]
+
+        for t, track_id in enumerate(track_ids):
+            if t not in matched_tracks:
+                self.tracks[track_id]['missing'] += 1
+                if self.tracks[track_id]['missing'] > self.max_missing:
+                    del self.tracks[track_id]
+
+        for b, blob in enumerate(blobs):
+            if b not in matched_blobs:
+                self.tracks[self.next_id] = {'blob': blob, 'missing': 0}
+                visible[self.next_id] = blob
+                self.next_id += 1
+
+        return visible
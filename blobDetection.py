@@ -1,19 +1,46 @@
+import argparse
+import os
 import cv2
 import numpy as np
 import requests
+import threading
 import time
-from tkinter import Tk, Toplevel, Label, LabelFrame, Scale, Button, DoubleVar, HORIZONTAL
-from PIL import Image, ImageTk
+from concurrent.futures import ThreadPoolExecutor
+from frameGrabber import LatestFrameGrabber
+from motorDispatcher import MotorCommandDispatcher
+from motorTransport import create_transport
+from colorLut import BGRLookupClassifier, hsv_in_range
+from backProjection import HistogramBackProjector
+from headlessControl import DEFAULT_CONTROL_PORT, run_headless
+from latencyStats import MetricsExporter, StageTimer
+from sessionRecorder import SessionRecorder
+from blobComponents import Blob, MultiBlobTracker, find_blobs, select_target
+from qualityGovernor import QualityGovernor
+from predictiveTracker import MOTION_MODELS, create_motion_model
+from calibrationProfiles import DEFAULT_PROFILE_PATH, ProfileStore
+from detectionContext import DetectionContext
+from overlayRenderer import CommandState, OverlayRenderer
+from controlScheduler import ControlScheduler
+
+# tkinter / PIL are imported only when a GUI is used (not in headless mode)
 
 class AutonomousBlobTracker:
-    def __init__(self, esp32_ip="192.168.4.1", root=None):
+    def __init__(self, esp32_ip="192.168.4.1", root=None, transport='http', connect=True):
         # ESP32 connection
         self.esp32_ip = esp32_ip
         self.esp32_url = f"http://{esp32_ip}/control"
+        self.transport_kind = transport  # 'http' (query strings) or 'udp' (binary datagrams)
         
         # Default HSV color range (Blue)
+        # Lower hue > upper hue wraps around 0/179 (e.g. red: 170..10)
         self.lower_hsv = np.array([34, 64, 143])
         self.upper_hsv = np.array([66, 146, 255])
+        
+        # Color classifier: 'hsv' (cvtColor + inRange), 'lut' (precomputed BGR table)
+        # or 'backproject' (hue/saturation histogram learned from a sample of the target)
+        self.color_classifier = 'hsv'
+        self.lut_classifier = BGRLookupClassifier(compact=True)
+        self.back_projector = HistogramBackProjector()
 
         # Blob size limits (in pixels)
         self.min_blob_area = 500
@@ -24,6 +51,61 @@ class AutonomousBlobTracker:
         self.frames_lost = 0
         self.max_frames_lost = 10
         
+        # Target selection among connected components:
+        # 'largest', 'nearest' (to the previous target) or 'all' (legacy: average of every mask pixel)
+        self.target_policy = 'largest'
+        self.frame_blobs = []  # Blobs found in the last searched area
+        
+        # Multi-blob tracking with stable IDs (full-frame search only)
+        self.track_multiple = False
+        self.multi_tracker = MultiBlobTracker()
+        self.tracked_blobs = {}  # id -> Blob visible in the last frame
+        
+        # ROI tracking - search only a window around last_position while locked
+        self.roi_tracking = True
+        self.roi_min_size = 96  # Smallest search window side (pixels)
+        self.roi_margin = 2.5  # Window half-size in blob radii
+        self.roi_lost_growth = 0.25  # Window grows by this fraction per lost frame
+        self.last_area = 0
+        self.last_velocity = (0, 0)  # Pixels per frame
+        self.search_window = None  # (x0, y0, x1, y1) used for the last frame, None = full frame
+        
+        # Pyramid detection - full-frame searches run at 1/scale, then refine at full resolution
+        self.pyramid_scale = 1  # 1 = off, 2 = half resolution, 4 = quarter resolution
+        self.pyramid_refine_max_fraction = 0.25  # Skip refinement if the patch exceeds this share of the frame
+        self.roi_stride = 1  # ROI searches use every Nth pixel (raised by the quality governor)
+        
+        # Adaptive quality governor (QualityGovernor), None = fixed quality
+        self.quality_governor = None
+        
+        # Fixed-rate control thread (ControlScheduler), None = command from the vision loop
+        self.control_scheduler = None
+        
+        # Latency compensation - steer on where the target will be when the command lands
+        self.motion_model = None  # None (steer on the measurement), 'alphabeta' or 'kalman'
+        self.motion_filter = None
+        self.actuation_delay = None  # Seconds from send to motor response; None = half the command RTT
+        self.max_lead_time = 0.3  # Never extrapolate further ahead than this (seconds)
+        self.predicted_position = None  # Position used for control in the last frame
+        self.lead_time = 0.0  # Seconds ahead the last prediction looked (recorded for replay)
+        self.target_velocity = (0.0, 0.0)  # Filtered target velocity (pixels per second)
+        
+        # Startup timing: time.perf_counter() when main() started, None once reported
+        self.startup_time = None
+        
+        # Reused working buffers and kernels for detect_blob -> centroid
+        self.detection_context = DetectionContext()
+        
+        # Overlay with a cached static layer (redrawn when dead_zone/HSV change)
+        self.overlay_renderer = OverlayRenderer()
+        
+        # Frame timing (filled in from the capture thread)
+        self.frame_timestamp = 0.0  # time.monotonic() when the frame was captured
+        self.dropped_frames = 0  # Stale frames discarded by the grabber
+        
+        # Per-stage latency instrumentation (no-op while disabled)
+        self.stage_timer = StageTimer(enabled=False)
+        
         # Control parameters
         self.dead_zone = 30  # Pixels from center where no movement needed
         self.base_speed = 100  # Base motor speed (increased for faster response)
@@ -34,14 +116,32 @@ class AutonomousBlobTracker:
         self.last_command_time = 0
         self.command_interval = 0.05  # Send commands every 50ms for faster response
         
+        # Background motor command sender (keep-alive session + heartbeat)
+        # connect=False gives a detection/overlay-only tracker that never talks to the ESP32
+        self.motor_dispatcher = None
+        if connect:
+            self.motor_dispatcher = MotorCommandDispatcher(
+                esp32_ip, transport=create_transport(transport, esp32_ip)).start()
+        
         # Tkinter root window (hidden)
         self.root = root
         
         # HSV Finder window reference
         self.hsv_finder_window = None
         
-        # ESP32 connection test
-        self.test_connection()
+        # Shared frame source (LatestFrameGrabber) - the HSV finder subscribes
+        # to it instead of opening the camera a second time
+        self.frame_source = None
+        
+        # Calibration profile the HSV finder saves to (ProfileStore), if any
+        self.profile_store = None
+        self.profile_name = 'default'
+        
+        # ESP32 connection test (in the background, so startup never waits for it)
+        self.connection_probe = None
+        if connect:
+            self.connection_probe = threading.Thread(target=self.test_connection, name="ConnectionProbe", daemon=True)
+            self.connection_probe.start()
         
     def test_connection(self):
         """Test connection to ESP32"""
@@ -56,27 +156,84 @@ class AutonomousBlobTracker:
             print(f"  ESP32 IP should be: {self.esp32_ip}")
         return False
     
+    def get_settings(self):
+        """Detection and control settings as plain JSON-friendly values"""
+        return {
+            'lower_hsv': [int(v) for v in self.lower_hsv],
+            'upper_hsv': [int(v) for v in self.upper_hsv],
+            'min_blob_area': self.min_blob_area,
+            'max_blob_area': self.max_blob_area,
+            'dead_zone': self.dead_zone,
+            'base_speed': self.base_speed,
+            'max_speed': self.max_speed,
+            'min_motor_speed': self.min_motor_speed,
+        }
+    
+    def apply_settings(self, settings):
+        """Apply settings as returned by get_settings() (missing keys are left unchanged)"""
+        for key, value in settings.items():
+            if key in ('lower_hsv', 'upper_hsv'):
+                value = np.array(value)
+            setattr(self, key, value)
+    
+    def load_profile(self, store, name=None):
+        """Apply a calibration profile (default: the store's active one). Returns True if found"""
+        name = name or store.active or self.profile_name
+        self.profile_store = store
+        self.profile_name = name
+        settings = store.get(name)
+        if settings is None:
+            return False
+        self.apply_settings(settings)
+        return True
+    
+    def save_profile(self):
+        """Save the current settings to the attached profile store"""
+        if self.profile_store is None:
+            return False
+        self.profile_store.save(self.profile_name, self.get_settings())
+        print(f"✓ Saved calibration profile '{self.profile_name}' to {self.profile_store.path}")
+        return True
+    
+    def set_frame_info(self, timestamp, dropped_frames):
+        """Record capture time and drop count of the frame being processed"""
+        self.frame_timestamp = timestamp
+        self.dropped_frames = dropped_frames
+    
+    def report_startup(self):
+        """Print the time from startup to the first tracked frame (once)"""
+        if self.startup_time is None:
+            return
+        print(f"✓ First tracked frame {(time.perf_counter() - self.startup_time) * 1000:.0f}ms after startup")
+        self.startup_time = None
+    
     def send_motor_command(self, speed):
         """
         Send movement command to ESP32
         speed > 0: Move FORWARD (object is below center)
         speed < 0: Move BACKWARD (object is above center)
         speed = 0: STOP
+        
+        Non-blocking: the dispatcher thread sends the newest speed to
+        both motors and keeps re-sending it as a heartbeat.
         """
-        try:
-            # Both motors get same speed for linear movement
-            # Send commands in parallel for faster response
-            params_a = {'motor': 'A', 'speed': speed}
-            params_b = {'motor': 'B', 'speed': speed}
-            
-            requests.get(self.esp32_url, params=params_a, timeout=0.3)
-            requests.get(self.esp32_url, params=params_b, timeout=0.3)
-            return True
-        except:
+        if self.motor_dispatcher is None:
             return False
+        self.motor_dispatcher.submit(speed)
+        return True
+    
+    def shutdown(self):
+        """Stop the control thread and dispatcher and make sure the motors are stopped"""
+        if self.control_scheduler is not None:
+            self.control_scheduler.stop()
+        if self.motor_dispatcher is not None:
+            self.motor_dispatcher.stop(send_stop=True)
     
     def open_hsv_finder(self):
         """Open the HSV Range Finder window"""
+        from tkinter import Toplevel, Label, LabelFrame, Scale, Button, DoubleVar, HORIZONTAL
+        from previewRenderer import PreviewRenderer
+        
         # Check if window exists and is still valid
         if self.hsv_finder_window is not None:
             try:
@@ -179,19 +336,14 @@ class AutonomousBlobTracker:
         uvShow = Label(resultFrame, text=str(int(u_v.get())), width=5)
         uvShow.grid(row=3, column=2)
         
-        # Open camera for preview (try index 0, if busy try index 1)
-        cap_preview = cv2.VideoCapture(0)
-        if not cap_preview.isOpened():
-            print("Camera 0 busy, trying camera 1...")
-            cap_preview = cv2.VideoCapture(1)
-        
-        if not cap_preview.isOpened():
-            print("❌ Error: Could not open camera for HSV preview")
+        if self.frame_source is None:
+            print("❌ Error: No frame source for HSV preview")
             self.hsv_finder_window.destroy()
             self.hsv_finder_window = None
             return
         
-        print("✓ HSV Finder camera opened successfully")
+        # Same frames the tracker sees (zero-copy), at the preview's own rate
+        preview_frames = self.frame_source.subscribe('hsv_finder', max_fps=30)
         
         # Apply button
         def apply_hsv():
@@ -200,10 +352,8 @@ class AutonomousBlobTracker:
             print(f"✓ Applied new HSV values:")
             print(f"  Lower: {self.lower_hsv}")
             print(f"  Upper: {self.upper_hsv}")
-            try:
-                cap_preview.release()
-            except:
-                pass
+            self.save_profile()
+            preview_frames.close()
             try:
                 self.hsv_finder_window.destroy()
             except:
@@ -215,18 +365,32 @@ class AutonomousBlobTracker:
                          bg='#4CAF50', fg='white', font=('Arial', 12, 'bold'))
         applyBtn.grid(row=4, column=0, columnspan=3, pady=10)
         
+        # Downsamples once to the label size and reuses its PhotoImages
+        renderer = PreviewRenderer((vidLabel1, vidLabel2, vidLabel3))
+        last_frame = [None]
+        
+        # Learn a back-projection colour model from a box drawn on the current frame
+        def learn_from_selection():
+            if last_frame[0] is not None:
+                self.select_color_sample(last_frame[0])
+        
+        learnBtn = Button(resultFrame, text='Learn From Selection', command=learn_from_selection)
+        learnBtn.grid(row=5, column=0, columnspan=3)
+        
         # Update function for video feed
         def update_hsv_preview():
             try:
                 if self.hsv_finder_window is None or not self.hsv_finder_window.winfo_exists():
                     return
                 
-                ret, frame = cap_preview.read()
+                # Non-blocking: this runs inside the tracking loop's root.update()
+                ret, frame, _, _ = preview_frames.latest()
                 if not ret:
-                    self.hsv_finder_window.after(10, update_hsv_preview)
+                    self.hsv_finder_window.after(renderer.poll_ms, update_hsv_preview)
                     return
             except:
                 return
+            last_frame[0] = frame
             
             # Update display labels
             lhShow.configure(text=str(int(l_h.get())))
@@ -236,44 +400,16 @@ class AutonomousBlobTracker:
             usShow.configure(text=str(int(u_s.get())))
             uvShow.configure(text=str(int(u_v.get())))
             
-            # Get current slider values
-            lower_bound = np.array([l_h.get(), l_s.get(), l_v.get()])
-            upper_bound = np.array([u_h.get(), u_s.get(), u_v.get()])
-            
-            # Convert frame to HSV and apply mask
-            hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-            mask = cv2.inRange(hsv, lower_bound, upper_bound)
-            filtered_frame = cv2.bitwise_and(frame, frame, mask=mask)
-            
-            # Convert frames for display
-            img1 = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            img1 = Image.fromarray(img1)
-            img1 = ImageTk.PhotoImage(image=img1)
+            # Mask and filtered views are recomputed only for a new frame or new slider values
+            renderer.render(frame, preview_frames.last_id,
+                            (l_h.get(), l_s.get(), l_v.get()),
+                            (u_h.get(), u_s.get(), u_v.get()))
             
-            img2 = cv2.cvtColor(filtered_frame, cv2.COLOR_BGR2RGB)
-            img2 = Image.fromarray(img2)
-            img2 = ImageTk.PhotoImage(image=img2)
-            
-            img3 = cv2.cvtColor(mask, cv2.COLOR_GRAY2RGB)
-            img3 = Image.fromarray(img3)
-            img3 = ImageTk.PhotoImage(image=img3)
-            
-            # Update labels
-            vidLabel1.config(image=img1)
-            vidLabel1.image = img1
-            vidLabel2.config(image=img2)
-            vidLabel2.image = img2
-            vidLabel3.config(image=img3)
-            vidLabel3.image = img3
-            
-            self.hsv_finder_window.after(10, update_hsv_preview)
+            self.hsv_finder_window.after(renderer.poll_ms, update_hsv_preview)
         
         # Cleanup function
         def on_closing():
-            try:
-                cap_preview.release()
-            except:
-                pass
+            preview_frames.close()
             try:
                 self.hsv_finder_window.destroy()
             except:
@@ -284,34 +420,305 @@ class AutonomousBlobTracker:
         self.hsv_finder_window.protocol("WM_DELETE_WINDOW", on_closing)
         update_hsv_preview()
     
-    def detect_blob(self, frame):
-        """Detect the colored blob in the frame"""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        mask = cv2.inRange(hsv, self.lower_hsv, self.upper_hsv)
+    def detect_blob(self, frame, kernel_size=5):
+        """
+        Detect the colored blob in the frame.
+        The returned mask lives in a reused buffer: valid until the next call.
+        """
+        mask = self.classify_colors(frame)
         
-        # Remove noise
-        kernel = np.ones((5, 5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+        # Remove noise (open into a scratch buffer, close back into the mask)
+        context = self.detection_context
+        kernel = context.kernel(kernel_size)
+        opened = context.buffer('opened', mask.shape)
+        cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel, dst=opened)
+        cv2.morphologyEx(opened, cv2.MORPH_CLOSE, kernel, dst=mask)
         
+        self.stage_timer.mark('detect_blob')
         return mask
     
-    def get_average_position(self, mask):
-        """Calculate average position of all white pixels"""
-        y_coords, x_coords = np.where(mask == 255)
+    def classify_colors(self, frame):
+        """Binary mask of pixels inside the HSV thresholds"""
+        if self.color_classifier == 'lut':
+            # Table is rebuilt only when the thresholds changed
+            self.lut_classifier.set_thresholds(self.lower_hsv, self.upper_hsv)
+            return self.lut_classifier.classify(frame)
         
-        if len(x_coords) == 0 or len(y_coords) == 0:
-            return None, 0
+        if self.color_classifier == 'backproject' and self.back_projector.is_trained():
+            return self.back_projector.classify(frame)
+        
+        # 'hsv', and 'backproject' until a colour model has been learned
+        context = self.detection_context
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV, dst=context.buffer('hsv', frame.shape))
+        return hsv_in_range(hsv, self.lower_hsv, self.upper_hsv,
+                            dst=context.buffer('mask', frame.shape[:2]),
+                            scratch=context.buffer('mask_wrap', frame.shape[:2]))
+    
+    def learn_color_model(self, frame, roi):
+        """
+        Learn the back-projection colour model from roi (x, y, w, h) of frame
+        and switch to the 'backproject' classifier. Returns True on success.
+        """
+        samples = self.back_projector.learn(frame, roi)
+        if samples == 0:
+            print("✗ Selected region has no saturated pixels to learn from")
+            return False
+        self.color_classifier = 'backproject'
+        print(f"✓ Learned colour model from {samples} pixels - classifier: backproject")
+        return True
+    
+    def select_color_sample(self, frame):
+        """Stop the motors, let the user drag a box around the target, and learn from it"""
+        self.send_motor_command(0)
+        roi = cv2.selectROI('Select target colour', frame, showCrosshair=False)
+        cv2.destroyWindow('Select target colour')
+        if roi[2] == 0 or roi[3] == 0:
+            print("Colour sampling cancelled")
+            return False
+        return self.learn_color_model(frame, roi)
+    
+    def find_target(self, mask, scale=1, origin=(0, 0)):
+        """
+        Find the target blob in the mask according to target_policy.
+        scale/origin map mask pixels to full-frame pixels (for downscaled or ROI masks).
+        Returns: Blob (full-frame coordinates) or None
+        """
+        if self.target_policy == 'all':
+            blob = self.average_all_pixels(mask, scale, origin)
+            self.frame_blobs = [blob] if blob is not None else []
+            return blob
+        
+        # Area limits apply to each connected component, not the total pixel count
+        self.frame_blobs = find_blobs(mask, self.min_blob_area, self.max_blob_area, scale, origin,
+                                      self.detection_context)
+        self.stage_timer.mark('get_average_position')
+        return select_target(self.frame_blobs, self.target_policy, self.last_position)
+    
+    def average_all_pixels(self, mask, scale=1, origin=(0, 0)):
+        """Legacy target: average position of all white pixels, limits checked on the total"""
+        # Image moments give count and centroid without coordinate arrays
+        moments = cv2.moments(mask, binaryImage=True)
+        self.stage_timer.mark('get_average_position')
+        
+        count = moments['m00']
+        if count == 0:
+            return None
         
-        area = len(x_coords)
+        area = int(count) * scale * scale
         
         if area < self.min_blob_area or area > self.max_blob_area:
+            return None
+        
+        avg_x = int(moments['m10'] / count * scale + (scale - 1) / 2 + origin[0])
+        avg_y = int(moments['m01'] / count * scale + (scale - 1) / 2 + origin[1])
+        x, y, w, h = cv2.boundingRect(mask)
+        bbox = (x * scale + origin[0], y * scale + origin[1], w * scale, h * scale)
+        
+        return Blob(center=(avg_x, avg_y), area=area, bbox=bbox)
+    
+    def get_average_position(self, mask, scale=1, origin=(0, 0)):
+        """
+        Calculate position and area of the target blob
+        Returns: (center, area) in full-frame coordinates, or (None, 0)
+        """
+        blob = self.find_target(mask, scale, origin)
+        if blob is None:
+            return None, 0
+        return blob.center, blob.area
+    
+    def detect_pyramid(self, frame, scale=None):
+        """
+        Coarse-to-fine detection: find the blob at 1/scale resolution, then
+        refine the centroid at full resolution inside the blob's bounding box.
+        Returns: (center, area) in full-frame coordinates
+        """
+        scale = scale or self.pyramid_scale
+        if scale <= 1:
+            return self.get_average_position(self.detect_blob(frame))
+        
+        height, width = frame.shape[:2]
+        small = cv2.resize(frame, (width // scale, height // scale), interpolation=cv2.INTER_AREA,
+                           dst=self.detection_context.buffer('pyramid', (height // scale, width // scale, 3)))
+        # Keep the morphology footprint roughly the same size in full-res pixels
+        kernel_size = max(3, (5 // scale) | 1)
+        small_mask = self.detect_blob(small, kernel_size)
+        coarse = self.find_target(small_mask, scale=scale)
+        if coarse is None:
             return None, 0
+        coarse_blobs = self.frame_blobs
         
-        avg_x = int(np.mean(x_coords))
-        avg_y = int(np.mean(y_coords))
+        # Bounding box of the coarse target, padded by one coarse pixel plus the kernel
+        bx, by, bw, bh = coarse.bbox
+        pad = scale + kernel_size
+        x0 = max(0, bx - pad)
+        y0 = max(0, by - pad)
+        x1 = min(width, bx + bw + pad)
+        y1 = min(height, by + bh + pad)
         
-        return (avg_x, avg_y), area
+        if (x1 - x0) * (y1 - y0) > self.pyramid_refine_max_fraction * width * height:
+            return coarse.center, coarse.area
+        
+        center, area = self.get_average_position(self.detect_blob(frame[y0:y1, x0:x1]), origin=(x0, y0))
+        # Keep the whole-frame blob list for multi-blob tracking
+        self.frame_blobs = coarse_blobs
+        if center is None:
+            return coarse.center, coarse.area
+        return center, area
+    
+    def compare_pyramid(self, frame, scale=None):
+        """
+        Measure accuracy and cost of pyramid detection against the full-resolution path.
+        Returns: dict with centroid error (pixels) and time per call (ms) for both paths
+        """
+        scale = scale or max(self.pyramid_scale, 2)
+        
+        start = time.perf_counter()
+        full_center, full_area = self.get_average_position(self.detect_blob(frame))
+        full_ms = (time.perf_counter() - start) * 1000
+        
+        start = time.perf_counter()
+        pyramid_center, pyramid_area = self.detect_pyramid(frame, scale)
+        pyramid_ms = (time.perf_counter() - start) * 1000
+        
+        error = None
+        if full_center is not None and pyramid_center is not None:
+            error = float(np.hypot(pyramid_center[0] - full_center[0], pyramid_center[1] - full_center[1]))
+        
+        return {
+            'scale': scale,
+            'error_px': error,
+            'area_full': full_area,
+            'area_pyramid': pyramid_area,
+            'full_ms': full_ms,
+            'pyramid_ms': pyramid_ms,
+        }
+    
+    def get_search_window(self, frame_shape):
+        """
+        Window to search in the next frame: (x0, y0, x1, y1), or None for full frame.
+        Sized from the last blob area and motion, centred on the predicted position.
+        """
+        if (not self.roi_tracking or self.track_multiple
+                or self.last_position is None or self.frames_lost >= self.max_frames_lost):
+            return None
+        
+        height, width = frame_shape[:2]
+        vx, vy = self.last_velocity
+        frames_ahead = self.frames_lost + 1
+        
+        # Predict where the blob moved to since it was last seen
+        px = self.last_position[0] + vx * frames_ahead
+        py = self.last_position[1] + vy * frames_ahead
+        
+        radius = np.sqrt(max(self.last_area, 1) / np.pi)
+        half_size = self.roi_margin * radius + max(abs(vx), abs(vy)) * frames_ahead
+        half_size *= 1.0 + self.roi_lost_growth * self.frames_lost
+        half_size = max(half_size, self.roi_min_size / 2)
+        
+        x0 = int(max(0, px - half_size))
+        y0 = int(max(0, py - half_size))
+        x1 = int(min(width, px + half_size))
+        y1 = int(min(height, py + half_size))
+        
+        # Window covers (almost) the whole frame anyway
+        if x1 - x0 <= 0 or y1 - y0 <= 0 or (x1 - x0) * (y1 - y0) >= 0.5 * width * height:
+            return None
+        return x0, y0, x1, y1
+    
+    def track_blob(self, frame):
+        """
+        Detect the blob, searching only around last_position while locked.
+        Falls back to a full-frame search after max_frames_lost misses.
+        Returns: (center, area) in full-frame coordinates
+        """
+        window = self.get_search_window(frame.shape)
+        self.search_window = window
+        
+        if window is None:
+            center, area = self.detect_pyramid(frame)
+        else:
+            x0, y0, x1, y1 = window
+            roi = frame[y0:y1, x0:x1]
+            stride = self.roi_stride
+            if stride > 1 and min(roi.shape[:2]) >= 4 * stride:
+                size = ((x1 - x0) // stride, (y1 - y0) // stride)
+                roi = cv2.resize(roi, size, interpolation=cv2.INTER_NEAREST,
+                                 dst=self.detection_context.buffer('roi_stride', (size[1], size[0], 3)))
+                mask = self.detect_blob(roi, max(3, (5 // stride) | 1))
+                center, area = self.get_average_position(mask, scale=stride, origin=(x0, y0))
+            else:
+                mask = self.detect_blob(roi)
+                center, area = self.get_average_position(mask, origin=(x0, y0))
+        
+        if self.track_multiple:
+            self.tracked_blobs = self.multi_tracker.update(self.frame_blobs)
+        
+        # Update tracking state
+        if center is not None:
+            if self.last_position is not None and self.frames_lost < self.max_frames_lost:
+                frames_elapsed = self.frames_lost + 1
+                self.last_velocity = ((center[0] - self.last_position[0]) / frames_elapsed,
+                                      (center[1] - self.last_position[1]) / frames_elapsed)
+            else:
+                self.last_velocity = (0, 0)
+            self.last_position = center
+            self.last_area = area
+            self.frames_lost = 0
+        else:
+            self.frames_lost += 1
+            if self.frames_lost > self.max_frames_lost:
+                self.last_position = None
+                self.last_velocity = (0, 0)
+        
+        return center, area
+    
+    def get_lead_time(self):
+        """Seconds from frame capture until a command sent now takes effect"""
+        delay = self.actuation_delay
+        if delay is None:
+            delay = 0.0
+            if self.motor_dispatcher is not None:
+                delay = self.motor_dispatcher.get_stats()['avg_latency'] / 2
+        frame_age = max(time.monotonic() - self.frame_timestamp, 0.0)
+        return min(frame_age + delay, self.max_lead_time)
+    
+    def predict_target(self, center, lead_time=None):
+        """
+        Feed the measured center to the motion model and return the position
+        to steer on: the target extrapolated to when the command takes effect.
+        Coasts on the model through up to max_frames_lost missed detections.
+        lead_time overrides get_lead_time() (replaying a recorded session).
+        Returns center unchanged when motion_model is None.
+        """
+        if self.motion_model is None:
+            self.motion_filter = None
+            self.predicted_position = None
+            self.target_velocity = (0.0, 0.0)
+            return center
+        
+        if (not isinstance(self.motion_filter, MOTION_MODELS.get(self.motion_model, ()))
+                or self.motion_filter.max_missing != self.max_frames_lost):
+            self.motion_filter = create_motion_model(self.motion_model, self.max_frames_lost)
+        
+        self.motion_filter.update(center, self.frame_timestamp)
+        self.lead_time = self.get_lead_time() if lead_time is None else lead_time
+        predicted = self.motion_filter.predict(self.frame_timestamp + self.lead_time)
+        if predicted is None:
+            self.predicted_position = None
+            self.target_velocity = (0.0, 0.0)
+            return None
+        
+        vx, vy = self.motion_filter.velocity
+        self.target_velocity = (float(vx), float(vy))
+        self.predicted_position = (int(predicted[0]), int(predicted[1]))
+        return self.predicted_position
+    
+    def set_motion_model(self, kind):
+        """Switch the motion model (None, 'alphabeta' or 'kalman'), discarding filter state"""
+        self.motion_model = kind
+        self.motion_filter = None
+        self.predicted_position = None
+        self.target_velocity = (0.0, 0.0)
     
     def calculate_motor_speed(self, center, frame_shape):
         """
@@ -355,62 +762,182 @@ class AutonomousBlobTracker:
             return -speed, f"BACKWARD {speed} - Object above (Err: {error_y}px)"
     
     def draw_overlay(self, frame, center, area, command, motor_speed):
-        """Draw tracking information on frame"""
-        height, width = frame.shape[:2]
-        frame_center_y = height // 2
-        
-        # Draw horizontal center line
-        cv2.line(frame, (0, frame_center_y), (width, frame_center_y), (255, 255, 255), 2)
+        """
+        Draw tracking information on frame (in place).
+        command is a CommandState or the command text from calculate_motor_speed.
+        """
+        if not isinstance(command, CommandState):
+            command = CommandState(motor_speed, command)
+        return self.overlay_renderer.render(frame, self, center, area, command)
+    
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Autonomous blob tracker with ESP32 control')
+    parser.add_argument('--ip', default=None, help='ESP32 address (host[:port]); prompts if omitted in GUI mode')
+    parser.add_argument('--transport', default='http', choices=['http', 'udp'], help='Motor command transport')
+    parser.add_argument('--camera', type=int, default=0, help='Camera index')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--runtime', default='threads', choices=['threads', 'asyncio'],
+                        help='Blocking loop with helper threads, or a single asyncio event loop')
+    parser.add_argument('--headless', action='store_true',
+                        default=os.environ.get('BLOB_TRACKER_HEADLESS', '') not in ('', '0'),
+                        help='No GUI: skip windows/overlay, stop via signals or the control socket '
+                             '(also enabled by BLOB_TRACKER_HEADLESS=1)')
+    parser.add_argument('--control-port', type=int, default=DEFAULT_CONTROL_PORT,
+                        help='Headless UDP control socket port on localhost (0 = disabled)')
+    parser.add_argument('--metrics', action='store_true', help='Enable per-stage latency instrumentation')
+    parser.add_argument('--metrics-file', default=None,
+                        help='Export latency percentiles to this file (.csv, otherwise Prometheus text)')
+    parser.add_argument('--metrics-interval', type=float, default=5.0, help='Seconds between metric exports')
+    parser.add_argument('--predict', default='none', choices=['none', 'alphabeta', 'kalman'],
+                        help='Steer on the target position predicted for when the command takes effect')
+    parser.add_argument('--governor', action='store_true',
+                        help='Lower detection/overlay quality automatically when the loop misses its deadline')
+    parser.add_argument('--deadline', type=float, default=None,
+                        help='Loop latency deadline for the governor in ms (default: the command interval)')
+    parser.add_argument('--control-rate', type=float, default=0,
+                        help='Run the control law on its own thread at this rate in Hz (0 = once per processed frame)')
+    parser.add_argument('--ki', type=float, default=0.0, help='Integral gain for the control thread (speed per px*s)')
+    parser.add_argument('--kd', type=float, default=0.0, help='Derivative gain for the control thread (speed per px/s)')
+    parser.add_argument('--vision-fps', type=float, default=None,
+                        help='Cap the rate frames are processed at (default: as fast as the camera delivers)')
+    parser.add_argument('--profile', default=None,
+                        help='Calibration profile to load and save to (default: the last one used)')
+    parser.add_argument('--profiles-file', default=DEFAULT_PROFILE_PATH, help='Calibration profile store (JSON)')
+    parser.add_argument('--record', default=None, metavar='PATH',
+                        help='Record frames, centroids and commands to PATH (replay with sessionRecorder.py)')
+    parser.add_argument('--record-lossless', action='store_true',
+                        help='Record frames as PNG instead of JPEG, so replay sees exactly the frames tracked live')
+    args = parser.parse_args()
+    
+    if args.runtime == 'asyncio':
+        # Options only the threaded runtime implements
+        unsupported = [option for option, value in (
+            ('--metrics', args.metrics), ('--metrics-file', args.metrics_file), ('--governor', args.governor),
+            ('--record', args.record), ('--ki', args.ki), ('--kd', args.kd)) if value]
+        if unsupported:
+            parser.error(f"{', '.join(unsupported)} not supported with --runtime asyncio")
+    return args
+
+
+def setup_profile(tracker, args):
+    """Load the requested (or last used) calibration profile into the tracker"""
+    store = ProfileStore(args.profiles_file)
+    if tracker.load_profile(store, args.profile):
+        print(f"✓ Loaded calibration profile '{tracker.profile_name}'")
+    elif args.profile:
+        print(f"✗ No calibration profile '{args.profile}' in {store.path} - using defaults "
+              f"(available: {', '.join(store.names()) or 'none'})")
+
+
+def setup_governor(tracker, args):
+    """Attach a QualityGovernor to the tracker if requested"""
+    if not args.governor:
+        return
+    deadline = args.deadline / 1000 if args.deadline else None
+    tracker.quality_governor = QualityGovernor(tracker, deadline)
+    print(f"✓ Quality governor on (deadline {tracker.quality_governor.deadline * 1000:.0f}ms)")
+
+
+def setup_scheduler(tracker, args):
+    """Start a fixed-rate ControlScheduler if requested"""
+    if args.control_rate <= 0:
+        return
+    tracker.control_scheduler = ControlScheduler(tracker, args.control_rate, args.ki, args.kd).start()
+    print(f"✓ Control thread at {args.control_rate:.0f}Hz (ki={args.ki}, kd={args.kd})")
+
+
+def setup_metrics(tracker, args):
+    """Enable stage timing if requested. Returns a MetricsExporter or None"""
+    if args.metrics or args.metrics_file:
+        tracker.stage_timer.enabled = True
+    if args.metrics_file:
+        print(f"✓ Exporting latency metrics to {args.metrics_file} every {args.metrics_interval:.0f}s")
+        providers = [component.gauges for component in (tracker.quality_governor, tracker.control_scheduler)
+                     if component is not None]
         
-        # Draw dead zone (horizontal band)
-        cv2.rectangle(frame, 
-                     (0, frame_center_y - self.dead_zone), 
-                     (width, frame_center_y + self.dead_zone), 
-                     (200, 200, 200), 1)
+        def gauges():
+            values = {}
+            for provider in providers:
+                values.update(provider())
+            return values
         
-        if center:
-            # Draw RED circle at average position
-            cv2.circle(frame, center, 10, (0, 0, 255), -1)
-            cv2.circle(frame, center, 15, (0, 0, 255), 2)
-            
-            # Draw line from blob to center line
-            cv2.line(frame, center, (center[0], frame_center_y), (0, 255, 255), 2)
-            
-            # Display info
-            cv2.putText(frame, f"Pixels: {area}", (10, 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            cv2.putText(frame, f"Position: {center}", (10, 60), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            cv2.putText(frame, f"Motor Speed: {motor_speed}", (10, 90), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        
-        # Display current HSV values (top right corner)
-        cv2.putText(frame, f"HSV Lower: [{self.lower_hsv[0]}, {self.lower_hsv[1]}, {self.lower_hsv[2]}]", 
-                   (width - 400, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        cv2.putText(frame, f"HSV Upper: [{self.upper_hsv[0]}, {self.upper_hsv[1]}, {self.upper_hsv[2]}]", 
-                   (width - 400, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-        
-        # Display command
-        cv2.putText(frame, command, (10, height - 20), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-        
-        # Display help text for HSV adjustment
-        cv2.putText(frame, "Press 'a' to adjust HSV", (10, height - 50), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200, 200, 200), 2)
-        
-        # Draw direction indicator
-        if "FORWARD" in command:
-            cv2.arrowedLine(frame, (width - 50, height - 50), (width - 50, height - 100), 
-                          (0, 255, 0), 3, tipLength=0.3)
-        elif "BACKWARD" in command:
-            cv2.arrowedLine(frame, (width - 50, height - 100), (width - 50, height - 50), 
-                          (0, 0, 255), 3, tipLength=0.3)
-        
-        return frame
+        return MetricsExporter(tracker.stage_timer, args.metrics_file, args.metrics_interval,
+                               gauges=gauges if providers else None)
+    return None
+
+
+def setup_recorder(tracker, args):
+    """Start a session recorder if requested. Returns a SessionRecorder or None"""
+    if not args.record:
+        return None
+    print(f"✓ Recording session to {args.record}")
+    return SessionRecorder(args.record, lossless=args.record_lossless,
+                           metadata={'settings': tracker.get_settings(), 'esp32_ip': tracker.esp32_ip,
+                                     'predict': args.predict})
+
+
+def open_camera(index=0, width=640, height=480, fps=30):
+    """Open and configure the camera. Returns None if it cannot be opened"""
+    cap = cv2.VideoCapture(index)
+    if not cap.isOpened():
+        return None
+    
+    # Set camera properties
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, fps)
+    return cap
+
+
+def main_headless(args):
+    """Detect -> control loop without any GUI imports or rendering"""
+    startup_time = time.perf_counter()
+    esp32_ip = args.ip or "192.168.4.1"
+    print(f"AUTONOMOUS BLOB TRACKER (headless) - ESP32 {esp32_ip} via {args.transport}")
+    
+    # The camera opens while the tracker is set up and the ESP32 is probed
+    with ThreadPoolExecutor(1, thread_name_prefix='CameraOpen') as executor:
+        camera = executor.submit(open_camera, args.camera, args.width, args.height)
+        tracker = AutonomousBlobTracker(esp32_ip, transport=args.transport)
+        tracker.startup_time = startup_time
+        tracker.set_motion_model(None if args.predict == 'none' else args.predict)
+        setup_profile(tracker, args)
+        cap = camera.result()
+    if cap is None:
+        print("❌ Error: Could not open camera")
+        tracker.shutdown()
+        return
+    grabber = LatestFrameGrabber(cap, args.vision_fps).start()
+    print("✓ Camera opened successfully")
+    setup_governor(tracker, args)
+    setup_scheduler(tracker, args)
+    exporter = setup_metrics(tracker, args)
+    recorder = setup_recorder(tracker, args)
     
+    try:
+        run_headless(tracker, grabber, args.control_port, exporter=exporter, recorder=recorder)
+    finally:
+        # Clean shutdown (sends a final STOP synchronously)
+        tracker.shutdown()
+        grabber.release()
+        if recorder is not None:
+            recorder.close()
+        print("✓ System shutdown complete")
 
 
 def main():
+    args = parse_args()
+    if args.runtime == 'asyncio':
+        from asyncTracker import main_async
+        main_async(args)
+        return
+    if args.headless:
+        main_headless(args)
+        return
+    
     print("=" * 60)
     print("AUTONOMOUS BLOB TRACKER WITH ESP32 CONTROL")
     print("=" * 60)
@@ -423,6 +950,15 @@ def main():
     print("  - 'a' - Open HSV adjustment window")
     print("  - 'q' - Quit program")
     print("  - 's' - Display current settings")
+    print("  - 'w' - Save current settings to the calibration profile")
+    print("  - 'r' - Toggle ROI tracking")
+    print("  - 'l' - Cycle color classifier (HSV box, lookup table, back-projection)")
+    print("  - 'b' - Select the target to learn a back-projection colour model")
+    print("  - 'p' - Cycle pyramid detection scale (1, 1/2, 1/4)")
+    print("  - 't' - Toggle stage latency display")
+    print("  - 'm' - Toggle multi-blob tracking")
+    print("  - 'n' - Cycle target policy (largest, nearest, all)")
+    print("  - 'k' - Cycle latency compensation (off, alpha-beta, Kalman)")
     print("  - SPACE - Emergency stop")
     print("\n🤖 TRACKING MODE:")
     print("  - Object ABOVE center → Motors move BACKWARD")
@@ -430,63 +966,110 @@ def main():
     print("  - Object in dead zone → Motors STOP")
     print("=" * 60)
     
-    esp32_ip = input("\nEnter ESP32 IP address (default: 192.168.4.1): ").strip()
+    # Open the camera in the background while we ask for the IP and set up
+    startup_time = time.perf_counter()
+    executor = ThreadPoolExecutor(1, thread_name_prefix='CameraOpen')
+    camera = executor.submit(open_camera, args.camera, args.width, args.height)
+    executor.shutdown(wait=False)
+    
+    esp32_ip = args.ip
+    if esp32_ip is None:
+        esp32_ip = input("\nEnter ESP32 IP address (default: 192.168.4.1): ").strip()
+        startup_time = time.perf_counter()  # Don't count the time spent typing
     if not esp32_ip:
         esp32_ip = "192.168.4.1"
     
+    from tkinter import Tk
+    
     # Initialize hidden Tkinter root window
     root = Tk()
     root.withdraw()  # Hide the root window
     
-    # Initialize tracker with root window
-    tracker = AutonomousBlobTracker(esp32_ip, root)
+    # Initialize tracker with root window (probes the ESP32 in the background)
+    tracker = AutonomousBlobTracker(esp32_ip, root, transport=args.transport)
+    tracker.startup_time = startup_time
+    tracker.set_motion_model(None if args.predict == 'none' else args.predict)
+    setup_profile(tracker, args)
     
-    # Open camera
-    cap = cv2.VideoCapture(0)
+    # Wait for the camera opened in the background
+    cap = camera.result()
     
-    if not cap.isOpened():
+    if cap is None:
         print("❌ Error: Could not open camera")
+        tracker.shutdown()
         return
     
-    # Set camera properties
-    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-    cap.set(cv2.CAP_PROP_FPS, 30)
+    # Read frames on a background thread so we always process the newest one
+    grabber = LatestFrameGrabber(cap, args.vision_fps).start()
+    tracker.frame_source = grabber
     
     print("\n✓ Camera opened successfully")
     print("✓ System ready - Starting autonomous tracking...\n")
     print("💡 Press 'a' to open HSV calibration window")
     
+    setup_governor(tracker, args)
+    setup_scheduler(tracker, args)
+    exporter = setup_metrics(tracker, args)
+    recorder = setup_recorder(tracker, args)
+    timer = tracker.stage_timer
+    governor = tracker.quality_governor
+    scheduler = tracker.control_scheduler
+    
     # Create window
     cv2.namedWindow('Autonomous Blob Tracker')
     
+    read_timeouts = 0  # Consecutive grabber.read() timeouts
     try:
         while True:
-            ret, frame = cap.read()
+            timer.begin_frame()
+            ret, frame, frame_time, dropped = grabber.read()
             if not ret:
-                print("Failed to grab frame")
-                break
+                read_timeouts += 1
+                if grabber.camera_failed(read_timeouts):
+                    print("Failed to grab frame")
+                    break
+                continue
+            read_timeouts = 0
+            tracker.set_frame_info(frame_time, dropped)
+            timer.mark('cap.read')
             
-            # Detect blob and get mask
-            mask = tracker.detect_blob(frame)
+            # Detect blob (ROI around last position when locked) and get average position
+            center, area = tracker.track_blob(frame)
+            tracker.report_startup()
             
-            # Get average position of all white pixels
-            center, area = tracker.get_average_position(mask)
+            # Calculate motor speed and command (on the predicted position when enabled)
+            control_center = tracker.predict_target(center)
+            motor_speed, command = tracker.calculate_motor_speed(control_center, frame.shape)
+            timer.mark('calculate_motor_speed')
             
-            # Calculate motor speed and command
-            motor_speed, command = tracker.calculate_motor_speed(center, frame.shape)
+            # Send command to ESP32 (with rate limiting), or hand the estimate to the control thread
+            command_sent = False
+            if scheduler is not None:
+                scheduler.publish(control_center, frame.shape, frame_time)
+                motor_speed, command = scheduler.motor_speed, scheduler.command
+            else:
+                current_time = time.time()
+                if current_time - tracker.last_command_time >= tracker.command_interval:
+                    if tracker.send_motor_command(motor_speed):
+                        tracker.last_command_time = current_time
+                        command_sent = True
+                        timer.record('frame_to_command', time.monotonic() - frame_time)
+            timer.mark('send_motor_command')
             
-            # Send command to ESP32 (with rate limiting)
-            current_time = time.time()
-            if current_time - tracker.last_command_time >= tracker.command_interval:
-                if tracker.send_motor_command(motor_speed):
-                    tracker.last_command_time = current_time
+            # Record before the overlay is drawn on the frame
+            if recorder is not None:
+                seq = recorder.record_frame(frame, frame_time)
+                recorder.record_result(seq, frame_time, center, area, tracker.lead_time)
+                recorder.record_command(seq, time.monotonic(), motor_speed, command, command_sent)
             
-            # Draw overlay with Adjust button
-            frame = tracker.draw_overlay(frame, center, area, command, motor_speed)
-            
-            # Show frames
-            cv2.imshow('Autonomous Blob Tracker', frame)
+            # The governor may skip the overlay on some frames to hold the deadline
+            if governor is None or governor.should_render():
+                # Draw overlay with Adjust button (on a copy: grabber frames are shared and read-only)
+                frame = tracker.draw_overlay(frame.copy(), center, area, command, motor_speed)
+                timer.mark('draw_overlay')
+                
+                # Show frames
+                cv2.imshow('Autonomous Blob Tracker', frame)
             
             # Update Tkinter event loop only if HSV finder is open
             if tracker.hsv_finder_window is not None:
@@ -497,32 +1080,112 @@ def main():
             
             # Handle key presses
             key = cv2.waitKey(1) & 0xFF
+            timer.mark('imshow')
+            timer.end_frame()
+            if governor is not None:
+                governor.update(time.monotonic() - frame_time)
+            if exporter is not None:
+                exporter.maybe_export()
+            
             if key == ord('q'):
                 print("\nStopping motors and exiting...")
                 tracker.send_motor_command(0)
                 break
             elif key == ord(' '):  # Emergency stop
-                print("\n⚠️ EMERGENCY STOP!")
-                tracker.send_motor_command(0)
+                if scheduler is None:
+                    print("\n⚠️ EMERGENCY STOP!")
+                    tracker.send_motor_command(0)
+                elif scheduler.paused:
+                    scheduler.resume()
+                    print("\n▶ Control resumed")
+                else:
+                    # The control thread would resend a speed on its next tick: hold it
+                    scheduler.pause()
+                    print("\n⚠️ EMERGENCY STOP! (space again to resume)")
             elif key == ord('a'):  # Alternative: press 'a' to open adjustment window
                 tracker.open_hsv_finder()
+            elif key == ord('r'):
+                tracker.roi_tracking = not tracker.roi_tracking
+                print(f"\nROI tracking: {'ON' if tracker.roi_tracking else 'OFF'}")
+            elif key == ord('l'):
+                classifiers = ['hsv', 'lut'] + (['backproject'] if tracker.back_projector.is_trained() else [])
+                current = classifiers.index(tracker.color_classifier) if tracker.color_classifier in classifiers else -1
+                tracker.color_classifier = classifiers[(current + 1) % len(classifiers)]
+                print(f"\nColor classifier: {tracker.color_classifier}")
+            elif key == ord('b'):
+                # Sample a fresh frame (the displayed one has the overlay drawn on it)
+                ret, sample_frame, _, _ = grabber.read()
+                if ret:
+                    tracker.select_color_sample(sample_frame)
+            elif key == ord('p'):
+                # Cycle pyramid scale 1 -> 2 -> 4 -> 1 and report accuracy on a fresh frame
+                if governor is not None:
+                    # Cycle the configured scale; the governor may hold the effective one higher
+                    governor.set_base_pyramid_scale({1: 2, 2: 4}.get(governor.base_pyramid_scale, 1))
+                    print(f"\nPyramid scale: 1/{governor.base_pyramid_scale} "
+                          f"(effective 1/{tracker.pyramid_scale} at quality level {governor.level})")
+                else:
+                    tracker.pyramid_scale = {1: 2, 2: 4}.get(tracker.pyramid_scale, 1)
+                    print(f"\nPyramid scale: 1/{tracker.pyramid_scale}")
+                ret, probe_frame, _, _ = grabber.read()
+                if ret and tracker.pyramid_scale > 1:
+                    result = tracker.compare_pyramid(probe_frame)
+                    error = 'n/a' if result['error_px'] is None else f"{result['error_px']:.1f}px"
+                    print(f"  Centroid error vs full-res: {error}")
+                    print(f"  Full-res: {result['full_ms']:.2f}ms, pyramid: {result['pyramid_ms']:.2f}ms")
+            elif key == ord('m'):
+                tracker.track_multiple = not tracker.track_multiple
+                print(f"\nMulti-blob tracking: {'ON' if tracker.track_multiple else 'OFF'}")
+            elif key == ord('n'):
+                policies = ('largest', 'nearest', 'all')
+                tracker.target_policy = policies[(policies.index(tracker.target_policy) + 1) % len(policies)]
+                print(f"\nTarget policy: {tracker.target_policy}")
+            elif key == ord('k'):
+                models = (None, 'alphabeta', 'kalman')
+                tracker.set_motion_model(models[(models.index(tracker.motion_model) + 1) % len(models)])
+                print(f"\nLatency compensation: {tracker.motion_model or 'OFF'}")
+            elif key == ord('t'):
+                timer.enabled = not timer.enabled
+                print(f"\nStage latency display: {'ON' if timer.enabled else 'OFF'}")
+            elif key == ord('w'):
+                tracker.save_profile()
             elif key == ord('s'):
                 print(f"\n💾 Current Settings:")
                 print(f"Lower HSV: {tracker.lower_hsv}")
                 print(f"Upper HSV: {tracker.upper_hsv}")
                 print(f"Min Area: {tracker.min_blob_area}")
                 print(f"Max Area: {tracker.max_blob_area}")
+                print(f"Profile: '{tracker.profile_name}' ({tracker.profile_store.path if tracker.profile_store else 'no store'})")
                 print(f"Dead Zone: {tracker.dead_zone}")
                 print(f"Base Speed: {tracker.base_speed}")
+                print(f"Dropped Frames: {tracker.dropped_frames}")
+                if governor is not None:
+                    print(f"Quality level: {governor.level} {governor.settings} "
+                          f"(loop p90 {governor.last_p90 * 1000:.1f}ms, {governor.adjustments} adjustments)")
+                if tracker.motion_model is not None:
+                    print(f"Prediction: {tracker.motion_model}, lead {tracker.get_lead_time() * 1000:.0f}ms, "
+                          f"velocity ({tracker.target_velocity[0]:.0f}, {tracker.target_velocity[1]:.0f}) px/s")
+                if scheduler is not None:
+                    control = scheduler.get_stats()
+                    print(f"Control thread: {control['rate']:.0f}Hz, {control['ticks']} ticks, "
+                          f"{control['missed_deadlines']} missed deadlines, lateness p50/p99 "
+                          f"{control['lateness_p50'] * 1000:.2f}/{control['lateness_p99'] * 1000:.2f}ms")
+                stats = tracker.motor_dispatcher.get_stats()
+                print(f"Commands: {stats['sent']} sent, {stats['failed']} failed, "
+                      f"{stats['superseded']} superseded, {stats['heartbeats']} heartbeats")
+                print(f"Command RTT: last {stats['last_latency'] * 1000:.1f}ms, "
+                      f"avg {stats['avg_latency'] * 1000:.1f}ms, max {stats['max_latency'] * 1000:.1f}ms")
     
     except KeyboardInterrupt:
         print("\n\n⚠️ Keyboard interrupt - Stopping motors...")
         tracker.send_motor_command(0)
     
     finally:
-        # Clean shutdown
-        tracker.send_motor_command(0)
-        cap.release()
+        # Clean shutdown (sends a final STOP synchronously)
+        tracker.shutdown()
+        grabber.release()
+        if recorder is not None:
+            recorder.close()
         cv2.destroyAllWindows()
         if root:
             try:
@@ -0,0 +1,65 @@
+import json
+import os
+
+DEFAULT_PROFILE_PATH = os.environ.get(
+    'BLOB_TRACKER_PROFILES',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'calibration_profiles.json'))
+
+# Settings a profile may hold (same keys as AutonomousBlobTracker.get_settings())
+PROFILE_KEYS = ('lower_hsv', 'upper_hsv', 'min_blob_area', 'max_blob_area',
+                'dead_zone', 'base_speed', 'max_speed', 'min_motor_speed')
+
+
+class ProfileStore:
+    """
+    Named calibration profiles in one local JSON file:
+    {"active": "default", "profiles": {"default": {"lower_hsv": [...], ...}, ...}}
+
+    Every save rewrites the file atomically, so a crash never leaves a
+    half-written store behind.
+    """
+
+    def __init__(self, path=DEFAULT_PROFILE_PATH):
+        self.path = path
+        self.data = {'active': None, 'profiles': {}}
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return self
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"✗ Could not read calibration profiles from {self.path}: {e}")
+            return self
+        self.data = {'active': data.get('active'), 'profiles': data.get('profiles', {})}
+        return self
+
+    def names(self):
+        return sorted(self.data['profiles'])
+
+    @property
+    def active(self):
+        return self.data['active']
+
+    def get(self, name=None):
+        """Settings of profile name (default: the active one), or None"""
+        name = name or self.active
+        return self.data['profiles'].get(name) if name else None
+
+    def save(self, name, settings, activate=True):
+        """Store (or update) profile name with the given settings and write the file"""
+        profile = self.data['profiles'].setdefault(name, {})
+        for key in PROFILE_KEYS:
+            if key in settings:
+                value = settings[key]
+                profile[key] = [int(v) for v in value] if key.endswith('_hsv') else value
+        if activate:
+            self.data['active'] = name
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        return profile
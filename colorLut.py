@@ -0,0 +1,140 @@
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+
+def hsv_in_range(hsv, lower_hsv, upper_hsv, dst=None, scratch=None):
+    """
+    cv2.inRange for HSV thresholds, with hue wrap-around.
+    If lower hue > upper hue (e.g. red: 170..10) the hue range is
+    [lower_h, 179] + [0, upper_h]; scratch (same shape as dst) then
+    holds the second half so nothing is allocated.
+    """
+    lower_hsv = np.asarray(lower_hsv)
+    upper_hsv = np.asarray(upper_hsv)
+    if lower_hsv[0] <= upper_hsv[0]:
+        return cv2.inRange(hsv, lower_hsv, upper_hsv, dst=dst)
+
+    high_lower = np.array([lower_hsv[0], lower_hsv[1], lower_hsv[2]])
+    high_upper = np.array([179, upper_hsv[1], upper_hsv[2]])
+    low_lower = np.array([0, lower_hsv[1], lower_hsv[2]])
+    low_upper = np.array([upper_hsv[0], upper_hsv[1], upper_hsv[2]])
+    mask = cv2.inRange(hsv, high_lower, high_upper, dst=dst)
+    return cv2.bitwise_or(mask, cv2.inRange(hsv, low_lower, low_upper, dst=scratch), dst=mask)
+
+
+class BGRLookupClassifier:
+    """
+    Classifies BGR pixels against HSV thresholds with a precomputed table.
+
+    The table holds one entry per 24-bit BGR colour and is rebuilt only
+    when the thresholds change. With compact=True it is bit-packed
+    (2 MB); with compact=False it is one byte per colour (16 MB), which
+    costs more memory but needs fewer operations per pixel.
+    """
+
+    def __init__(self, compact=True):
+        self.compact = compact
+        self.table = None
+        self.thresholds = None
+        self.build_time = 0.0
+
+        # Per-shape BGRx scratch buffer: alpha stays 0 so the uint32 view
+        # of each pixel is directly its table index (B | G << 8 | R << 16)
+        self._index_buffer = None
+
+    def set_thresholds(self, lower_hsv, upper_hsv):
+        """Rebuild the table if the thresholds changed"""
+        thresholds = (tuple(int(v) for v in lower_hsv), tuple(int(v) for v in upper_hsv))
+        if thresholds == self.thresholds:
+            return False
+
+        start = time.perf_counter()
+
+        # Every 24-bit colour as a 4096x4096 BGR image, index = B | G << 8 | R << 16
+        index = np.arange(1 << 24, dtype=np.uint32).reshape(4096, 4096)
+        all_colors = np.empty((4096, 4096, 3), np.uint8)
+        all_colors[..., 0] = index & 0xFF
+        all_colors[..., 1] = (index >> 8) & 0xFF
+        all_colors[..., 2] = index >> 16
+        del index
+
+        hsv = cv2.cvtColor(all_colors, cv2.COLOR_BGR2HSV)
+        del all_colors
+        in_range = hsv_in_range(hsv, thresholds[0], thresholds[1]).ravel()
+        del hsv
+
+        if self.compact:
+            self.table = np.packbits(in_range != 0, bitorder='little')
+        else:
+            self.table = in_range
+
+        self.thresholds = thresholds
+        self.build_time = time.perf_counter() - start
+        return True
+
+    def _pixel_indices(self, frame):
+        height, width = frame.shape[:2]
+        if self._index_buffer is None or self._index_buffer.shape[:2] != (height, width):
+            self._index_buffer = np.zeros((height, width, 4), np.uint8)
+        cv2.mixChannels([frame], [self._index_buffer], [0, 0, 1, 1, 2, 2])
+        return self._index_buffer.view(np.uint32)[..., 0]
+
+    def classify(self, frame):
+        """Return a uint8 mask (255 = in range) like cv2.inRange"""
+        if self.table is None:
+            raise RuntimeError("Thresholds not set - call set_thresholds() first")
+
+        indices = self._pixel_indices(frame)
+        if not self.compact:
+            return np.take(self.table, indices)
+
+        bits = np.take(self.table, indices >> 3)
+        bits >>= (indices & 7).astype(np.uint8)
+        bits &= 1
+        bits *= 255
+        return bits
+
+
+def benchmark(width=640, height=480, iterations=200, lower_hsv=(34, 64, 143), upper_hsv=(66, 146, 255)):
+    """Compare cvtColor+inRange with both lookup-table variants on a synthetic frame"""
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+    frame = cv2.GaussianBlur(frame, (15, 15), 0)
+
+    def current_path(f):
+        hsv = cv2.cvtColor(f, cv2.COLOR_BGR2HSV)
+        return hsv_in_range(hsv, lower_hsv, upper_hsv)
+
+    reference = current_path(frame)
+    results = [('cvtColor+inRange', current_path, 0.0, 0)]
+    for compact in (True, False):
+        classifier = BGRLookupClassifier(compact=compact)
+        classifier.set_thresholds(lower_hsv, upper_hsv)
+        name = 'LUT (bit-packed)' if compact else 'LUT (byte)'
+        results.append((name, classifier.classify, classifier.build_time, classifier.table.nbytes))
+
+    print(f"Frame {width}x{height}, HSV {list(lower_hsv)}..{list(upper_hsv)}, OpenCV threads: {cv2.getNumThreads()}")
+    print(f"{'Method':<20}{'ms/frame':>10}{'build ms':>10}{'table KB':>10}{'matches':>9}")
+    for name, fn, build_time, table_bytes in results:
+        mask = fn(frame)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn(frame)
+        per_frame = (time.perf_counter() - start) / iterations * 1000
+        matches = bool(np.array_equal(mask, reference))
+        print(f"{name:<20}{per_frame:>10.3f}{build_time * 1000:>10.0f}{table_bytes / 1024:>10.0f}{str(matches):>9}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the BGR lookup-table classifier')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--single-thread', action='store_true', help='Run OpenCV single-threaded')
+    args = parser.parse_args()
+    if args.single_thread:
+        cv2.setNumThreads(1)
+    benchmark(args.width, args.height, args.iterations)
@@ -0,0 +1,192 @@
+import threading
+import time
+
+from latencyStats import LatencyHistogram
+
+
+class ControlScheduler:
+    """
+    Runs the control law on its own thread at a fixed rate.
+
+    The vision loop publish()es its latest target estimate (the position
+    to steer on and the capture time of its frame); every control tick
+    turns the newest estimate into a motor speed and hands it to the
+    tracker's dispatcher, so the actuation rate no longer depends on the
+    camera, the detector or the GUI. Ticks are scheduled on a
+    time.monotonic() grid: a tick that starts more than one period late
+    counts as a missed deadline, and the grid skips ahead instead of
+    bursting to catch up.
+
+    The speed is the tracker's proportional curve (calculate_motor_speed)
+    plus optional integral and derivative terms on the vertical error:
+      ki: speed per pixel-second of accumulated error
+      kd: speed per pixel/second of error rate (from successive estimates)
+    Estimates older than max_age count as a lost target (STOP).
+    """
+
+    def __init__(self, tracker, rate=50.0, ki=0.0, kd=0.0, max_age=0.25):
+        self.tracker = tracker
+        self.period = 1.0 / rate
+        self.ki = ki
+        self.kd = kd
+        self.max_age = max_age
+        self.paused = False  # While paused no commands are sent (guarded by self._lock)
+
+        # Latest estimate from the vision loop (guarded by self._lock)
+        self._lock = threading.Lock()
+        self._center = None
+        self._frame_shape = None
+        self._timestamp = 0.0
+        self._error_rate = 0.0
+        self._last_error = None
+        self._last_error_time = 0.0
+
+        # Controller state (control thread only)
+        self._integral = 0.0
+        self._last_tick = None
+
+        # Latest output, for the overlay / status
+        self.motor_speed = 0
+        self.command = "STOP - Waiting for vision"
+
+        # Statistics
+        self.ticks = 0
+        self.missed_deadlines = 0
+        self.lateness = LatencyHistogram()  # Tick start minus its scheduled time
+        self.compute_time = LatencyHistogram()
+
+        self._running = False
+        self._thread = None
+
+    def publish(self, center, frame_shape, timestamp):
+        """Called by the vision loop with the position to steer on (or None) and its frame's capture time"""
+        with self._lock:
+            self._center = center
+            self._frame_shape = frame_shape
+            self._timestamp = timestamp
+            if center is None:
+                self._last_error = None
+                self._error_rate = 0.0
+                return
+            error = center[1] - frame_shape[0] // 2
+            if self._last_error is not None and timestamp > self._last_error_time:
+                self._error_rate = (error - self._last_error) / (timestamp - self._last_error_time)
+            self._last_error = error
+            self._last_error_time = timestamp
+
+    def start(self):
+        """Start the control thread"""
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._control_loop, name="ControlScheduler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the control thread (the caller sends the final STOP)"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def pause(self):
+        """Stop sending commands and stop the motors (e.g. emergency stop)"""
+        # Under the lock, so a tick that is mid-way cannot send its speed after the STOP
+        with self._lock:
+            self.paused = True
+            self.tracker.send_motor_command(0)
+
+    def resume(self):
+        with self._lock:
+            self.paused = False
+
+    def _control_loop(self):
+        next_tick = time.monotonic()
+        while self._running:
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            start = time.monotonic()
+            late = start - next_tick
+            self.lateness.add(max(late, 0.0))
+            if late > self.period:
+                # Ticks were skipped: count them and realign to the grid
+                skipped = int(late / self.period)
+                self.missed_deadlines += skipped
+                next_tick += skipped * self.period
+            next_tick += self.period
+
+            self.tick(start)
+            self.compute_time.add(time.monotonic() - start)
+
+    def tick(self, now=None):
+        """Compute and submit one command from the latest estimate. Returns (speed, command text)"""
+        now = time.monotonic() if now is None else now
+        dt = self.period if self._last_tick is None else now - self._last_tick
+        self._last_tick = now
+        self.ticks += 1
+
+        with self._lock:
+            center = self._center
+            frame_shape = self._frame_shape
+            age = now - self._timestamp
+            error_rate = self._error_rate
+        if frame_shape is None:
+            return self.motor_speed, self.command
+
+        tracker = self.tracker
+        if age > self.max_age:
+            center = None
+        speed, command = tracker.calculate_motor_speed(center, frame_shape)
+
+        if speed == 0:
+            # Lost, stale or inside the dead zone: no integral wind-up
+            self._integral = 0.0
+        elif self.ki or self.kd:
+            error = center[1] - frame_shape[0] // 2
+            self._integral += error * dt
+            # Anti-windup: the integral term alone may not exceed max_speed
+            if self.ki:
+                limit = tracker.max_speed / self.ki
+                self._integral = max(-limit, min(limit, self._integral))
+            speed = speed + self.ki * self._integral + self.kd * error_rate
+            speed = int(max(-tracker.max_speed, min(tracker.max_speed, speed)))
+            if 0 < abs(speed) < tracker.min_motor_speed:
+                speed = tracker.min_motor_speed if speed > 0 else -tracker.min_motor_speed
+            direction = "FORWARD" if speed > 0 else "BACKWARD"
+            command = f"{direction} {abs(speed)} - PID (Err: {error:+d}px, I: {self._integral:.0f})"
+
+        self.motor_speed, self.command = speed, command
+        with self._lock:
+            paused = self.paused
+            if not paused:
+                tracker.send_motor_command(speed)
+        if paused:
+            # The integral is only touched by the control thread; hold it at zero while paused
+            self._integral = 0.0
+        return speed, command
+
+    def get_stats(self):
+        """Tick counters and timing (seconds)"""
+        lateness_p50, lateness_p99 = self.lateness.percentiles((50, 99))
+        compute_p50, compute_p99 = self.compute_time.percentiles((50, 99))
+        return {
+            'rate': 1.0 / self.period,
+            'ticks': self.ticks,
+            'missed_deadlines': self.missed_deadlines,
+            'lateness_p50': lateness_p50,
+            'lateness_p99': lateness_p99,
+            'compute_p50': compute_p50,
+            'compute_p99': compute_p99,
+        }
+
+    def gauges(self):
+        """Current values for metric export"""
+        stats = self.get_stats()
+        return {
+            'control_ticks_total': stats['ticks'],
+            'control_missed_deadlines_total': stats['missed_deadlines'],
+            'control_lateness_p99_seconds': stats['lateness_p99'],
+        }
@@ -0,0 +1,45 @@
+import numpy as np
+
+
+class DetectionContext:
+    """
+    Preallocated working buffers and kernels for the detection path.
+
+    buffer(name, shape) returns a view of a named buffer that is only
+    reallocated when a larger shape arrives, so ROI windows, pyramid
+    levels and full frames all reuse the same memory. Views keep the
+    full buffer's row stride, which OpenCV writes into directly.
+
+    Buffers are overwritten by the next call that uses the same name:
+    a mask returned by detect_blob is valid until the next detect_blob.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+        self._kernels = {}
+        self.allocations = 0  # Buffer (re)allocations so far
+
+    def buffer(self, name, shape, dtype=np.uint8):
+        shape = tuple(shape)
+        buffer = self._buffers.get(name)
+        if (buffer is None or buffer.dtype != dtype or buffer.ndim != len(shape)
+                or any(size > capacity for size, capacity in zip(shape, buffer.shape))):
+            if buffer is not None and buffer.ndim == len(shape):
+                # Grow to cover both the old and the new shape
+                shape_to_allocate = tuple(max(a, b) for a, b in zip(shape, buffer.shape))
+            else:
+                shape_to_allocate = shape
+            buffer = self._buffers[name] = np.empty(shape_to_allocate, dtype)
+            self.allocations += 1
+        return buffer[tuple(slice(0, size) for size in shape)]
+
+    def kernel(self, size):
+        """Square all-ones morphology kernel (cached)"""
+        kernel = self._kernels.get(size)
+        if kernel is None:
+            kernel = self._kernels[size] = np.ones((size, size), np.uint8)
+        return kernel
+
+    def release(self):
+        """Drop all buffers (they are recreated on demand)"""
+        self._buffers.clear()
@@ -0,0 +1,271 @@
+import argparse
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from motorTransport import DEFAULT_UDP_PORT, UDP_ACK_MAGIC, UDP_COMMAND_MAGIC, UDP_PACKET, clamp_speed
+
+COMMAND_TIMEOUT = 0.5  # Stop if no command for 500ms (same as firmware)
+
+
+class ESP32Emulator:
+    """
+    Python stand-in for esp32reviever.ino.
+
+    Serves /, /control, /stop and /status over HTTP, accepts the binary
+    UDP motor packets, and applies the same 500ms command timeout as the
+    firmware. Lets the HTTP and UDP transports be compared on one machine.
+    """
+
+    def __init__(self, host='127.0.0.1', http_port=8080, udp_port=DEFAULT_UDP_PORT, verbose=False):
+        self.host = host
+        self.http_port = http_port
+        self.udp_port = udp_port
+        self.verbose = verbose
+
+        # Firmware state (guarded by self.lock)
+        self.lock = threading.Lock()
+        self.boot_time = time.monotonic()  # micros() == 0
+        self.motor_a_speed = 0
+        self.motor_b_speed = 0
+        self.autonomous_mode = False
+        self.last_command_time = 0.0
+        self.last_udp_seq = None
+        self.last_udp_time = 0.0
+        self.command_count = 0
+        self.last_command_us = 0
+
+        # Counters for load testing
+        self.http_commands = 0
+        self.udp_commands = 0
+        self.udp_dropped = 0
+        self.timeouts = 0
+
+        self._running = False
+        self._threads = []
+        self.http_server = None
+        self.udp_sock = None
+
+    # --- Firmware behaviour ---
+
+    def set_motor(self, motor, speed):
+        """handleControl(): apply one motor speed and refresh the timeout"""
+        speed = clamp_speed(speed)
+        with self.lock:
+            if motor == 'A':
+                self.motor_a_speed = speed
+            elif motor == 'B':
+                self.motor_b_speed = speed
+            self.last_command_time = time.monotonic()
+            self.autonomous_mode = True
+            self.command_count += 1
+            self.last_command_us = self.micros(self.last_command_time)
+            self.http_commands += 1
+        if self.verbose:
+            print(f"Motor {motor} → Speed: {speed}")
+
+    def handle_packet(self, data):
+        """Apply a UDP motor packet. Returns the ACK to send, or None if dropped"""
+        if len(data) != UDP_PACKET.size:
+            return None
+        magic, seq, speed_a, speed_b = UDP_PACKET.unpack(data)
+        if magic != UDP_COMMAND_MAGIC:
+            return None
+
+        now = time.monotonic()
+        with self.lock:
+            # Drop out-of-order / stale packets. A long silence means the
+            # sender may have restarted, so any sequence number is accepted.
+            if self.last_udp_seq is not None and now - self.last_udp_time <= COMMAND_TIMEOUT:
+                if ((seq - self.last_udp_seq) & 0xFFFFFFFF) >= 0x80000000 or seq == self.last_udp_seq:
+                    self.udp_dropped += 1
+                    return None
+
+            self.last_udp_seq = seq
+            self.last_udp_time = now
+            self.motor_a_speed = clamp_speed(speed_a)
+            self.motor_b_speed = clamp_speed(speed_b)
+            self.last_command_time = now
+            self.autonomous_mode = True
+            self.command_count += 1
+            self.last_command_us = self.micros(self.last_command_time)
+            self.udp_commands += 1
+            ack = UDP_PACKET.pack(UDP_ACK_MAGIC, seq, self.motor_a_speed, self.motor_b_speed)
+        if self.verbose:
+            print(f"UDP #{seq} → A: {speed_a}, B: {speed_b}")
+        return ack
+
+    def stop_motors(self):
+        """stopMotors()"""
+        with self.lock:
+            self.motor_a_speed = 0
+            self.motor_b_speed = 0
+            self.autonomous_mode = False
+
+    def micros(self, timestamp=None):
+        """Firmware micros() (wraps at 2^32) for a time.monotonic() timestamp (default: now)"""
+        if timestamp is None:
+            timestamp = time.monotonic()
+        return int((timestamp - self.boot_time) * 1e6) & 0xFFFFFFFF
+
+    def get_status(self):
+        """handleStatus() payload"""
+        with self.lock:
+            return {
+                'motorA': self.motor_a_speed,
+                'motorB': self.motor_b_speed,
+                'autonomous': self.autonomous_mode,
+                'commands': self.command_count,
+                'lastCommandUs': self.last_command_us,
+                'lastSeq': self.last_udp_seq or 0,
+                'uptimeUs': self.micros(),
+            }
+
+    def get_stats(self):
+        """Emulator-only counters"""
+        with self.lock:
+            return {
+                'http_commands': self.http_commands,
+                'udp_commands': self.udp_commands,
+                'udp_dropped': self.udp_dropped,
+                'timeouts': self.timeouts,
+            }
+
+    # --- Servers ---
+
+    def start(self):
+        """Start the HTTP server, UDP receiver and timeout watchdog"""
+        self._running = True
+
+        self.http_server = ThreadingHTTPServer((self.host, self.http_port), self._make_handler())
+        self.http_server.daemon_threads = True
+        self.http_port = self.http_server.server_address[1]
+
+        self.udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp_sock.bind((self.host, self.udp_port))
+        self.udp_sock.settimeout(0.1)
+        self.udp_port = self.udp_sock.getsockname()[1]
+
+        for target, name in ((self.http_server.serve_forever, "EmulatorHTTP"),
+                             (self._udp_loop, "EmulatorUDP"),
+                             (self._watchdog_loop, "EmulatorWatchdog")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        """Shut down all servers"""
+        self._running = False
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+        self._threads = []
+        if self.udp_sock is not None:
+            self.udp_sock.close()
+
+    def _udp_loop(self):
+        while self._running:
+            try:
+                data, address = self.udp_sock.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            ack = self.handle_packet(data)
+            if ack is not None:
+                try:
+                    self.udp_sock.sendto(ack, address)
+                except OSError:
+                    pass
+
+    def _watchdog_loop(self):
+        # Safety timeout - stop motors if no command received (firmware loop())
+        while self._running:
+            with self.lock:
+                timed_out = (self.autonomous_mode
+                             and time.monotonic() - self.last_command_time > COMMAND_TIMEOUT
+                             and (self.motor_a_speed != 0 or self.motor_b_speed != 0))
+                if timed_out:
+                    self.timeouts += 1
+            if timed_out:
+                if self.verbose:
+                    print("⚠️ Command timeout - Emergency stop")
+                self.stop_motors()
+            time.sleep(0.005)
+
+    def _make_handler(self):
+        emulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # Keep-alive like a real HTTP/1.1 server, one write per response
+            protocol_version = 'HTTP/1.1'
+            disable_nagle_algorithm = True
+            wbufsize = -1
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                args = parse_qs(url.query)
+
+                if url.path == '/':
+                    self._reply(200, 'text/html', '<html><body><h1>ESP32 Emulator</h1></body></html>')
+                elif url.path == '/control':
+                    motor = args.get('motor', [''])[0]
+                    try:
+                        speed = int(args.get('speed', ['0'])[0])
+                    except ValueError:
+                        speed = 0  # String.toInt() returns 0 on bad input
+                    emulator.set_motor(motor, speed)
+                    self._reply(200, 'text/plain', 'OK')
+                elif url.path == '/stop':
+                    emulator.stop_motors()
+                    self._reply(200, 'text/plain', 'Stopped')
+                elif url.path == '/status':
+                    self._reply(200, 'application/json', json.dumps(emulator.get_status()))
+                elif url.path == '/stats':
+                    self._reply(200, 'application/json', json.dumps(emulator.get_stats()))
+                else:
+                    self._reply(404, 'text/plain', 'Not found')
+
+            def _reply(self, code, content_type, body):
+                body = body.encode()
+                self.send_response(code)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local emulator of the ESP32 motor receiver')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--http-port', type=int, default=8080)
+    parser.add_argument('--udp-port', type=int, default=DEFAULT_UDP_PORT)
+    parser.add_argument('--verbose', action='store_true', help='Log every command like the firmware does')
+    args = parser.parse_args()
+
+    emulator = ESP32Emulator(args.host, args.http_port, args.udp_port, args.verbose).start()
+    print(f"✓ ESP32 emulator running - HTTP {args.host}:{emulator.http_port}, UDP {args.host}:{emulator.udp_port}")
+    print(f"  Point the tracker at {args.host}:{emulator.http_port}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        emulator.stop()
+        print("✓ Emulator stopped")
+
+
+if __name__ == "__main__":
+    main()
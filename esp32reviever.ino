@@ -1,5 +1,6 @@
 #include <WiFi.h>
 #include <WebServer.h>
+#include <WiFiUdp.h>
 
 // Motor driver pins
 const int AIN1 = 13;
@@ -16,6 +17,16 @@ const char* password = "12345678";
 
 WebServer server(80);
 
+// Compact binary motor protocol (see motorTransport.py)
+// Packet: 'M','C', uint32 seq, int16 speedA, int16 speedB (little endian, 10 bytes)
+// ACK:    'M','A', uint32 seq, int16 speedA, int16 speedB
+WiFiUDP udp;
+const int UDP_PORT = 4210;
+const int UDP_PACKET_SIZE = 10;
+uint32_t lastUdpSeq = 0;
+bool haveUdpSeq = false;
+unsigned long lastUdpTime = 0;
+
 // Motor speeds (-255 to 255)
 int motorASpeed = 0;
 int motorBSpeed = 0;
@@ -23,6 +34,8 @@ int motorBSpeed = 0;
 // Autonomous mode tracking
 bool autonomousMode = false;
 unsigned long lastCommandTime = 0;
+unsigned long commandCount = 0; // Applied commands, for latency/load probes (/status)
+unsigned long lastCommandUs = 0; // micros() when the last command was applied
 const unsigned long COMMAND_TIMEOUT = 500; // Stop if no command for 500ms
 
 void setup() {
@@ -62,11 +75,16 @@ void setup() {
   
   server.begin();
   Serial.println("✓ Web server started");
+  
+  udp.begin(UDP_PORT);
+  Serial.print("✓ UDP control on port ");
+  Serial.println(UDP_PORT);
   Serial.println("✓ Ready for autonomous control\n");
 }
 
 void loop() {
   server.handleClient();
+  handleUdp();
   
   // Safety timeout - stop motors if no command received
   if (autonomousMode && (millis() - lastCommandTime > COMMAND_TIMEOUT)) {
@@ -192,6 +210,8 @@ void handleControl() {
   // Update command timestamp
   lastCommandTime = millis();
   autonomousMode = true;
+  commandCount++;
+  lastCommandUs = micros();
   
   // Log command
   Serial.print("Motor ");
@@ -209,6 +229,58 @@ void handleControl() {
   server.send(200, "text/plain", "OK");
 }
 
+void handleUdp() {
+  int packetSize = udp.parsePacket();
+  if (packetSize == 0) {
+    return;
+  }
+  
+  uint8_t buf[UDP_PACKET_SIZE];
+  int len = udp.read(buf, sizeof(buf));
+  if (packetSize != UDP_PACKET_SIZE || len != UDP_PACKET_SIZE || buf[0] != 'M' || buf[1] != 'C') {
+    return;
+  }
+  
+  uint32_t seq = (uint32_t)buf[2] | ((uint32_t)buf[3] << 8) | ((uint32_t)buf[4] << 16) | ((uint32_t)buf[5] << 24);
+  int16_t speedA = (int16_t)(buf[6] | (buf[7] << 8));
+  int16_t speedB = (int16_t)(buf[8] | (buf[9] << 8));
+  
+  // Drop out-of-order / stale packets. After a long silence the sender
+  // may have restarted, so any sequence number is accepted again.
+  unsigned long now = millis();
+  if (haveUdpSeq && (now - lastUdpTime <= COMMAND_TIMEOUT)) {
+    if ((int32_t)(seq - lastUdpSeq) <= 0) {
+      return;
+    }
+  }
+  haveUdpSeq = true;
+  lastUdpSeq = seq;
+  lastUdpTime = now;
+  
+  motorASpeed = constrain(speedA, -255, 255);
+  motorBSpeed = constrain(speedB, -255, 255);
+  controlMotorA(motorASpeed);
+  controlMotorB(motorBSpeed);
+  
+  // Update command timestamp
+  lastCommandTime = now;
+  autonomousMode = true;
+  commandCount++;
+  lastCommandUs = micros();
+  
+  // ACK with the applied speeds
+  uint8_t ack[UDP_PACKET_SIZE];
+  memcpy(ack, buf, UDP_PACKET_SIZE);
+  ack[1] = 'A';
+  ack[6] = motorASpeed & 0xFF;
+  ack[7] = (motorASpeed >> 8) & 0xFF;
+  ack[8] = motorBSpeed & 0xFF;
+  ack[9] = (motorBSpeed >> 8) & 0xFF;
+  udp.beginPacket(udp.remoteIP(), udp.remotePort());
+  udp.write(ack, UDP_PACKET_SIZE);
+  udp.endPacket();
+}
+
 void handleStop() {
   Serial.println("🛑 STOP command received");
   stopMotors();
@@ -216,10 +288,16 @@ void handleStop() {
 }
 
 void handleStatus() {
+  // commands / lastCommandUs / uptimeUs / lastSeq let latencyProbe.py see
+  // when a command reached the PWM pins on the host's clock
   String json = "{";
   json += "\"motorA\":" + String(motorASpeed) + ",";
   json += "\"motorB\":" + String(motorBSpeed) + ",";
-  json += "\"autonomous\":" + String(autonomousMode ? "true" : "false");
+  json += "\"autonomous\":" + String(autonomousMode ? "true" : "false") + ",";
+  json += "\"commands\":" + String(commandCount) + ",";
+  json += "\"lastCommandUs\":" + String(lastCommandUs) + ",";
+  json += "\"lastSeq\":" + String(lastUdpSeq) + ",";
+  json += "\"uptimeUs\":" + String(micros());
   json += "}";
   
   server.send(200, "application/json", json);
@@ -0,0 +1,192 @@
+import threading
+import time
+
+# A camera that delivers nothing for this long counts as failed (seconds);
+# opening a camera can take a while, so the first frame gets longer
+STALL_TIMEOUT = 5.0
+STARTUP_TIMEOUT = 15.0
+
+
+class FrameSubscription:
+    """
+    One consumer of a LatestFrameGrabber's frames.
+
+    Frames are shared, read-only arrays (never copied or reused by the
+    grabber). Each subscriber reads at its own pace: frames it did not
+    get to are counted as dropped for that subscriber only. max_fps
+    limits how often read()/latest() hand out a new frame.
+    """
+
+    def __init__(self, grabber, name, max_fps=None):
+        self.grabber = grabber
+        self.name = name
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+        self.last_id = 0
+        self.last_time = 0.0
+        self.frames_read = 0
+        self.dropped_frames = 0
+
+    def _take(self):
+        # Caller holds the grabber's condition lock
+        grabber = self.grabber
+        if self.last_id:
+            self.dropped_frames += grabber._frame_id - self.last_id - 1
+        self.last_id = grabber._frame_id
+        self.last_time = time.monotonic()
+        self.frames_read += 1
+        return True, grabber._frame, grabber._timestamp, self.dropped_frames
+
+    def read(self, timeout=1.0):
+        """
+        Wait for a frame newer than the last one returned (and for the rate limit).
+        Returns: (ret, frame, capture_timestamp, dropped_frames)
+        """
+        grabber = self.grabber
+        deadline = time.monotonic() + timeout
+        with grabber._cond:
+            while True:
+                now = time.monotonic()
+                remaining = deadline - now
+                if not grabber._running or remaining <= 0:
+                    return False, None, 0.0, self.dropped_frames
+                rate_wait = self.last_time + self.min_interval - now
+                if grabber._frame_id != self.last_id and rate_wait <= 0:
+                    return self._take()
+                grabber._cond.wait(min(remaining, rate_wait) if rate_wait > 0 else remaining)
+
+    def latest(self):
+        """Non-blocking read: the newest frame if it is new and the rate limit allows, else ret=False"""
+        grabber = self.grabber
+        with grabber._cond:
+            if (grabber._frame_id == self.last_id
+                    or time.monotonic() - self.last_time < self.min_interval):
+                return False, None, 0.0, self.dropped_frames
+            return self._take()
+
+    def close(self):
+        self.grabber.unsubscribe(self)
+
+
+class LatestFrameGrabber:
+    """
+    Reads frames from a cv2.VideoCapture on a background thread.
+
+    Only the newest frame is kept (one-slot buffer). Frames that are
+    overwritten before anyone reads them are counted as dropped instead
+    of being queued, so the tracker always steers on the freshest image.
+
+    The grabber is also the single frame source for everything else in
+    the process: subscribe() gives the calibration preview, recorders etc.
+    zero-copy, read-only access to the same frames without opening the
+    camera a second time.
+    """
+
+    def __init__(self, cap, max_fps=None):
+        self.cap = cap
+
+        # One-slot buffer (guarded by the condition's lock)
+        self._cond = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0
+        self._frame_id = 0
+
+        # The tracker's own read() is the primary subscription (max_fps caps the vision rate)
+        self._primary = FrameSubscription(self, 'primary', max_fps)
+        self.subscriptions = [self._primary]
+
+        # Statistics
+        self.frames_captured = 0
+        self.failed_reads = 0
+
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the background capture thread"""
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="FrameGrabber", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background capture thread"""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _capture_loop(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            # Timestamp as soon as the driver hands the frame over
+            timestamp = time.monotonic()
+
+            if not ret:
+                self.failed_reads += 1
+                with self._cond:
+                    self._cond.notify_all()
+                time.sleep(0.005)
+                continue
+
+            # Subscribers share this array: make sure nobody draws on it
+            frame.flags.writeable = False
+            with self._cond:
+                self._frame = frame
+                self._timestamp = timestamp
+                self._frame_id += 1
+                self.frames_captured += 1
+                self._cond.notify_all()
+
+    def read(self, timeout=1.0):
+        """
+        Wait for a frame newer than the last one returned.
+        Returns: (ret, frame, capture_timestamp, dropped_frames)
+
+        capture_timestamp uses time.monotonic(). The frame is read-only
+        (shared with subscribers): copy it before drawing on it.
+        """
+        return self._primary.read(timeout)
+
+    def camera_failed(self, timeouts, timeout=1.0):
+        """
+        True if the camera should be given up on after `timeouts` consecutive
+        read(timeout) calls returned nothing: the grabber was stopped, or no
+        frame arrived for STALL_TIMEOUT (STARTUP_TIMEOUT before the first frame).
+        A single timeout is only a slow or stalled camera: read again.
+        """
+        if not self._running:
+            return True
+        limit = STARTUP_TIMEOUT if self.frames_captured == 0 else STALL_TIMEOUT
+        return timeouts * timeout >= limit
+
+    @property
+    def dropped_frames(self):
+        """Stale frames the primary reader never got to"""
+        return self._primary.dropped_frames
+
+    def subscribe(self, name, max_fps=None):
+        """Add a consumer that reads frames at its own rate. Returns a FrameSubscription"""
+        subscription = FrameSubscription(self, name, max_fps)
+        with self._cond:
+            # Start from the current frame, not from frame 0
+            subscription.last_id = self._frame_id
+            self.subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._cond:
+            if subscription in self.subscriptions:
+                self.subscriptions.remove(subscription)
+
+    def frame_age(self, timestamp):
+        """Seconds elapsed since the given capture timestamp"""
+        return time.monotonic() - timestamp
+
+    def release(self):
+        """Stop the thread and release the underlying camera"""
+        self.stop()
+        self.cap.release()
@@ -0,0 +1,184 @@
+import signal
+import socket
+import time
+
+DEFAULT_CONTROL_PORT = 5005
+
+
+class HeadlessController:
+    """
+    Stop / emergency-stop input for runs without a GUI.
+
+    - SIGINT / SIGTERM: stop and exit
+    - SIGUSR1: toggle emergency stop (POSIX only)
+    - Optional UDP control socket on localhost accepting text commands:
+      'quit', 'estop', 'resume', 'status'
+
+      e.g.  echo -n estop | nc -u -w1 127.0.0.1 5005
+    """
+
+    def __init__(self, control_port=None):
+        self.quit_requested = False
+        self.emergency_stopped = False
+        self.status_provider = None  # Callable returning a status string for 'status'
+
+        self.sock = None
+        if control_port:
+            self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.sock.bind(('127.0.0.1', control_port))
+            self.sock.setblocking(False)
+
+        # Previous handlers, restored by close()
+        self._previous_handlers = {
+            signal.SIGINT: signal.signal(signal.SIGINT, self._on_quit_signal),
+            signal.SIGTERM: signal.signal(signal.SIGTERM, self._on_quit_signal),
+        }
+        if hasattr(signal, 'SIGUSR1'):
+            self._previous_handlers[signal.SIGUSR1] = signal.signal(signal.SIGUSR1, self._on_estop_signal)
+
+    def _on_quit_signal(self, signum, frame):
+        self.quit_requested = True
+
+    def _on_estop_signal(self, signum, frame):
+        self.emergency_stopped = not self.emergency_stopped
+
+    def poll(self):
+        """Handle pending control socket commands (non-blocking)"""
+        if self.sock is None:
+            return
+        while True:
+            try:
+                data, address = self.sock.recvfrom(256)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+
+            command = data.decode(errors='ignore').strip().lower()
+            if command in ('quit', 'stop', 'q'):
+                self.quit_requested = True
+                reply = 'OK quitting'
+            elif command == 'estop':
+                self.emergency_stopped = True
+                reply = 'OK emergency stop'
+            elif command == 'resume':
+                self.emergency_stopped = False
+                reply = 'OK resumed'
+            elif command == 'status':
+                reply = self.status_provider() if self.status_provider else 'OK'
+            else:
+                reply = f"ERR unknown command '{command}'"
+            try:
+                self.sock.sendto(reply.encode(), address)
+            except OSError:
+                pass
+
+    def close(self):
+        for signum, handler in self._previous_handlers.items():
+            signal.signal(signum, handler)
+        self._previous_handlers = {}
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+
+def run_headless(tracker, grabber, control_port=DEFAULT_CONTROL_PORT, status_interval=5.0,
+                 exporter=None, recorder=None):
+    """
+    Detect -> control loop with no overlay, windows or key handling.
+    Runs as fast as the camera delivers frames.
+    """
+    controller = HeadlessController(control_port)
+    timer = tracker.stage_timer
+    scheduler = tracker.control_scheduler
+    frames = 0
+    window_start = time.monotonic()
+    fps = 0.0
+    last_command = "STOP"
+
+    def status():
+        state = 'ESTOP' if controller.emergency_stopped else 'RUNNING'
+        text = f"{state} fps={fps:.1f} dropped={tracker.dropped_frames} command='{last_command}'"
+        if scheduler is not None:
+            text += f" control_missed={scheduler.missed_deadlines}"
+        return text
+
+    controller.status_provider = status
+    if control_port:
+        print(f"✓ Control socket on udp://127.0.0.1:{control_port} (quit / estop / resume / status)")
+    print("✓ Headless tracking started - SIGINT/SIGTERM to stop, SIGUSR1 to toggle emergency stop")
+
+    was_stopped = False
+    read_timeouts = 0  # Consecutive grabber.read() timeouts
+    try:
+        while not controller.quit_requested:
+            controller.poll()
+
+            timer.begin_frame()
+            ret, frame, frame_time, dropped = grabber.read()
+            if not ret:
+                read_timeouts += 1
+                if grabber.camera_failed(read_timeouts):
+                    if not controller.quit_requested:
+                        print("Failed to grab frame")
+                    break
+                continue
+            read_timeouts = 0
+            tracker.set_frame_info(frame_time, dropped)
+            timer.mark('cap.read')
+
+            center, area = tracker.track_blob(frame)
+            tracker.report_startup()
+            control_center = tracker.predict_target(center)
+            motor_speed, last_command = tracker.calculate_motor_speed(control_center, frame.shape)
+            timer.mark('calculate_motor_speed')
+
+            command_sent = False
+            if scheduler is not None:
+                scheduler.publish(control_center, frame.shape, frame_time)
+            if controller.emergency_stopped:
+                if not was_stopped:
+                    print("\n⚠️ EMERGENCY STOP!")
+                    if scheduler is not None:
+                        scheduler.pause()
+                    else:
+                        tracker.send_motor_command(0)
+                was_stopped = True
+                motor_speed, last_command = 0, "STOPPED - Emergency stop"
+            else:
+                if was_stopped:
+                    print("\n▶ Tracking resumed")
+                    if scheduler is not None:
+                        scheduler.resume()
+                was_stopped = False
+                if scheduler is not None:
+                    # The control thread sends the commands
+                    motor_speed, last_command = scheduler.motor_speed, scheduler.command
+                else:
+                    current_time = time.time()
+                    if current_time - tracker.last_command_time >= tracker.command_interval:
+                        if tracker.send_motor_command(motor_speed):
+                            tracker.last_command_time = current_time
+                            command_sent = True
+                            timer.record('frame_to_command', time.monotonic() - frame_time)
+            timer.mark('send_motor_command')
+
+            if recorder is not None:
+                seq = recorder.record_frame(frame, frame_time)
+                recorder.record_result(seq, frame_time, center, area, tracker.lead_time)
+                recorder.record_command(seq, time.monotonic(), motor_speed, last_command, command_sent)
+            timer.end_frame()
+            if tracker.quality_governor is not None:
+                tracker.quality_governor.update(time.monotonic() - frame_time)
+            if exporter is not None:
+                exporter.maybe_export()
+
+            frames += 1
+            elapsed = time.monotonic() - window_start
+            if elapsed >= status_interval:
+                fps = frames / elapsed
+                frames = 0
+                window_start = time.monotonic()
+                print(status())
+    finally:
+        controller.close()
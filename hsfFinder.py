@@ -2,9 +2,9 @@
 import cv2
 from tkinter import *
 from tkinter import messagebox
-from PIL import Image, ImageTk
-import numpy as np
 import pyperclip
+from previewRenderer import PreviewRenderer
+from calibrationProfiles import ProfileStore
 
 # Author and version information
 __author__ = "Teeraphat Kullanankanjana"
@@ -56,6 +56,10 @@ class HSVRangeFinder:
         self.vidLabel3.configure(width=300, height=400)
         self.vidLabel3.pack()
 
+        # Renders all three previews at display size, reusing its buffers
+        self.renderer = PreviewRenderer((self.vidLabel1, self.vidLabel2, self.vidLabel3))
+        self.frame_count = 0
+
         # --- Camera Control Frame ---
         self.cameraControlFrame = LabelFrame(self.window, text='Camera Control')
         self.cameraControlFrame.place(x=0, y=425)
@@ -188,6 +192,27 @@ class HSVRangeFinder:
         self.cpylowwerBtn = Button(self.resultFrame, text='Copy', command=self.get_upperRange)
         self.cpylowwerBtn.grid(row=3, column=3, rowspan=3)
 
+        # Save the range to a calibration profile the tracker loads at startup
+        self.profileStore = ProfileStore()
+        self.profileName = StringVar(value=self.profileStore.active or 'default')
+        self.profileEntry = Entry(self.resultFrame, textvariable=self.profileName, width=10)
+        self.profileEntry.grid(row=6, column=0, columnspan=2)
+        self.saveProfileBtn = Button(self.resultFrame, text='Save Profile', command=self.save_profile)
+        self.saveProfileBtn.grid(row=6, column=2, columnspan=2)
+
+        # Start from the saved range of that profile, if any
+        profile = self.profileStore.get(self.profileName.get())
+        if profile and 'lower_hsv' in profile:
+            for var, value in zip((self.l_h, self.l_s, self.l_v, self.u_h, self.u_s, self.u_v),
+                                  profile['lower_hsv'] + profile['upper_hsv']):
+                var.set(value)
+            self.lh_changed(None)
+            self.ls_changed(None)
+            self.lv_changed(None)
+            self.uh_changed(None)
+            self.us_changed(None)
+            self.uv_changed(None)
+
     # Method to copy the lower HSV range to clipboard
     def get_lowerRange(self):
         lowerRange = '{},{},{}'.format(self.get_lh(), self.get_ls(), self.get_lv())
@@ -198,6 +223,15 @@ class HSVRangeFinder:
         upperRange = '{},{},{}'.format(self.get_uh(), self.get_us(), self.get_uv())
         pyperclip.copy(upperRange)
 
+    # Method to save the HSV range to the selected calibration profile
+    def save_profile(self):
+        name = self.profileName.get().strip() or 'default'
+        self.profileStore.save(name, {
+            'lower_hsv': [int(self.l_h.get()), int(self.l_s.get()), int(self.l_v.get())],
+            'upper_hsv': [int(self.u_h.get()), int(self.u_s.get()), int(self.u_v.get())],
+        })
+        messagebox.showinfo("Profile saved", "Saved HSV range to profile '{}'".format(name))
+
     # Method to flip the camera feed horizontally
     def flip_horizontal(self):
         self.flip_horizontal = not self.flip_horizontal
@@ -231,60 +265,26 @@ class HSVRangeFinder:
         # Read a frame from the video capture
         ret, frame = self.cap.read()
         if not ret:
-            self.window.after(10, self.update_frame)
+            self.window.after(self.renderer.poll_ms, self.update_frame)
             return
+        self.frame_count += 1
+
+        # Flip is applied to the downsampled preview, not the full frame
+        flip = None
         if self.flip_horizontal:
-            frame = cv2.flip(frame, 1)  # Horizontal mirror
+            flip = 1  # Horizontal mirror
         elif self.flip_vertical:
-            frame = cv2.flip(frame, 0)  # Vertical flip
-        
-        # Get the lower and upper bound values from the sliders
-        lower_bound = np.array([self.l_h.get(), self.l_s.get(), self.l_v.get()])
-        upper_bound = np.array([self.u_h.get(), self.u_s.get(), self.u_v.get()])
-
-        # Convert the frame to the HSV color space
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-
-        # Get the binary mask
-        mask = cv2.inRange(hsv, lower_bound, upper_bound)
+            flip = 0  # Vertical flip
 
-        # Filter the original frame using the mask
-        filtered_frame = cv2.bitwise_and(frame, frame, mask=mask)
+        # Get the lower and upper bound values from the sliders
+        lower_bound = (self.l_h.get(), self.l_s.get(), self.l_v.get())
+        upper_bound = (self.u_h.get(), self.u_s.get(), self.u_v.get())
 
-        # Convert the filtered frame to grayscale
-        gray = cv2.cvtColor(filtered_frame, cv2.COLOR_BGR2GRAY)
+        # Downsample once, then mask, filter and update the reused PhotoImages
+        self.renderer.render(frame, self.frame_count, lower_bound, upper_bound, flip)
 
-        # Threshold the grayscale image to get a binary image
-        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY)
-        
-        # Convert the frame to a PhotoImage object
-        img1 = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img1 = Image.fromarray(img1)
-        img1 = ImageTk.PhotoImage(image=img1)
-
-        # Convert the filtered frame to a PhotoImage object
-        img2 = cv2.cvtColor(filtered_frame, cv2.COLOR_BGR2RGB)
-        img2 = Image.fromarray(img2)
-        img2 = ImageTk.PhotoImage(image=img2)
-
-        # Convert the binary image to a PhotoImage object
-        img3 = cv2.cvtColor(binary, cv2.COLOR_GRAY2RGB)
-        img3 = Image.fromarray(img3)
-        img3 = ImageTk.PhotoImage(image=img3)
-
-        # Update the label's image
-        self.vidLabel1.config(image=img1)
-        self.vidLabel1.image = img1
-
-        # Update the label's image with the filtered frame
-        self.vidLabel2.config(image=img2)
-        self.vidLabel2.image = img2
-
-        self.vidLabel3.config(image=img3)
-        self.vidLabel3.image = img3
-
-        # Schedule the next frame update
-        self.window.after(10, self.update_frame)
+        # Schedule the next frame update (capped at the preview rate)
+        self.window.after(self.renderer.poll_ms, self.update_frame)
 
     # Getter method to format lower hue value
     def get_lh(self):
@@ -0,0 +1,296 @@
+import argparse
+import time
+
+import numpy as np
+import requests
+
+from benchmarkTracker import make_synthetic_frame, make_tracker
+from blobDetection import open_camera
+from esp32Emulator import ESP32Emulator
+from frameGrabber import LatestFrameGrabber
+from motorTransport import DEFAULT_UDP_PORT, HttpTransport, UdpTransport
+from transportLoadTest import run_load_test
+
+# Loop stages reported by run_probe, in order (seconds between the two events)
+PROBE_STAGES = [
+    ('capture_to_detect', "frame captured -> target found"),
+    ('detect_to_send', "target found -> command sent"),
+    ('send_to_ack', "command sent -> transport returned"),
+    ('send_to_applied', "command sent -> applied to the PWM pins"),
+    ('glass_to_motor', "frame captured -> applied to the PWM pins"),
+]
+
+
+class StatusClock:
+    """
+    Reads the receiver's /status and maps its micros() onto time.monotonic().
+
+    Each read is stamped with the local send/receive times; the device
+    clock offset comes from the read with the smallest round trip (its
+    reply was produced within rtt/2 of the midpoint), so applied times are
+    accurate to +-best_rtt/2. Firmware without lastCommandUs/uptimeUs falls
+    back to the time a status read first showed the command (an upper bound).
+    """
+
+    def __init__(self, esp32_ip, timeout=0.3):
+        self.url = f"http://{esp32_ip}/status"
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.best_rtt = None
+        self._sync_uptime = 0  # Device micros() at the best read
+        self._sync_local = 0.0  # Local time of the best read's midpoint
+        self.has_timing = False
+
+    def read(self):
+        """Returns (status dict, local receive time), or (None, time) on failure"""
+        sent = time.monotonic()
+        try:
+            status = self.session.get(self.url, timeout=self.timeout).json()
+        except (requests.RequestException, ValueError):
+            return None, time.monotonic()
+        received = time.monotonic()
+
+        self.has_timing = 'uptimeUs' in status and 'lastCommandUs' in status
+        rtt = received - sent
+        if self.has_timing and (self.best_rtt is None or rtt < self.best_rtt):
+            self.best_rtt = rtt
+            self._sync_uptime = status['uptimeUs']
+            self._sync_local = (sent + received) / 2
+        return status, received
+
+    def sync(self, reads=20):
+        """Take a few reads to find a low round trip. Returns True if the firmware reports its clock"""
+        for _ in range(reads):
+            self.read()
+        return self.has_timing
+
+    def to_local(self, device_us):
+        """time.monotonic() of a device micros() value (wrap-safe within ~35 minutes of the sync)"""
+        delta = (device_us - self._sync_uptime) & 0xFFFFFFFF
+        if delta >= 0x80000000:
+            delta -= 0x100000000
+        return self._sync_local + delta / 1e6
+
+    def wait_for(self, speed_a, speed_b, commands_before, timeout=0.5):
+        """
+        Poll /status until the receiver has applied (speed_a, speed_b).
+        Returns the local time it was applied, or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            status, received = self.read()
+            if status is None:
+                continue
+            applied = status['motorA'] == speed_a and status['motorB'] == speed_b
+            if applied and status.get('commands', commands_before + 1) > commands_before:
+                return self.to_local(status['lastCommandUs']) if self.has_timing else received
+        return None
+
+    def commands(self):
+        """Applied command count (None if unavailable)"""
+        status, _ = self.read()
+        return status.get('commands') if status else None
+
+    def close(self):
+        self.session.close()
+
+
+def summarize(samples):
+    """Percentiles and jitter (ms) of a list of seconds"""
+    values = np.array(samples) * 1000 if samples else np.zeros(1)
+    p50, p95, p99 = np.percentile(values, (50, 95, 99))
+    return {
+        'p50': float(p50),
+        'p95': float(p95),
+        'p99': float(p99),
+        'max': float(values.max()),
+        'jitter': float(values.std()),  # Standard deviation
+        'spread': float(p99 - p50),
+    }
+
+
+def run_probe(transport, clock, tracker, next_frame, samples=50, interval=0.1):
+    """
+    Time samples full loop iterations: frame -> track_blob -> command -> /status.
+
+    next_frame() returns (frame, capture time). The commanded speed is a
+    probe marker (distinct per sample, alternating sign) rather than the
+    tracker's output, so each command can be recognised in /status.
+    Returns ({stage: [seconds]}, lost command count).
+    """
+    stages = {name: [] for name, _ in PROBE_STAGES}
+    lost = 0
+    for i in range(samples):
+        commands_before = clock.commands() or 0
+        frame, captured = next_frame()
+        center, area = tracker.track_blob(frame)
+        tracker.calculate_motor_speed(tracker.predict_target(center), frame.shape)
+        detected = time.monotonic()
+
+        speed = (100 + i % 100) * (1 if i % 2 == 0 else -1)
+        sent = time.monotonic()
+        ok = transport.send(speed, speed)
+        acked = time.monotonic()
+        applied = clock.wait_for(speed, speed, commands_before) if ok else None
+        if applied is None:
+            lost += 1
+        else:
+            stages['capture_to_detect'].append(detected - captured)
+            stages['detect_to_send'].append(sent - detected)
+            stages['send_to_ack'].append(acked - sent)
+            stages['send_to_applied'].append(applied - sent)
+            stages['glass_to_motor'].append(applied - captured)
+
+        delay = interval - (time.monotonic() - captured)
+        if delay > 0:
+            time.sleep(delay)
+    transport.send(0, 0)
+    return stages, lost
+
+
+def find_max_rate(transport, clock, start_rate=20, max_rate=5000, factor=1.5, duration=2.0,
+                  max_loss=0.01, min_rate_fraction=0.95):
+    """
+    Sustained load test: step the command rate up until the receiver falls behind.
+
+    A rate passes if the sender keeps up (min_rate_fraction of the target)
+    and at most max_loss of the commands fail or never get applied
+    (commands counter in /status; HTTP applies two per command).
+    Returns (highest passing rate or 0, list of per-step result dicts).
+    """
+    per_send = 2 if isinstance(transport, HttpTransport) else 1
+    steps = []
+    best = 0
+    rate = start_rate
+    while rate <= max_rate:
+        before = clock.commands()
+        result = run_load_test(transport, rate, duration)
+        transport.send(0, 0)
+        time.sleep(0.05)
+        after = clock.commands()
+
+        result['target'] = rate
+        if before is not None and after is not None:
+            # Minus the stop command sent above
+            result['applied'] = (after - before) // per_send - 1
+            result['dropped'] = max(0, result['sent'] - result['failed'] - result['applied'])
+        else:
+            result['applied'] = result['dropped'] = None
+        lost = result['failed'] + (result['dropped'] or 0)
+        result['loss'] = lost / max(result['sent'], 1)
+        kept_up = result['rate'] >= rate * min_rate_fraction
+        result['passed'] = kept_up and result['loss'] <= max_loss
+        # A blocking sender that cannot reach the rate is limited by round trips, not by drops
+        result['verdict'] = 'ok' if result['passed'] else ('lost commands' if kept_up else 'sender limited')
+        steps.append(result)
+        if not result['passed']:
+            break
+        best = rate
+        rate = round(rate * factor)
+    return best, steps
+
+
+def print_probe_report(name, stages, lost, samples, clock):
+    print(f"\n{name}: {samples - lost}/{samples} commands seen applied")
+    if clock.has_timing:
+        print(f"  Receiver clock synced to +-{clock.best_rtt * 500:.2f}ms")
+    else:
+        print("  Firmware does not report its clock: applied times are when /status first showed them")
+    print(f"  {'Stage':<20}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'jitter':>9}  ")
+    for stage, description in PROBE_STAGES:
+        s = summarize(stages[stage])
+        print(f"  {stage:<20}{s['p50']:>9.2f}{s['p95']:>9.2f}{s['p99']:>9.2f}{s['max']:>9.2f}"
+              f"{s['jitter']:>9.2f}  {description}")
+
+
+def print_load_report(name, best, steps):
+    print(f"\n{name} sustained load:")
+    print(f"  {'Target/s':>9}{'Sent/s':>9}{'Sent':>8}{'Failed':>8}{'Dropped':>9}{'p99 ms':>9}  Result")
+    for step in steps:
+        dropped = '-' if step['dropped'] is None else step['dropped']
+        print(f"  {step['target']:>9}{step['rate']:>9.0f}{step['sent']:>8}{step['failed']:>8}{dropped:>9}"
+              f"{step['p99']:>9.2f}  {step['verdict']}")
+    print(f"  Maximum sustained command rate: {best} commands/s" if best else
+          "  Receiver could not sustain even the lowest rate")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure glass-to-motor latency and the maximum command rate')
+    parser.add_argument('--target', default=None,
+                        help='ESP32 address (host[:http_port]); default starts a local emulator')
+    parser.add_argument('--udp-port', type=int, default=DEFAULT_UDP_PORT)
+    parser.add_argument('--transport', default='both', choices=['http', 'udp', 'both'])
+    parser.add_argument('--camera', type=int, default=None,
+                        help='Camera index for real frames (default: synthetic frames, capture time = read time)')
+    parser.add_argument('--samples', type=int, default=50, help='Probe iterations per transport')
+    parser.add_argument('--interval', type=float, default=0.1, help='Seconds between probe iterations')
+    parser.add_argument('--load-test', action='store_true', help='Also find the maximum sustained command rate')
+    parser.add_argument('--step-duration', type=float, default=2.0, help='Seconds per load test rate step')
+    parser.add_argument('--max-rate', type=float, default=5000, help='Highest command rate to try')
+    args = parser.parse_args()
+
+    emulator = None
+    target = args.target
+    udp_port = args.udp_port
+    if target is None:
+        emulator = ESP32Emulator(http_port=0, udp_port=0).start()
+        target = f"127.0.0.1:{emulator.http_port}"
+        udp_port = emulator.udp_port
+        print(f"✓ Started local ESP32 emulator at {target} (UDP {udp_port})")
+    else:
+        print("⚠️  The probe drives the motors back and forth - lift the wheels off the ground")
+
+    tracker = make_tracker()
+    grabber = None
+    if args.camera is not None:
+        cap = open_camera(args.camera)
+        if cap is None:
+            print(f"✗ Could not open camera {args.camera}")
+            return
+        grabber = LatestFrameGrabber(cap).start()
+
+        def next_frame():
+            while True:
+                ok, frame, timestamp, _ = grabber.read()
+                if ok:
+                    return frame, timestamp
+    else:
+        synthetic = make_synthetic_frame(640, 480, 20, noise=8)
+
+        def next_frame():
+            return synthetic, time.monotonic()
+
+    clock = StatusClock(target)
+    if not clock.sync():
+        print("✗ /status has no timing fields (older firmware?) - falling back to polling times")
+
+    transports = []
+    if args.transport in ('http', 'both'):
+        transports.append(('HTTP', lambda: HttpTransport(target)))
+    if args.transport in ('udp', 'both'):
+        transports.append(('UDP', lambda: UdpTransport(target, port=udp_port, wait_ack=True)))
+
+    try:
+        for name, factory in transports:
+            transport = factory()
+            try:
+                stages, lost = run_probe(transport, clock, tracker, next_frame, args.samples, args.interval)
+                print_probe_report(name, stages, lost, args.samples, clock)
+                if args.load_test:
+                    best, steps = find_max_rate(transport, clock, max_rate=args.max_rate,
+                                                duration=args.step_duration)
+                    print_load_report(name, best, steps)
+            finally:
+                transport.send(0, 0)
+                transport.close()
+    finally:
+        clock.close()
+        if grabber is not None:
+            grabber.release()
+        if emulator is not None:
+            print(f"\nEmulator counters: {emulator.get_stats()}")
+            emulator.stop()
+
+
+if __name__ == "__main__":
+    main()
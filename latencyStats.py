@@ -0,0 +1,184 @@
+import os
+import time
+
+import numpy as np
+
+# Histogram bucket upper bounds (seconds) for the Prometheus export: 0.1ms .. 10s
+BUCKET_BOUNDS = np.array([0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                          0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0])
+
+
+class LatencyHistogram:
+    """
+    Latency samples for one stage.
+
+    Keeps the last `window` samples in a ring buffer for rolling
+    percentiles, plus cumulative bucket counts for histogram export.
+    """
+
+    def __init__(self, window=512):
+        self.samples = np.zeros(window)
+        self.window = window
+        self.index = 0
+        self.filled = 0
+        self.count = 0
+        self.total = 0.0
+        self.bucket_counts = np.zeros(len(BUCKET_BOUNDS) + 1, np.int64)  # Last bucket = +Inf
+
+    def add(self, seconds):
+        self.samples[self.index] = seconds
+        self.index = (self.index + 1) % self.window
+        self.filled = min(self.filled + 1, self.window)
+        self.count += 1
+        self.total += seconds
+        self.bucket_counts[np.searchsorted(BUCKET_BOUNDS, seconds)] += 1
+
+    def percentiles(self, quantiles=(50, 95, 99)):
+        """Rolling percentiles in seconds (zeros if empty)"""
+        if self.filled == 0:
+            return [0.0] * len(quantiles)
+        return [float(v) for v in np.percentile(self.samples[:self.filled], quantiles)]
+
+
+class StageTimer:
+    """
+    Per-stage timing for the tracking loop.
+
+    begin_frame() starts a frame, mark(stage) charges the time since the
+    previous mark to `stage` (stages hit twice in one frame are summed),
+    end_frame() commits the frame. When disabled every call returns
+    immediately.
+    """
+
+    def __init__(self, enabled=False, window=512):
+        self.enabled = enabled
+        self.window = window
+        self.histograms = {}
+        self._frame = {}
+        self._frame_start = 0.0
+        self._last_mark = 0.0
+        self._summary = {}
+        self._summary_time = 0.0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self._frame_start = self._last_mark = time.perf_counter()
+        self._frame.clear()
+
+    def mark(self, stage):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self._frame[stage] = self._frame.get(stage, 0.0) + now - self._last_mark
+        self._last_mark = now
+
+    def record(self, name, seconds):
+        """Record a measured duration directly (e.g. frame-to-command latency)"""
+        if not self.enabled:
+            return
+        self._frame[name] = seconds
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        self._frame['loop'] = time.perf_counter() - self._frame_start
+        for stage, seconds in self._frame.items():
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram(self.window)
+            histogram.add(seconds)
+        self._frame.clear()
+
+    def summary(self, max_age=0.25):
+        """{stage: (p50, p95, p99, count)} in seconds, recomputed at most every max_age seconds"""
+        now = time.monotonic()
+        if now - self._summary_time >= max_age:
+            self._summary = {stage: tuple(histogram.percentiles()) + (histogram.count,)
+                             for stage, histogram in self.histograms.items()}
+            self._summary_time = now
+        return self._summary
+
+    def overlay_lines(self):
+        """Short text lines for the video overlay"""
+        lines = ["Stage                p50/p95/p99 ms"]
+        for stage, (p50, p95, p99, _) in self.summary().items():
+            lines.append(f"{stage[:20]:<20} {p50 * 1000:.1f}/{p95 * 1000:.1f}/{p99 * 1000:.1f}")
+        return lines
+
+
+class MetricsExporter:
+    """
+    Periodically writes StageTimer percentiles to a file.
+
+    '.csv' paths get one appended row per stage per export; anything else
+    is written as Prometheus text format (replaced atomically), suitable
+    for the node_exporter textfile collector.
+
+    gauges is an optional callable returning {name: value} for extra
+    point-in-time values (e.g. the quality governor's level).
+    """
+
+    def __init__(self, timer, path, interval=5.0, prefix='blob_tracker', gauges=None):
+        self.timer = timer
+        self.gauges = gauges
+        self.path = path
+        self.interval = interval
+        self.prefix = prefix
+        self.csv = path.lower().endswith('.csv')
+        self.last_export = time.monotonic()
+
+    def maybe_export(self):
+        """Export if the interval has elapsed. Cheap to call every frame"""
+        now = time.monotonic()
+        if now - self.last_export < self.interval:
+            return False
+        self.last_export = now
+        self.export()
+        return True
+
+    def export(self):
+        if self.csv:
+            self._export_csv()
+        else:
+            self._export_prometheus()
+
+    def _export_csv(self):
+        new_file = not os.path.exists(self.path)
+        timestamp = time.time()
+        with open(self.path, 'a') as f:
+            if new_file:
+                f.write("timestamp,stage,count,p50_ms,p95_ms,p99_ms\n")
+            for stage, histogram in self.timer.histograms.items():
+                p50, p95, p99 = histogram.percentiles()
+                f.write(f"{timestamp:.3f},{stage},{histogram.count},"
+                        f"{p50 * 1000:.3f},{p95 * 1000:.3f},{p99 * 1000:.3f}\n")
+            # Gauges: value in the count column, no percentiles
+            for gauge, value in (self.gauges() if self.gauges else {}).items():
+                f.write(f"{timestamp:.3f},{gauge},{value:g},,,\n")
+
+    def _export_prometheus(self):
+        name = f"{self.prefix}_stage_seconds"
+        lines = [f"# HELP {name} Tracking loop stage latency",
+                 f"# TYPE {name} histogram"]
+        quantile_lines = [f"# HELP {name}_rolling Rolling latency percentiles",
+                          f"# TYPE {name}_rolling gauge"]
+        for stage, histogram in self.timer.histograms.items():
+            cumulative = np.cumsum(histogram.bucket_counts)
+            for bound, count in zip(BUCKET_BOUNDS, cumulative[:-1]):
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {count}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {cumulative[-1]}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.total:.6f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            for quantile, value in zip(('0.5', '0.95', '0.99'), histogram.percentiles()):
+                quantile_lines.append(f'{name}_rolling{{stage="{stage}",quantile="{quantile}"}} {value:.6f}')
+
+        gauge_lines = []
+        for gauge, value in (self.gauges() if self.gauges else {}).items():
+            gauge_lines.append(f"# TYPE {self.prefix}_{gauge} gauge")
+            gauge_lines.append(f"{self.prefix}_{gauge} {value:g}")
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write("\n".join(lines + quantile_lines + gauge_lines) + "\n")
+        os.replace(tmp_path, self.path)
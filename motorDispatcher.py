@@ -0,0 +1,151 @@
+import threading
+import time
+
+from motorTransport import HttpTransport
+
+# First retry delay after a failed send (doubles per failure, up to heartbeat_interval)
+MIN_RETRY_DELAY = 0.02
+
+
+class MotorCommandDispatcher:
+    """
+    Sends motor commands to the ESP32 from a background thread.
+
+    - One persistent transport (keep-alive HTTP session or UDP socket)
+      is reused for every command
+    - Only the newest pending speed is sent; superseded ones are dropped
+    - The last speed is re-sent as a heartbeat so the firmware's
+      500ms COMMAND_TIMEOUT never fires while we are still tracking
+    - submit() never blocks the vision loop
+    - Failed sends are retried with exponential backoff (capped at the
+      heartbeat interval), so an unreachable receiver is not hammered
+    """
+
+    def __init__(self, esp32_ip, heartbeat_interval=0.2, timeout=0.3, transport=None):
+        self.heartbeat_interval = heartbeat_interval
+        self.timeout = timeout
+
+        # Persistent connection to the ESP32
+        if transport is None:
+            transport = HttpTransport(esp32_ip, timeout=timeout)
+        self.transport = transport
+
+        # Latest-value slot (guarded by the condition's lock)
+        self._cond = threading.Condition()
+        self._pending_speed = None
+        self._last_sent_speed = 0
+        self._last_send_time = 0.0
+        self._retry_delay = 0.0  # Current backoff after failed sends (0 = last send succeeded)
+        self._retry_time = 0.0  # No retry before this time.monotonic()
+
+        # Statistics
+        self.commands_sent = 0
+        self.commands_failed = 0
+        self.commands_superseded = 0
+        self.heartbeats_sent = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """Start the background sender thread"""
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._send_loop, name="MotorDispatcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def submit(self, speed):
+        """Queue a new speed; replaces any speed that has not been sent yet"""
+        with self._cond:
+            if self._pending_speed is not None:
+                self.commands_superseded += 1
+            self._pending_speed = int(speed)
+            self._cond.notify()
+
+    def _send_loop(self):
+        while self._running:
+            with self._cond:
+                if self._pending_speed is None:
+                    wait_time = self._last_send_time + self.heartbeat_interval - time.monotonic()
+                else:
+                    # Only non-zero while backing off after a failed send
+                    wait_time = self._retry_time - time.monotonic()
+                if wait_time > 0:
+                    self._cond.wait(wait_time)
+                if not self._running:
+                    break
+
+                if time.monotonic() < self._retry_time:
+                    # Woken by submit() while backing off: the new speed waits for the retry
+                    continue
+                if self._pending_speed is not None:
+                    speed = self._pending_speed
+                    self._pending_speed = None
+                    heartbeat = False
+                elif time.monotonic() - self._last_send_time >= self.heartbeat_interval:
+                    speed = self._last_sent_speed
+                    heartbeat = True
+                else:
+                    continue
+
+            self._send(speed, heartbeat)
+
+    def _send(self, speed, heartbeat=False):
+        """Send speed to both motors and record the round-trip latency"""
+        start = time.monotonic()
+        # Both motors get same speed for linear movement
+        ok = self.transport.send(speed, speed)
+
+        end = time.monotonic()
+        with self._cond:
+            self._last_send_time = end
+            if ok:
+                latency = end - start
+                self._last_sent_speed = speed
+                self.commands_sent += 1
+                if heartbeat:
+                    self.heartbeats_sent += 1
+                self.last_latency = latency
+                self.max_latency = max(self.max_latency, latency)
+                self._total_latency += latency
+                self._retry_delay = 0.0
+                self._retry_time = 0.0
+            else:
+                self.commands_failed += 1
+                # Retry after a backoff instead of waiting for a heartbeat
+                self._retry_delay = min(max(2 * self._retry_delay, MIN_RETRY_DELAY), self.heartbeat_interval)
+                self._retry_time = end + self._retry_delay
+                if self._pending_speed is None:
+                    self._pending_speed = speed
+        return ok
+
+    def stop(self, send_stop=True):
+        """Stop the sender thread and optionally send a final STOP synchronously"""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * self.timeout + 0.5)
+            self._thread = None
+        if send_stop:
+            self._send(0)
+        self.transport.close()
+
+    def get_stats(self):
+        """Return a dict of command counters and latency figures (seconds)"""
+        with self._cond:
+            avg_latency = self._total_latency / self.commands_sent if self.commands_sent else 0.0
+            return {
+                'sent': self.commands_sent,
+                'failed': self.commands_failed,
+                'superseded': self.commands_superseded,
+                'heartbeats': self.heartbeats_sent,
+                'last_latency': self.last_latency,
+                'avg_latency': avg_latency,
+                'max_latency': self.max_latency,
+            }
@@ -0,0 +1,125 @@
+import socket
+import struct
+import time
+
+import requests
+
+# UDP packet layout (little endian, 10 bytes):
+#   magic    2s  b'MC'
+#   seq      I   increments by one per packet (wraps at 2^32)
+#   speed_a  h   -255..255
+#   speed_b  h   -255..255
+# The receiver answers every accepted packet with an ACK of the same layout
+# (magic b'MA') carrying the speeds it applied.
+UDP_PACKET = struct.Struct('<2sIhh')
+UDP_COMMAND_MAGIC = b'MC'
+UDP_ACK_MAGIC = b'MA'
+DEFAULT_UDP_PORT = 4210
+
+
+def split_host_port(esp32_ip, default_port):
+    """Split 'host[:port]' into (host, port)"""
+    if ':' in esp32_ip:
+        host, port = esp32_ip.rsplit(':', 1)
+        return host, int(port)
+    return esp32_ip, default_port
+
+
+def clamp_speed(speed):
+    """Clamp speed to the firmware's valid range"""
+    return max(-255, min(255, int(speed)))
+
+
+class HttpTransport:
+    """
+    Original query-string protocol: one GET to /control per motor.
+    Uses a keep-alive session so the TCP connection is reused.
+    """
+
+    name = 'http'
+
+    def __init__(self, esp32_ip, timeout=0.3):
+        self.esp32_url = f"http://{esp32_ip}/control"
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def send(self, speed_a, speed_b):
+        """Send both motor speeds. Returns True if the ESP32 accepted them"""
+        try:
+            response_a = self.session.get(self.esp32_url, params={'motor': 'A', 'speed': speed_a}, timeout=self.timeout)
+            response_b = self.session.get(self.esp32_url, params={'motor': 'B', 'speed': speed_b}, timeout=self.timeout)
+            return response_a.status_code == 200 and response_b.status_code == 200
+        except requests.RequestException:
+            return False
+
+    def close(self):
+        self.session.close()
+
+
+class UdpTransport:
+    """
+    Compact binary protocol: both motor speeds in one sequenced datagram.
+
+    The receiver drops packets whose sequence number is not newer than
+    the last one it applied, so late or reordered datagrams can never
+    override a fresher command. With wait_ack=False commands are
+    fire-and-forget and send() never blocks on the network.
+    """
+
+    name = 'udp'
+
+    def __init__(self, esp32_ip, port=DEFAULT_UDP_PORT, timeout=0.3, wait_ack=True):
+        host, _ = split_host_port(esp32_ip, port)
+        self.address = (host, port)
+        self.timeout = timeout
+        self.wait_ack = wait_ack
+        self.seq = 0
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.connect(self.address)
+
+    def send(self, speed_a, speed_b):
+        """Send both motor speeds. Returns True if sent (and ACKed when wait_ack is set)"""
+        self.seq = (self.seq + 1) & 0xFFFFFFFF
+        packet = UDP_PACKET.pack(UDP_COMMAND_MAGIC, self.seq, clamp_speed(speed_a), clamp_speed(speed_b))
+        try:
+            self.sock.send(packet)
+            if not self.wait_ack:
+                return True
+            return self._wait_for_ack(self.seq)
+        except OSError:
+            return False
+
+    def _wait_for_ack(self, seq):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self.sock.settimeout(remaining)
+            try:
+                data = self.sock.recv(64)
+            except socket.timeout:
+                return False
+            if len(data) != UDP_PACKET.size:
+                continue
+            magic, ack_seq, _, _ = UDP_PACKET.unpack(data)
+            # Ignore late ACKs of earlier packets
+            if magic == UDP_ACK_MAGIC and ack_seq == seq:
+                return True
+
+    def close(self):
+        self.sock.close()
+
+
+TRANSPORTS = {
+    'http': HttpTransport,
+    'udp': UdpTransport,
+}
+
+
+def create_transport(kind, esp32_ip, **kwargs):
+    """Create a transport by name ('http' or 'udp')"""
+    if kind not in TRANSPORTS:
+        raise ValueError(f"Unknown transport '{kind}' (choose from: {', '.join(TRANSPORTS)})")
+    return TRANSPORTS[kind](esp32_ip, **kwargs)
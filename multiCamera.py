@@ -0,0 +1,310 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import time
+
+import cv2
+
+from calibrationProfiles import DEFAULT_PROFILE_PATH, ProfileStore
+from latencyStats import LatencyHistogram
+
+# Camera results older than this are ignored by the fusion step (seconds)
+DEFAULT_MAX_RESULT_AGE = 0.25
+
+FUSION_POLICIES = ('weighted', 'largest')
+
+
+def camera_worker(camera, config, result_queue, stop_event, core=None):
+    """
+    Per-camera process: capture -> detect -> small result record.
+
+    Each camera has its own tracker (HSV profile, ROI, lost-frame state).
+    The grabber drops frames this process is too slow for, and results
+    are dropped rather than queued when the fusion side is behind (oldest
+    first, so fusion resumes on fresh data), so a slow camera only ever
+    slows itself down.
+    """
+    from blobDetection import AutonomousBlobTracker, open_camera
+    from frameGrabber import LatestFrameGrabber
+
+    # One core per camera: keep OpenCV from spawning its own thread pool on top
+    cv2.setNumThreads(1)
+    if core is not None and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, {core})
+        except OSError:
+            pass
+
+    cap = open_camera(config.get('index', camera), config.get('width', 640), config.get('height', 480))
+    if cap is None:
+        print(f"❌ Camera {camera}: could not open device {config.get('index', camera)}")
+        return
+    grabber = LatestFrameGrabber(cap).start()
+
+    tracker = AutonomousBlobTracker(connect=False)
+    tracker.apply_settings(config.get('settings', {}))
+
+    results_dropped = 0
+    try:
+        while not stop_event.is_set():
+            ret, frame, frame_time, dropped = grabber.read(timeout=0.5)
+            if not ret:
+                continue
+            tracker.set_frame_info(frame_time, dropped)
+            start = time.perf_counter()
+            center, area = tracker.track_blob(frame)
+            processing = time.perf_counter() - start
+
+            record = {
+                'camera': camera,
+                'timestamp': frame_time,
+                'center': center,
+                'area': area,
+                'shape': frame.shape[:2],
+                'processing': processing,
+                'frames_dropped': dropped,
+                'results_dropped': results_dropped,
+            }
+            try:
+                result_queue.put_nowait(record)
+            except queue.Full:
+                # Fusion is behind: make room by dropping the oldest result, never the newest
+                try:
+                    result_queue.get_nowait()
+                    results_dropped += 1
+                except queue.Empty:
+                    pass  # Fusion took it meanwhile
+                try:
+                    result_queue.put_nowait(record)
+                except queue.Full:
+                    results_dropped += 1
+    finally:
+        grabber.release()
+
+
+class CameraStats:
+    """Throughput and latency counters for one camera (fusion side)"""
+
+    def __init__(self):
+        self.results = 0
+        self.frames_dropped = 0
+        self.results_dropped = 0
+        self.processing = LatencyHistogram(window=256)
+        self.last_timestamp = 0.0
+        self._rate_start = time.monotonic()
+        self._rate_count = 0
+        self.fps = 0.0
+
+    def add(self, record):
+        self.results += 1
+        self.frames_dropped = record['frames_dropped']
+        self.results_dropped = record['results_dropped']
+        self.processing.add(record['processing'])
+        self.last_timestamp = record['timestamp']
+
+        self._rate_count += 1
+        now = time.monotonic()
+        if now - self._rate_start >= 1.0:
+            self.fps = self._rate_count / (now - self._rate_start)
+            self._rate_start = now
+            self._rate_count = 0
+
+
+class CameraFusion:
+    """
+    Combines the newest result of every camera into one target estimate.
+
+    Each camera reports its vertical error as a fraction of its own frame
+    height, so cameras with different resolutions are comparable.
+    'weighted' averages the errors weighted by blob area; 'largest' uses
+    the camera that sees the biggest blob. Stale results are ignored.
+    """
+
+    def __init__(self, policy='weighted', max_age=DEFAULT_MAX_RESULT_AGE):
+        if policy not in FUSION_POLICIES:
+            raise ValueError(f"Unknown fusion policy '{policy}' (choose from: {', '.join(FUSION_POLICIES)})")
+        self.policy = policy
+        self.max_age = max_age
+        self.latest = {}  # camera -> newest record
+        self.stats = {}  # camera -> CameraStats
+
+    def add(self, record):
+        camera = record['camera']
+        self.latest[camera] = record
+        if camera not in self.stats:
+            self.stats[camera] = CameraStats()
+        self.stats[camera].add(record)
+
+    def fuse(self, now=None):
+        """
+        Returns (offset, timestamp, cameras): offset is the target's vertical
+        position relative to the frame centre as a fraction of frame height
+        (positive = below), or None if no fresh camera sees the target.
+        """
+        now = time.monotonic() if now is None else now
+        visible = [r for r in self.latest.values()
+                   if r['center'] is not None and now - r['timestamp'] <= self.max_age]
+        if not visible:
+            return None, None, []
+
+        if self.policy == 'largest':
+            visible = [max(visible, key=lambda r: r['area'])]
+        total_area = sum(r['area'] for r in visible)
+        offset = sum((r['center'][1] / r['shape'][0] - 0.5) * r['area'] for r in visible) / total_area
+        timestamp = min(r['timestamp'] for r in visible)
+        return offset, timestamp, [r['camera'] for r in visible]
+
+    def status_lines(self):
+        lines = []
+        for camera, stats in sorted(self.stats.items()):
+            p50, p95, p99 = stats.processing.percentiles()
+            lines.append(f"cam {camera}: {stats.fps:5.1f} fps, detect p50/p95/p99 "
+                         f"{p50 * 1000:.1f}/{p95 * 1000:.1f}/{p99 * 1000:.1f}ms, "
+                         f"dropped {stats.frames_dropped} frames / {stats.results_dropped} results")
+        return lines
+
+
+class MultiCameraTracker:
+    """
+    One detection process per camera, fused into a single motor command.
+
+    Workers send only small result records through bounded per-camera
+    queues; the fusion loop in the main process never blocks on any one
+    camera.
+    """
+
+    def __init__(self, cameras, esp32_ip="192.168.4.1", transport='http', policy='weighted',
+                 max_age=DEFAULT_MAX_RESULT_AGE, pin_cores=True):
+        self.ctx = mp.get_context('spawn')
+        self.stop_event = self.ctx.Event()
+        self.fusion = CameraFusion(policy, max_age)
+        self.esp32_ip = esp32_ip
+        self.transport = transport
+
+        cpu_count = os.cpu_count() or 1
+        self.queues = {}
+        self.processes = []
+        for i, config in enumerate(cameras):
+            camera = config.get('name', i)
+            self.queues[camera] = self.ctx.Queue(maxsize=2)
+            core = i % cpu_count if pin_cores else None
+            self.processes.append(self.ctx.Process(
+                target=camera_worker, name=f"Camera-{camera}",
+                args=(camera, config, self.queues[camera], self.stop_event, core)))
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+        return self
+
+    def poll(self):
+        """Move every pending result into the fusion state. Returns the number received"""
+        received = 0
+        for result_queue in self.queues.values():
+            try:
+                while True:
+                    self.fusion.add(result_queue.get_nowait())
+                    received += 1
+            except queue.Empty:
+                pass
+        return received
+
+    def run(self, status_interval=5.0, loop_interval=0.005):
+        """Fuse camera results and drive the motors until interrupted"""
+        from blobDetection import AutonomousBlobTracker
+
+        tracker = AutonomousBlobTracker(self.esp32_ip, transport=self.transport)
+        # Fused offsets are mapped into a virtual frame so calculate_motor_speed applies unchanged
+        reference_shape = (480, 640)
+        last_status = time.monotonic()
+        last_command = ''
+        try:
+            while not self.stop_event.is_set():
+                if not self.poll():
+                    time.sleep(loop_interval)
+
+                # Fused every pass so that cameras going stale stop the motors
+                offset, timestamp, cameras = self.fusion.fuse()
+                center = None
+                if offset is not None:
+                    tracker.set_frame_info(timestamp, 0)
+                    center = (reference_shape[1] // 2, int((offset + 0.5) * reference_shape[0]))
+                motor_speed, last_command = tracker.calculate_motor_speed(center, reference_shape)
+
+                current_time = time.time()
+                if current_time - tracker.last_command_time >= tracker.command_interval:
+                    if tracker.send_motor_command(motor_speed):
+                        tracker.last_command_time = current_time
+
+                now = time.monotonic()
+                if now - last_status >= status_interval:
+                    last_status = now
+                    print(f"[multi] {last_command} (cameras: {cameras})")
+                    for line in self.fusion.status_lines():
+                        print(f"  {line}")
+        finally:
+            tracker.shutdown()
+
+    def stop(self):
+        self.stop_event.set()
+        for process in self.processes:
+            if process.pid is None:
+                continue
+            process.join(timeout=3.0)
+            if process.is_alive():
+                process.terminate()
+        for result_queue in self.queues.values():
+            result_queue.close()
+
+
+def load_camera_config(path, profiles_path=DEFAULT_PROFILE_PATH):
+    """
+    Camera list from a JSON file:
+    [{"index": 0, "width": 640, "height": 480, "profile": "red", "settings": {"lower_hsv": [...], ...}}, ...]
+    "profile" names a calibration profile; explicit "settings" override it.
+    """
+    with open(path) as f:
+        cameras = json.load(f)
+    store = ProfileStore(profiles_path)
+    for config in cameras:
+        settings = dict(store.get(config['profile']) or {}) if 'profile' in config else {}
+        settings.update(config.get('settings', {}))
+        config['settings'] = settings  # Applied with tracker.apply_settings() in the worker
+    return cameras
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Track with several cameras, one process each, fused into one command')
+    parser.add_argument('--ip', default='192.168.4.1', help='ESP32 address (host[:port])')
+    parser.add_argument('--transport', default='http', choices=['http', 'udp'])
+    parser.add_argument('--camera', type=int, action='append', default=None,
+                        help='Camera index with default settings (repeatable)')
+    parser.add_argument('--config', default=None, help='JSON camera list with per-camera HSV settings')
+    parser.add_argument('--profiles-file', default=DEFAULT_PROFILE_PATH, help='Calibration profile store (JSON)')
+    parser.add_argument('--policy', default='weighted', choices=FUSION_POLICIES, help='How camera results are fused')
+    parser.add_argument('--max-age', type=float, default=DEFAULT_MAX_RESULT_AGE,
+                        help='Ignore camera results older than this (seconds)')
+    parser.add_argument('--no-pin', action='store_true', help='Do not pin camera processes to cores')
+    args = parser.parse_args()
+
+    cameras = load_camera_config(args.config, args.profiles_file) if args.config else []
+    cameras += [{'index': index} for index in (args.camera or [])]
+    if not cameras:
+        cameras = [{'index': 0}, {'index': 1}]
+
+    tracker = MultiCameraTracker(cameras, args.ip, args.transport, args.policy, args.max_age,
+                                 pin_cores=not args.no_pin).start()
+    print(f"✓ Tracking with {len(cameras)} camera(s), fusion policy '{args.policy}' - Ctrl+C to stop")
+    try:
+        tracker.run()
+    except KeyboardInterrupt:
+        print("\n\n⚠️ Keyboard interrupt - Stopping motors...")
+    finally:
+        tracker.stop()
+        print("✓ System shutdown complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import time
+from typing import NamedTuple
+
+import cv2
+import numpy as np
+
+
+class CommandState(NamedTuple):
+    """Motor command as shown on the overlay"""
+    speed: int  # Signed: positive = FORWARD, negative = BACKWARD, 0 = stopped
+    text: str
+
+    @property
+    def direction(self):
+        return (self.speed > 0) - (self.speed < 0)
+
+
+def _paint(layer, mask, draw, color):
+    """
+    Render draw(image, color) as hard-edged pixels of layer/mask.
+    Text is anti-aliased, and edge pixels blended against a black layer
+    would show as a dark fringe once copied onto the frame; keeping only
+    pixels at least half covered gives crisp, fringe-free edges.
+    """
+    coverage = np.zeros(mask.shape, np.uint8)
+    draw(coverage, 255)
+    covered = coverage >= 128
+    layer[covered] = color
+    mask[covered] = 255
+
+
+def _stamp(height, width, draw, color):
+    """Hard-edged (image, mask) of size height x width for draw(image, color), see _paint"""
+    coverage = np.zeros((height, width), np.uint8)
+    draw(coverage, 255)
+    _, mask = cv2.threshold(coverage, 127, 255, cv2.THRESH_BINARY)
+    image = cv2.merge([np.full((height, width), c, np.uint8) for c in color])
+    return image, mask
+
+
+def _text_stamp(text, org, scale, color, thickness):
+    """Pre-rendered text: (image, mask, x, y) to composite at frame position (x, y)"""
+    (width, height), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, scale, thickness)
+    pad = thickness + 1
+    image, mask = _stamp(height + baseline + 2 * pad, width + 2 * pad, lambda canvas, c: cv2.putText(
+        canvas, text, (pad, pad + height), cv2.FONT_HERSHEY_SIMPLEX, scale, c, thickness), color)
+    return image, mask, org[0] - pad, org[1] - pad - height
+
+
+def _ring_stamp(rings, color):
+    """Concentric circles [(radius, thickness), ...] as (image, mask, offset from the center)"""
+    half = max(radius + max(thickness, 0) for radius, thickness in rings) + 1
+    size = 2 * half + 1
+
+    def draw(canvas, c):
+        for radius, thickness in rings:
+            cv2.circle(canvas, (half, half), radius, c, thickness)
+
+    image, mask = _stamp(size, size, draw, color)
+    return image, mask, half
+
+
+def _clip(frame_shape, stamp_shape, x, y):
+    """(frame region, stamp region) slices for a stamp placed at (x, y), or None if outside the frame"""
+    x0, y0 = max(x, 0), max(y, 0)
+    x1 = min(x + stamp_shape[1], frame_shape[1])
+    y1 = min(y + stamp_shape[0], frame_shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return None
+    return (slice(y0, y1), slice(x0, x1)), (slice(y0 - y, y1 - y), slice(x0 - x, x1 - x))
+
+
+def _composite(frame, image, mask, x, y):
+    """Masked copy of image onto frame at (x, y), clipped to the frame"""
+    regions = _clip(frame.shape, image.shape, x, y)
+    if regions is not None:
+        target, source = regions
+        cv2.copyTo(image[source], mask[source], frame[target])
+
+
+def _merge_ranges(ranges):
+    """Union of half-open (start, stop) row ranges, sorted"""
+    merged = []
+    for start, stop in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], stop)
+        else:
+            merged.append([start, stop])
+    return merged
+
+
+class OverlayRenderer:
+    """
+    Tracking overlay with cached layers and per-frame markers.
+
+    The static layer (center line, dead zone, HSV thresholds, help text)
+    only depends on the frame size, dead_zone and the HSV range, and is
+    redrawn only when one of those changes. Each frame gets it with one
+    masked copy per band of rows it covers, then the readouts (pixels,
+    position, speed, velocity, command, stage latencies) are drawn fresh,
+    followed by the markers (centroid, prediction, ROI, arrow); the
+    fixed-size circles are pre-rendered stamps.
+
+    text_interval > 0 opts in to throttled readouts: they are pasted into
+    the cached layer as text stamps at most that often (and at once when
+    tracking is gained or lost or the motor direction changes), so they
+    lag the tracker by up to text_interval.
+    Layers are hard-edged (see _paint) so a binary mask composites them.
+    """
+
+    def __init__(self, text_interval=0.0):
+        self.text_interval = text_interval  # Minimum seconds between readout refreshes (0 = every frame)
+        self._static_key = None
+        self._static = None  # (layer, mask) without readouts
+        self._static_rows = []
+        self._layer = self._mask = None  # Static layer plus readouts
+        self._text_key = None
+        self._text_time = 0.0
+        self._text_regions = []  # Frame regions the current readouts cover
+        self._stamps = {}  # Readout stamps of the last refresh, by their arguments
+        self._static_bands = []  # (layer rows, mask rows, row slice) of the static layer
+        self._bands = []  # Same for the static layer plus throttled readouts
+        self.rebuilds = 0
+        self.text_refreshes = 0
+
+        # Fixed-size markers: filled centroid dot with a ring, and the prediction ring
+        self._target_marker = _ring_stamp([(10, -1), (15, 2)], (0, 0, 255))
+        self._predicted_marker = _ring_stamp([(12, 2)], (255, 255, 0))
+
+    def _build_static(self, tracker, shape):
+        height, width = shape[:2]
+        frame_center_y = height // 2
+        layer = np.zeros((height, width, 3), np.uint8)
+        mask = np.zeros((height, width), np.uint8)
+        lower, upper = tracker.lower_hsv, tracker.upper_hsv
+        font = cv2.FONT_HERSHEY_SIMPLEX
+
+        # Horizontal center line and dead zone band
+        _paint(layer, mask, lambda image, c: cv2.line(
+            image, (0, frame_center_y), (width, frame_center_y), c, 2), (255, 255, 255))
+        _paint(layer, mask, lambda image, c: cv2.rectangle(
+            image, (0, frame_center_y - tracker.dead_zone), (width, frame_center_y + tracker.dead_zone), c, 1),
+            (200, 200, 200))
+
+        # Current HSV values (top right corner)
+        _paint(layer, mask, lambda image, c: cv2.putText(
+            image, f"HSV Lower: [{lower[0]}, {lower[1]}, {lower[2]}]", (width - 400, 30), font, 0.5, c, 1),
+            (255, 255, 255))
+        _paint(layer, mask, lambda image, c: cv2.putText(
+            image, f"HSV Upper: [{upper[0]}, {upper[1]}, {upper[2]}]", (width - 400, 50), font, 0.5, c, 1),
+            (255, 255, 255))
+
+        # Help text for HSV adjustment
+        _paint(layer, mask, lambda image, c: cv2.putText(
+            image, "Press 'a' to adjust HSV", (10, height - 50), font, 0.6, c, 2), (200, 200, 200))
+
+        # Row ranges that contain static pixels
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.any(axis=1).view(np.int8), [0]))))
+        self._static_rows = [(int(start), int(stop)) for start, stop in zip(edges[::2], edges[1::2])]
+        self._static = (layer, mask)
+        self._static_bands = [(layer[start:stop], mask[start:stop], slice(start, stop))
+                              for start, stop in self._static_rows]
+        self._layer, self._mask = layer.copy(), mask.copy()
+        self._text_regions = []
+        self._text_key = None  # Readouts must be redrawn on the new layer
+        self.rebuilds += 1
+
+    @staticmethod
+    def _readout_lines(tracker, height, center, area, command):
+        """Readouts as (text, origin, scale, color, thickness)"""
+        lines = []
+        if center:
+            lines.append((f"Pixels: {area}", (10, 30), 0.7, (0, 0, 255), 2))
+            lines.append((f"Position: {center}", (10, 60), 0.7, (0, 0, 255), 2))
+            lines.append((f"Motor Speed: {command.speed}", (10, 90), 0.7, (0, 255, 0), 2))
+        if tracker.predicted_position is not None:
+            vx, vy = tracker.target_velocity
+            lines.append((f"Velocity: ({vx:.0f}, {vy:.0f}) px/s", (10, 112), 0.5, (255, 255, 0), 1))
+        lines.append((command.text, (10, height - 20), 0.8, (0, 255, 255), 2))
+        if tracker.stage_timer.enabled:
+            for i, line in enumerate(tracker.stage_timer.overlay_lines()):
+                lines.append((line, (10, 130 + i * 18), 0.45, (255, 255, 0), 1))
+        return lines
+
+    def _build_text(self, tracker, height, center, area, command):
+        lines = self._readout_lines(tracker, height, center, area, command)
+
+        # Restore what the previous readouts covered, then paste the new ones
+        static_layer, static_mask = self._static
+        for target in self._text_regions:
+            self._layer[target] = static_layer[target]
+            self._mask[target] = static_mask[target]
+
+        # Unchanged lines reuse their stamp from the previous refresh
+        stamps = {args: self._stamps.get(args) or _text_stamp(*args) for args in lines}
+        self._text_regions = []
+        for image, mask, x, y in stamps.values():
+            regions = _clip(self._layer.shape, image.shape, x, y)
+            if regions is None:
+                continue
+            target, source = regions
+            cv2.copyTo(image[source], mask[source], self._layer[target])
+            cv2.max(self._mask[target], mask[source], dst=self._mask[target])
+            self._text_regions.append(target)
+        self._stamps = stamps
+
+        self._bands = [(self._layer[start:stop], self._mask[start:stop], slice(start, stop))
+                       for start, stop in _merge_ranges(self._static_rows + [
+                           (rows.start, rows.stop) for rows, _ in self._text_regions])]
+        self.text_refreshes += 1
+
+    def render(self, frame, tracker, center, area, command):
+        """Draw the overlay for tracker's state onto frame (in place) and return it"""
+        height, width = frame.shape[:2]
+        frame_center_y = height // 2
+
+        static_key = ((height, width), tracker.dead_zone,
+                      tuple(int(v) for v in tracker.lower_hsv), tuple(int(v) for v in tracker.upper_hsv))
+        if static_key != self._static_key:
+            self._build_static(tracker, frame.shape)
+            self._static_key = static_key
+
+        if self.text_interval > 0:
+            now = time.monotonic()
+            text_key = (center is None, tracker.predicted_position is None,
+                        tracker.stage_timer.enabled, command.direction)
+            if text_key != self._text_key or now - self._text_time >= self.text_interval:
+                self._build_text(tracker, height, center, area, command)
+                self._text_key = text_key
+                self._text_time = now
+            for layer, mask, rows in self._bands:
+                cv2.copyTo(layer, mask, frame[rows])
+        else:
+            for layer, mask, rows in self._static_bands:
+                cv2.copyTo(layer, mask, frame[rows])
+            for text, org, scale, color, thickness in self._readout_lines(tracker, height, center, area, command):
+                cv2.putText(frame, text, org, cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness)
+            self._text_key = None  # Throttled readouts must be redrawn if text_interval is raised
+
+        # ROI search window
+        if tracker.search_window is not None:
+            x0, y0, x1, y1 = tracker.search_window
+            cv2.rectangle(frame, (x0, y0), (x1, y1), (255, 128, 0), 1)
+
+        # Every tracked blob with its ID
+        if tracker.track_multiple:
+            for blob_id, blob in tracker.tracked_blobs.items():
+                x, y, w, h = blob.bbox
+                cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 255), 1)
+                cv2.putText(frame, f"#{blob_id}", (x, max(12, y - 4)),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 0, 255), 1)
+
+        if center:
+            # RED circle at the average position and a line to the center line
+            cv2.line(frame, center, (center[0], frame_center_y), (0, 255, 255), 2)
+            image, mask, half = self._target_marker
+            _composite(frame, image, mask, center[0] - half, center[1] - half)
+
+        # Predicted (latency-compensated) target
+        if tracker.predicted_position is not None:
+            px, py = tracker.predicted_position
+            if center:
+                cv2.line(frame, center, (px, py), (255, 255, 0), 1)
+            image, mask, half = self._predicted_marker
+            _composite(frame, image, mask, px - half, py - half)
+
+        # Direction indicator
+        if command.direction > 0:
+            cv2.arrowedLine(frame, (width - 50, height - 50), (width - 50, height - 100),
+                            (0, 255, 0), 3, tipLength=0.3)
+        elif command.direction < 0:
+            cv2.arrowedLine(frame, (width - 50, height - 100), (width - 50, height - 50),
+                            (0, 0, 255), 3, tipLength=0.3)
+
+        return frame
@@ -0,0 +1,327 @@
+import argparse
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+
+class SharedFrameRing:
+    """
+    Ring of frame slots in one multiprocessing.shared_memory block.
+
+    Layout: [slot sequence numbers (int64)] [slot timestamps (float64)] [frames]
+    A slot's sequence number is set to -1 while it is being written and to
+    the frame's sequence number once complete, so readers can check that
+    the slot was not overwritten while they were using it (seqlock).
+    """
+
+    def __init__(self, shape, slots=4, name=None, create=False):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.frame_bytes = int(np.prod(self.shape))
+        header_bytes = slots * 16
+        size = header_bytes + slots * self.frame_bytes
+
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+        self.name = self.shm.name
+        self.owner = create
+
+        self.seqs = np.ndarray((slots,), np.int64, self.shm.buf, 0)
+        self.timestamps = np.ndarray((slots,), np.float64, self.shm.buf, slots * 8)
+        self.frames = np.ndarray((slots,) + self.shape, np.uint8, self.shm.buf, header_bytes)
+        if create:
+            self.seqs[:] = -1
+            self.timestamps[:] = 0.0
+
+    def begin_write(self, seq):
+        """Mark the slot for seq as being written and return its frame buffer"""
+        slot = seq % self.slots
+        self.seqs[slot] = -1
+        return self.frames[slot]
+
+    def end_write(self, seq, timestamp):
+        """Publish a completed frame"""
+        slot = seq % self.slots
+        self.timestamps[slot] = timestamp
+        self.seqs[slot] = seq
+
+    def view(self, seq):
+        """Read-only, zero-copy view of frame seq, or None if it was overwritten"""
+        slot = seq % self.slots
+        if self.seqs[slot] != seq:
+            return None
+        frame = self.frames[slot]
+        frame.flags.writeable = False
+        return frame
+
+    def timestamp(self, seq):
+        return self.timestamps[seq % self.slots]
+
+    def is_valid(self, seq):
+        """True if frame seq is still in its slot"""
+        return self.seqs[seq % self.slots] == seq
+
+    def close(self):
+        # Drop numpy views before closing the mapping
+        del self.seqs, self.timestamps, self.frames
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def wait_for_frame(latest_seq, new_frame, last_seq, timeout=0.5):
+    """Block until a frame newer than last_seq is published. Returns its seq or None"""
+    with new_frame:
+        new_frame.wait_for(lambda: latest_seq.value > last_seq, timeout)
+        seq = latest_seq.value
+    return seq if seq > last_seq else None
+
+
+def capture_stage(ring_name, shape, slots, camera_index, latest_seq, new_frame, status_queue, stop_event):
+    """Capture process: decode camera frames straight into the shared ring"""
+    height, width = shape[:2]
+    cap = cv2.VideoCapture(camera_index)
+    if not cap.isOpened():
+        status_queue.put(('error', f"Could not open camera {camera_index}"))
+        stop_event.set()
+        return
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    cap.set(cv2.CAP_PROP_FPS, 30)
+
+    seq = 0
+    try:
+        while not stop_event.is_set():
+            slot_frame = ring.begin_write(seq)
+            ret, frame = cap.read(slot_frame)
+            timestamp = time.monotonic()
+            if not ret:
+                time.sleep(0.01)
+                continue
+            if frame.shape != slot_frame.shape:
+                status_queue.put(('error', f"Camera delivered {frame.shape[1]}x{frame.shape[0]}, "
+                                           f"expected {width}x{height}"))
+                stop_event.set()
+                break
+            if frame is not slot_frame and not np.shares_memory(frame, slot_frame):
+                slot_frame[:] = frame  # Backend ignored the destination buffer
+            ring.end_write(seq, timestamp)
+
+            with new_frame:
+                latest_seq.value = seq
+                new_frame.notify_all()
+            seq += 1
+    finally:
+        cap.release()
+        ring.close()
+
+
+def control_stage(ring_name, shape, slots, esp32_ip, transport, settings,
+                  latest_seq, new_frame, result_queue, command_queue, stop_event):
+    """Detection/control process: newest frame -> centroid -> motor command"""
+    from blobDetection import AutonomousBlobTracker
+
+    ring = SharedFrameRing(shape, slots, name=ring_name)
+    tracker = AutonomousBlobTracker(esp32_ip, transport=transport)
+    for key, value in settings.items():
+        setattr(tracker, key, value)
+
+    last_seq = -1
+    paused = False
+    try:
+        while not stop_event.is_set():
+            # Commands from the UI stage
+            try:
+                while True:
+                    message, value = command_queue.get_nowait()
+                    if message == 'estop':
+                        tracker.send_motor_command(0)
+                        paused = not paused
+                        print("\n⚠️ EMERGENCY STOP!" if paused else "\n▶ Tracking resumed")
+                    elif message == 'set':
+                        for key, setting in value.items():
+                            setattr(tracker, key, setting)
+            except queue.Empty:
+                pass
+
+            seq = wait_for_frame(latest_seq, new_frame, last_seq)
+            if seq is None:
+                continue
+            last_seq = seq
+
+            frame = ring.view(seq)
+            if frame is None:
+                continue
+            tracker.set_frame_info(float(ring.timestamp(seq)), 0)
+            center, area = tracker.track_blob(frame)
+            # Result is void if capture overwrote the slot mid-detection
+            if not ring.is_valid(seq):
+                continue
+
+            motor_speed, command = tracker.calculate_motor_speed(tracker.predict_target(center), shape)
+            if paused:
+                motor_speed, command = 0, "STOPPED - Press SPACE to resume"
+
+            current_time = time.time()
+            if current_time - tracker.last_command_time >= tracker.command_interval:
+                if tracker.send_motor_command(motor_speed):
+                    tracker.last_command_time = current_time
+
+            # Small result record for the UI; dropped if the UI is behind
+            record = (seq, center, area, motor_speed, command, tracker.search_window,
+                      time.monotonic() - tracker.frame_timestamp)
+            try:
+                result_queue.put_nowait(record)
+            except queue.Full:
+                pass
+    finally:
+        tracker.shutdown()
+        ring.close()
+
+
+class TrackingPipeline:
+    """
+    Capture, detection/control and visualization in separate processes.
+
+    Frames travel through a SharedFrameRing (zero-copy); only small result
+    records go from the control stage to the UI, through a bounded queue
+    the control stage never waits on, so a slow UI cannot delay commands.
+    """
+
+    def __init__(self, esp32_ip, transport='http', camera_index=0, width=640, height=480, slots=4, settings=None):
+        self.ctx = mp.get_context('spawn')
+        self.shape = (height, width, 3)
+        self.slots = slots
+        self.ring = SharedFrameRing(self.shape, slots, create=True)
+
+        self.latest_seq = self.ctx.Value('q', -1, lock=False)
+        self.new_frame = self.ctx.Condition()
+        self.stop_event = self.ctx.Event()
+        self.result_queue = self.ctx.Queue(maxsize=2)
+        self.command_queue = self.ctx.Queue()
+        self.status_queue = self.ctx.Queue()  # (kind, message) from the stages, e.g. ('error', ...)
+
+        self.capture_process = self.ctx.Process(
+            target=capture_stage, name="CaptureStage",
+            args=(self.ring.name, self.shape, slots, camera_index,
+                  self.latest_seq, self.new_frame, self.status_queue, self.stop_event))
+        self.control_process = self.ctx.Process(
+            target=control_stage, name="ControlStage",
+            args=(self.ring.name, self.shape, slots, esp32_ip, transport, settings or {},
+                  self.latest_seq, self.new_frame, self.result_queue, self.command_queue, self.stop_event))
+
+    def start(self):
+        self.control_process.start()
+        self.capture_process.start()
+        return self
+
+    def emergency_stop(self):
+        """Toggle emergency stop in the control stage"""
+        self.command_queue.put(('estop', None))
+
+    def update_settings(self, **settings):
+        """Change tracker attributes (e.g. lower_hsv) in the control stage"""
+        self.command_queue.put(('set', settings))
+
+    def get_result(self, timeout=0.1):
+        """Newest result record, or None"""
+        record = None
+        try:
+            record = self.result_queue.get(timeout=timeout)
+            while True:
+                record = self.result_queue.get_nowait()
+        except queue.Empty:
+            pass
+        return record
+
+    def get_error(self, timeout=0.5):
+        """First error reported by a stage (waiting up to timeout for one in flight), or None"""
+        try:
+            while True:
+                kind, message = self.status_queue.get(timeout=timeout)
+                if kind == 'error':
+                    return message
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        """Stop all stages; the control stage sends a final STOP to the motors"""
+        self.stop_event.set()
+        for process in (self.capture_process, self.control_process):
+            if process.pid is None:
+                continue  # Never started
+            process.join(timeout=3.0)
+            if process.is_alive():
+                process.terminate()
+        self.result_queue.close()
+        self.command_queue.close()
+        self.status_queue.close()
+        self.ring.close()
+
+
+def render_stage(pipeline):
+    """UI stage (main process): overlay and imshow for the newest result"""
+    from blobDetection import AutonomousBlobTracker
+
+    # Overlay-only tracker: never talks to the ESP32
+    overlay = AutonomousBlobTracker(connect=False)
+    cv2.namedWindow('Autonomous Blob Tracker')
+
+    while not pipeline.stop_event.is_set():
+        record = pipeline.get_result()
+        if record is not None:
+            seq, center, area, motor_speed, command, search_window, latency = record
+            frame = pipeline.ring.view(seq)
+            if frame is not None:
+                frame = frame.copy()  # Overlay draws in place
+            # Capture may have overwritten the slot during the copy: drop the torn frame
+            if frame is not None and pipeline.ring.is_valid(seq):
+                overlay.search_window = search_window
+                frame = overlay.draw_overlay(frame, center, area, command, motor_speed)
+                cv2.putText(frame, f"Latency: {latency * 1000:.0f}ms", (10, 120),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 0), 2)
+                cv2.imshow('Autonomous Blob Tracker', frame)
+
+        key = cv2.waitKey(1) & 0xFF
+        if key == ord('q'):
+            print("\nStopping motors and exiting...")
+            break
+        elif key == ord(' '):
+            pipeline.emergency_stop()
+
+    cv2.destroyAllWindows()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Multi-process blob tracker (capture / control / UI)')
+    parser.add_argument('--ip', default='192.168.4.1', help='ESP32 address (host[:port])')
+    parser.add_argument('--transport', default='http', choices=['http', 'udp'])
+    parser.add_argument('--camera', type=int, default=0)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    pipeline = TrackingPipeline(args.ip, args.transport, args.camera, args.width, args.height).start()
+    print("✓ Pipeline started - capture, control and UI run in separate processes")
+    print("  - 'q' - Quit program")
+    print("  - SPACE - Emergency stop / resume")
+    try:
+        render_stage(pipeline)
+        if pipeline.stop_event.is_set():
+            # A stage stopped the pipeline
+            error = pipeline.get_error()
+            if error is not None:
+                print(f"❌ {error}")
+    except KeyboardInterrupt:
+        print("\n\n⚠️ Keyboard interrupt - Stopping motors...")
+    finally:
+        pipeline.stop()
+        print("✓ System shutdown complete")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import numpy as np
+
+
+class AlphaBetaFilter:
+    """
+    Constant-velocity alpha-beta filter for the target centroid.
+
+    alpha weights the position correction, beta the velocity correction.
+    Time steps come from frame capture timestamps, so dropped frames are
+    handled naturally.
+    """
+
+    def __init__(self, alpha=0.6, beta=0.2, max_missing=10):
+        self.alpha = alpha
+        self.beta = beta
+        self.max_missing = max_missing
+        self.reset()
+
+    def reset(self):
+        self.position = None  # np.array([x, y])
+        self.velocity = np.zeros(2)  # pixels per second
+        self.timestamp = None
+        self.missing = 0
+
+    def is_tracking(self):
+        return self.position is not None and self.missing <= self.max_missing
+
+    def update(self, measurement, timestamp):
+        """Feed one frame's centroid (or None if not detected)"""
+        if self.position is None:
+            if measurement is not None:
+                self.position = np.array(measurement, dtype=float)
+                self.velocity = np.zeros(2)
+                self.timestamp = timestamp
+                self.missing = 0
+            return
+
+        dt = max(timestamp - self.timestamp, 1e-3)
+        predicted = self.position + self.velocity * dt
+        self.timestamp = timestamp
+
+        if measurement is None:
+            # Coast on the motion model
+            self.position = predicted
+            self.missing += 1
+            if self.missing > self.max_missing:
+                self.reset()
+            return
+
+        residual = np.asarray(measurement, dtype=float) - predicted
+        self.position = predicted + self.alpha * residual
+        self.velocity = self.velocity + (self.beta / dt) * residual
+        self.missing = 0
+
+    def predict(self, timestamp):
+        """Predicted (x, y) at timestamp, or None when not tracking"""
+        if not self.is_tracking():
+            return None
+        return self.position + self.velocity * (timestamp - self.timestamp)
+
+
+class KalmanTracker:
+    """
+    Constant-velocity Kalman filter, state [x, y, vx, vy].
+
+    process_noise is the acceleration spectral density (pixels/s^2),
+    measurement_noise the centroid standard deviation (pixels).
+    """
+
+    def __init__(self, process_noise=800.0, measurement_noise=3.0, max_missing=10):
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
+        self.max_missing = max_missing
+        self.H = np.array([[1.0, 0.0, 0.0, 0.0],
+                           [0.0, 1.0, 0.0, 0.0]])
+        self.R = np.eye(2) * measurement_noise ** 2
+        self.reset()
+
+    def reset(self):
+        self.state = None
+        self.P = None
+        self.timestamp = None
+        self.missing = 0
+
+    @property
+    def position(self):
+        return None if self.state is None else self.state[:2]
+
+    @property
+    def velocity(self):
+        return np.zeros(2) if self.state is None else self.state[2:]
+
+    def is_tracking(self):
+        return self.state is not None and self.missing <= self.max_missing
+
+    def _transition(self, dt):
+        F = np.eye(4)
+        F[0, 2] = F[1, 3] = dt
+        q = self.process_noise
+        dt2, dt3 = dt * dt, dt * dt * dt
+        Q = q * np.array([[dt3 / 3, 0, dt2 / 2, 0],
+                          [0, dt3 / 3, 0, dt2 / 2],
+                          [dt2 / 2, 0, dt, 0],
+                          [0, dt2 / 2, 0, dt]])
+        return F, Q
+
+    def update(self, measurement, timestamp):
+        """Feed one frame's centroid (or None if not detected)"""
+        if self.state is None:
+            if measurement is not None:
+                self.state = np.array([measurement[0], measurement[1], 0.0, 0.0], dtype=float)
+                self.P = np.diag([self.measurement_noise ** 2] * 2 + [500.0 ** 2] * 2)
+                self.timestamp = timestamp
+                self.missing = 0
+            return
+
+        dt = max(timestamp - self.timestamp, 1e-3)
+        F, Q = self._transition(dt)
+        self.state = F @ self.state
+        self.P = F @ self.P @ F.T + Q
+        self.timestamp = timestamp
+
+        if measurement is None:
+            # Coast: prediction only, uncertainty grows
+            self.missing += 1
+            if self.missing > self.max_missing:
+                self.reset()
+            return
+
+        residual = np.asarray(measurement, dtype=float) - self.H @ self.state
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.state = self.state + K @ residual
+        self.P = (np.eye(4) - K @ self.H) @ self.P
+        self.missing = 0
+
+    def predict(self, timestamp):
+        """Predicted (x, y) at timestamp, or None when not tracking"""
+        if not self.is_tracking():
+            return None
+        return self.state[:2] + self.state[2:] * (timestamp - self.timestamp)
+
+
+MOTION_MODELS = {
+    'alphabeta': AlphaBetaFilter,
+    'kalman': KalmanTracker,
+}
+
+
+def create_motion_model(kind, max_missing=10):
+    """Create a motion model by name ('alphabeta' or 'kalman')"""
+    if kind not in MOTION_MODELS:
+        raise ValueError(f"Unknown motion model '{kind}' (choose from: {', '.join(MOTION_MODELS)})")
+    return MOTION_MODELS[kind](max_missing=max_missing)
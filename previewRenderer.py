@@ -0,0 +1,93 @@
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+from colorLut import hsv_in_range
+
+
+class PreviewRenderer:
+    """
+    Camera / filtered / mask previews for the HSV finder windows.
+
+    Each frame is downsampled once to the display size; colour conversion
+    and thresholding then run on the small image only, into buffers that
+    are reused frame to frame. The three PhotoImages are created once and
+    updated with paste(). Nothing is recomputed unless the frame or the
+    thresholds changed, and rendering is capped at max_fps.
+    """
+
+    def __init__(self, labels, display_size=(300, 400), max_fps=30):
+        self.labels = labels  # (camera, filtered, mask) Tk labels
+        self.display_size = display_size  # (width, height) box the previews must fit in
+        self.interval = 1.0 / max_fps
+        self.last_render = 0.0
+        self.last_key = None
+        self.frames_rendered = 0
+        self.frames_skipped = 0
+
+        self.size = None
+        self.photos = None
+        self._small = self._flipped = self._hsv = self._mask = None
+        self._rgb = self._filtered = self._mask_rgb = None
+
+    @property
+    def poll_ms(self):
+        """Suggested Tk after() delay between render calls"""
+        return max(1, int(self.interval * 1000))
+
+    def _allocate(self, frame_shape):
+        height, width = frame_shape[:2]
+        box_width, box_height = self.display_size
+        scale = min(box_width / width, box_height / height, 1.0)
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        if size == self.size:
+            return
+        self.size = size
+        w, h = size
+        self._small = np.empty((h, w, 3), np.uint8)
+        self._flipped = np.empty((h, w, 3), np.uint8)
+        self._hsv = np.empty((h, w, 3), np.uint8)
+        self._mask = np.empty((h, w), np.uint8)
+        self._rgb = np.empty((h, w, 3), np.uint8)
+        self._filtered = np.empty((h, w, 3), np.uint8)
+        self._mask_rgb = np.empty((h, w, 3), np.uint8)
+
+        self.photos = [ImageTk.PhotoImage('RGB', size) for _ in self.labels]
+        for label, photo in zip(self.labels, self.photos):
+            label.config(image=photo)
+            label.image = photo  # Keep a reference so Tk does not drop it
+
+    def render(self, frame, frame_id, lower, upper, flip=None):
+        """
+        Update the previews. frame_id identifies the frame (e.g. a capture
+        counter); flip is a cv2.flip code or None.
+        Returns True if anything was redrawn.
+        """
+        now = time.monotonic()
+        if now - self.last_render < self.interval:
+            return False
+        key = (frame_id, tuple(int(v) for v in lower), tuple(int(v) for v in upper), flip)
+        if key == self.last_key:
+            self.frames_skipped += 1
+            return False
+        self.last_render = now
+        self.last_key = key
+
+        self._allocate(frame.shape)
+        small = cv2.resize(frame, self.size, dst=self._small, interpolation=cv2.INTER_AREA)
+        if flip is not None:
+            small = cv2.flip(small, flip, dst=self._flipped)
+
+        cv2.cvtColor(small, cv2.COLOR_BGR2HSV, dst=self._hsv)
+        hsv_in_range(self._hsv, key[1], key[2], dst=self._mask)
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        self._filtered.fill(0)
+        cv2.bitwise_and(self._rgb, self._rgb, dst=self._filtered, mask=self._mask)
+        cv2.cvtColor(self._mask, cv2.COLOR_GRAY2RGB, dst=self._mask_rgb)
+
+        for photo, image in zip(self.photos, (self._rgb, self._filtered, self._mask_rgb)):
+            photo.paste(Image.fromarray(image))
+        self.frames_rendered += 1
+        return True
@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+
+# Quality levels, best first. Each level keeps the degradations of the ones before it.
+#   overlay_stride: draw/show the overlay on every Nth frame (GUI only)
+#   roi_stride: ROI searches run on every Nth pixel
+#   pyramid_scale: full-frame searches run at 1/N resolution
+QUALITY_LEVELS = [
+    {'overlay_stride': 1, 'roi_stride': 1, 'pyramid_scale': 1},
+    {'overlay_stride': 2, 'roi_stride': 1, 'pyramid_scale': 1},
+    {'overlay_stride': 2, 'roi_stride': 2, 'pyramid_scale': 1},
+    {'overlay_stride': 3, 'roi_stride': 2, 'pyramid_scale': 2},
+    {'overlay_stride': 4, 'roi_stride': 2, 'pyramid_scale': 4},
+]
+
+
+class QualityGovernor:
+    """
+    Trades detection/display quality for loop latency.
+
+    Each frame reports its latency (capture to command). When the p90 of
+    the last `window` frames exceeds the deadline the governor steps one
+    quality level down; when it falls below restore_fraction of the
+    deadline it steps back up. After each change it waits `window` frames
+    so the new level is judged on its own samples.
+    """
+
+    def __init__(self, tracker, deadline=None, window=30, restore_fraction=0.6, verbose=True):
+        self.tracker = tracker
+        self.deadline = deadline or tracker.command_interval
+        self.window = window
+        self.restore_fraction = restore_fraction
+        self.verbose = verbose
+
+        self.samples = np.zeros(window)
+        self.count = 0
+        self.frame_index = 0
+        self.level = 0
+        self.adjustments = 0
+        self.last_p90 = 0.0
+        self.log = []  # (time.time(), old level, new level, p90 seconds)
+
+        # The lowest level may not go below what the user configured
+        self.base_pyramid_scale = tracker.pyramid_scale
+        self._apply()
+
+    @property
+    def settings(self):
+        return QUALITY_LEVELS[self.level]
+
+    def _apply(self):
+        settings = self.settings
+        self.tracker.pyramid_scale = max(self.base_pyramid_scale, settings['pyramid_scale'])
+        self.tracker.roi_stride = settings['roi_stride']
+
+    def set_base_pyramid_scale(self, scale):
+        """Change the user-configured pyramid scale and apply it (never below the current level's)"""
+        self.base_pyramid_scale = scale
+        self._apply()
+
+    def should_render(self):
+        """True if the overlay should be drawn and shown for the current frame"""
+        return self.frame_index % self.settings['overlay_stride'] == 0
+
+    def update(self, latency):
+        """Report one frame's latency (seconds). Returns True if the quality level changed"""
+        self.frame_index += 1
+        self.samples[self.count % self.window] = latency
+        self.count += 1
+        if self.count < self.window:
+            return False
+
+        p90 = float(np.percentile(self.samples, 90))
+        self.last_p90 = p90
+        if p90 > self.deadline and self.level < len(QUALITY_LEVELS) - 1:
+            return self._set_level(self.level + 1, p90)
+        if p90 < self.deadline * self.restore_fraction and self.level > 0:
+            return self._set_level(self.level - 1, p90)
+        return False
+
+    def _set_level(self, level, p90):
+        old = self.level
+        self.level = level
+        self.adjustments += 1
+        self.count = 0  # Judge the new level on fresh samples
+        self._apply()
+        self.log.append((time.time(), old, level, p90))
+        if self.verbose:
+            direction = 'Lowering' if level > old else 'Restoring'
+            print(f"[governor] {direction} quality {old} -> {level} "
+                  f"(p90 {p90 * 1000:.1f}ms, deadline {self.deadline * 1000:.0f}ms): {self.settings}")
+        return True
+
+    def gauges(self):
+        """Current values for metric export"""
+        return {
+            'quality_level': self.level,
+            'quality_adjustments_total': self.adjustments,
+            'loop_latency_p90_seconds': self.last_p90,
+        }
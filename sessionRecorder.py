@@ -0,0 +1,293 @@
+import argparse
+import cProfile
+import json
+import pstats
+import queue
+import struct
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# File layout:
+#   b'BLOBREC1' | uint32 metadata length | metadata JSON
+#   records: uint8 type | float64 timestamp | uint32 seq | uint32 payload length | payload
+FILE_MAGIC = b'BLOBREC1'
+RECORD_HEADER = struct.Struct('<BdII')
+
+RECORD_FRAME = 1  # payload: JPEG/PNG encoded frame
+RECORD_RESULT = 2  # payload: JSON {center, area, lead_time}
+RECORD_COMMAND = 3  # payload: JSON {speed, command, sent}
+RECORD_MASK = 4  # payload: PNG encoded mask
+
+
+class SessionRecorder:
+    """
+    Records frames, centroids and motor commands to a single file.
+
+    All encoding and disk I/O happens on a background thread. The record_*
+    calls only enqueue; if the writer falls behind, frames are dropped
+    (and counted) rather than slowing the control loop.
+    """
+
+    def __init__(self, path, jpeg_quality=85, lossless=False, record_masks=False, queue_size=64, metadata=None):
+        self.path = path
+        self.jpeg_quality = jpeg_quality
+        self.lossless = lossless
+        self.record_masks = record_masks
+
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.frames_recorded = 0
+        self.frames_dropped = 0
+        self.bytes_written = 0
+        self._seq = 0
+
+        self.file = open(path, 'wb')
+        header = dict(metadata or {})
+        header.update({'created': time.time(), 'codec': 'png' if lossless else 'jpeg'})
+        header_bytes = json.dumps(header).encode()
+        self.file.write(FILE_MAGIC + struct.pack('<I', len(header_bytes)) + header_bytes)
+
+        self._thread = threading.Thread(target=self._write_loop, name="SessionRecorder", daemon=True)
+        self._thread.start()
+
+    def record_frame(self, frame, timestamp, mask=None):
+        """
+        Queue a frame. Returns its sequence number.
+        Writable frames are copied (the caller may draw on them); read-only
+        frames from the grabber are shared as they are.
+        """
+        self._seq += 1
+        item = (RECORD_FRAME, timestamp, self._seq, frame.copy() if frame.flags.writeable else frame,
+                mask.copy() if (mask is not None and self.record_masks) else None)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            self.frames_dropped += 1
+        return self._seq
+
+    def record_result(self, seq, timestamp, center, area, lead_time=0.0):
+        """lead_time: how far ahead the motion model predicted for this frame (tracker.lead_time)"""
+        self._put_event(RECORD_RESULT, timestamp, seq, {'center': center, 'area': int(area),
+                                                        'lead_time': float(lead_time)})
+
+    def record_command(self, seq, timestamp, speed, command, sent=True):
+        self._put_event(RECORD_COMMAND, timestamp, seq, {'speed': int(speed), 'command': command, 'sent': sent})
+
+    def _put_event(self, record_type, timestamp, seq, payload):
+        try:
+            self.queue.put_nowait((record_type, timestamp, seq, payload, None))
+        except queue.Full:
+            pass
+
+    def _write_record(self, record_type, timestamp, seq, payload):
+        self.file.write(RECORD_HEADER.pack(record_type, timestamp, seq, len(payload)))
+        self.file.write(payload)
+        self.bytes_written += RECORD_HEADER.size + len(payload)
+
+    def _write_loop(self):
+        if self.lossless:
+            frame_ext, frame_params = '.png', [cv2.IMWRITE_PNG_COMPRESSION, 1]
+        else:
+            frame_ext, frame_params = '.jpg', [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality]
+
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            record_type, timestamp, seq, payload, mask = item
+
+            if record_type == RECORD_FRAME:
+                ok, encoded = cv2.imencode(frame_ext, payload, frame_params)
+                if not ok:
+                    continue
+                self._write_record(RECORD_FRAME, timestamp, seq, encoded.tobytes())
+                self.frames_recorded += 1
+                if mask is not None:
+                    ok, encoded = cv2.imencode('.png', mask)
+                    if ok:
+                        self._write_record(RECORD_MASK, timestamp, seq, encoded.tobytes())
+            else:
+                self._write_record(record_type, timestamp, seq, json.dumps(payload).encode())
+
+    def close(self):
+        """Flush pending records and close the file"""
+        self.queue.put(None)
+        self._thread.join()
+        self.file.close()
+        print(f"✓ Recorded {self.frames_recorded} frames to {self.path} "
+              f"({self.bytes_written / 1e6:.1f} MB, {self.frames_dropped} dropped)")
+
+
+def read_records(path):
+    """Yield (metadata, None, None, None) once, then (type, timestamp, seq, payload) per record"""
+    with open(path, 'rb') as f:
+        if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        (header_length,) = struct.unpack('<I', f.read(4))
+        yield json.loads(f.read(header_length)), None, None, None
+
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return
+            record_type, timestamp, seq, length = RECORD_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return  # Truncated (recording interrupted)
+            yield record_type, timestamp, seq, payload
+
+
+class ReplaySource:
+    """
+    Plays a recording back as a sequence of frames with their recorded data.
+
+    Frames are decoded up front (preload=True) so replay speed measures
+    the tracker, not the JPEG decoder. read() mimics cv2.VideoCapture.
+    """
+
+    def __init__(self, path, preload=True):
+        self.path = path
+        self.frames = []  # [(seq, timestamp, frame)]
+        self.results = {}  # seq -> {'center', 'area', 'lead_time'}
+        self.commands = {}  # seq -> {'speed', 'command', 'sent'}
+        self.masks = {}  # seq -> encoded PNG
+        self.metadata = {}
+        self._index = 0
+        self._load(preload)
+
+    def _load(self, preload):
+        records = read_records(self.path)
+        self.metadata = next(records)[0]
+        for record_type, timestamp, seq, payload in records:
+            if record_type == RECORD_FRAME:
+                data = np.frombuffer(payload, np.uint8)
+                frame = cv2.imdecode(data, cv2.IMREAD_COLOR) if preload else data
+                self.frames.append((seq, timestamp, frame))
+            elif record_type == RECORD_RESULT:
+                result = json.loads(payload)
+                if result['center'] is not None:
+                    result['center'] = tuple(result['center'])
+                self.results[seq] = result
+            elif record_type == RECORD_COMMAND:
+                self.commands[seq] = json.loads(payload)
+            elif record_type == RECORD_MASK:
+                self.masks[seq] = payload
+        self.preloaded = preload
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __iter__(self):
+        for seq, timestamp, frame in self.frames:
+            if not self.preloaded:
+                frame = cv2.imdecode(frame, cv2.IMREAD_COLOR)
+            yield seq, timestamp, frame
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self._index >= len(self.frames):
+            return False, None
+        seq, timestamp, frame = self.frames[self._index]
+        self._index += 1
+        if not self.preloaded:
+            frame = cv2.imdecode(frame, cv2.IMREAD_COLOR)
+        return True, frame.copy()
+
+    def release(self):
+        pass
+
+
+def replay(tracker, source, realtime=False):
+    """
+    Feed a recording through the tracker and compare with what was recorded.
+    Returns a dict with replay throughput and centroid/command differences.
+    """
+    processed = 0
+    center_errors = []
+    command_mismatches = 0
+    detection_mismatches = 0
+
+    start = time.perf_counter()
+    first_timestamp = None
+    for seq, timestamp, frame in source:
+        if realtime:
+            if first_timestamp is None:
+                first_timestamp = timestamp
+            delay = (timestamp - first_timestamp) - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+
+        recorded = source.results.get(seq)
+        tracker.set_frame_info(timestamp, 0)
+        center, area = tracker.track_blob(frame)
+        # Predict with the recorded lead time: live it depended on the clock and the link's RTT
+        lead_time = recorded.get('lead_time') if recorded is not None else None
+        speed, _ = tracker.calculate_motor_speed(tracker.predict_target(center, lead_time), frame.shape)
+        processed += 1
+
+        if recorded is not None:
+            if (recorded['center'] is None) != (center is None):
+                detection_mismatches += 1
+            elif center is not None:
+                center_errors.append(np.hypot(center[0] - recorded['center'][0], center[1] - recorded['center'][1]))
+        recorded_command = source.commands.get(seq)
+        if recorded_command is not None and recorded_command['speed'] != speed:
+            command_mismatches += 1
+
+    elapsed = time.perf_counter() - start
+    duration = source.frames[-1][1] - source.frames[0][1] if len(source.frames) > 1 else 0.0
+    return {
+        'frames': processed,
+        'fps': processed / elapsed if elapsed > 0 else 0.0,
+        'speedup': duration / elapsed if elapsed > 0 else 0.0,
+        'detection_mismatches': detection_mismatches,
+        'command_mismatches': command_mismatches,
+        'mean_center_error': float(np.mean(center_errors)) if center_errors else 0.0,
+        'max_center_error': float(np.max(center_errors)) if center_errors else 0.0,
+    }
+
+
+def main():
+    from blobDetection import AutonomousBlobTracker
+
+    parser = argparse.ArgumentParser(description='Replay a recorded tracking session through AutonomousBlobTracker')
+    parser.add_argument('recording', help='Session file written with --record')
+    parser.add_argument('--realtime', action='store_true', help='Replay at the recorded pace')
+    parser.add_argument('--no-roi', action='store_true', help='Disable ROI tracking for the replay')
+    parser.add_argument('--pyramid', type=int, default=1, help='Pyramid scale for the replay (1, 2 or 4)')
+    parser.add_argument('--classifier', default='hsv', choices=['hsv', 'lut'])
+    parser.add_argument('--profile', action='store_true', help='Print the top functions by cumulative time')
+    args = parser.parse_args()
+
+    source = ReplaySource(args.recording)
+    print(f"Loaded {len(source)} frames from {args.recording}")
+
+    tracker = AutonomousBlobTracker(connect=False)
+    # Recorded thresholds, area limits and dead zone, so replay makes the same decisions
+    tracker.apply_settings(source.metadata.get('settings', {}))
+    predict = source.metadata.get('predict', 'none')
+    tracker.set_motion_model(None if predict == 'none' else predict)
+    tracker.roi_tracking = not args.no_roi
+    tracker.pyramid_scale = args.pyramid
+    tracker.color_classifier = args.classifier
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler:
+        profiler.enable()
+    result = replay(tracker, source, args.realtime)
+    if profiler:
+        profiler.disable()
+
+    print(f"Replayed {result['frames']} frames at {result['fps']:.0f} fps ({result['speedup']:.1f}x real time)")
+    print(f"Detection mismatches: {result['detection_mismatches']}, command mismatches: {result['command_mismatches']}")
+    print(f"Centroid difference: mean {result['mean_center_error']:.2f}px, max {result['max_center_error']:.2f}px")
+    if profiler:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(15)
+
+
+if __name__ == "__main__":
+    main()
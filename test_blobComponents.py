@@ -0,0 +1,26 @@
+import numpy as np
+
+from blobComponents import find_blobs
+from detectionContext import DetectionContext
+
+
+def checkerboard(size):
+    """Every other pixel of every other row set: the most 8-connected components a mask can hold"""
+    mask = np.zeros((size, size), np.uint8)
+    mask[::2, ::2] = 255
+    return mask
+
+
+def test_many_components_do_not_overflow_16bit_labels():
+    # 256 * 256 = 65536 isolated pixels in a 511 x 511 box (261,121 pixels)
+    mask = checkerboard(511)
+    blobs = find_blobs(mask)
+    assert len(blobs) == 256 * 256
+    assert all(blob.area == 1 for blob in blobs)
+
+
+def test_many_components_with_context():
+    mask = checkerboard(511)
+    blobs = find_blobs(mask, context=DetectionContext())
+    assert len(blobs) == 256 * 256
+
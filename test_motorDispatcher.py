@@ -0,0 +1,68 @@
+import time
+
+from motorDispatcher import MotorCommandDispatcher
+
+
+class FailingTransport:
+    """Transport whose receiver never answers"""
+
+    def __init__(self):
+        self.attempts = 0
+
+    def send(self, speed_a, speed_b):
+        self.attempts += 1
+        return False
+
+    def close(self):
+        pass
+
+
+class RecoveringTransport(FailingTransport):
+    """Fails the first `failures` sends, then succeeds"""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.sent = []
+
+    def send(self, speed_a, speed_b):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            return False
+        self.sent.append(speed_a)
+        return True
+
+
+def test_failed_sends_back_off():
+    transport = FailingTransport()
+    dispatcher = MotorCommandDispatcher("test", heartbeat_interval=0.2, transport=transport).start()
+    dispatcher.submit(200)
+    time.sleep(1.0)
+    dispatcher.stop(send_stop=False)
+
+    # 20, 40, 80, 160ms then every heartbeat_interval: about 8 attempts in a second
+    assert 3 <= transport.attempts <= 12
+    assert dispatcher.get_stats()['failed'] == transport.attempts
+
+
+def test_submit_does_not_bypass_backoff():
+    transport = FailingTransport()
+    dispatcher = MotorCommandDispatcher("test", heartbeat_interval=0.2, transport=transport).start()
+    deadline = time.monotonic() + 0.5
+    while time.monotonic() < deadline:
+        dispatcher.submit(200)
+        time.sleep(0.001)
+    dispatcher.stop(send_stop=False)
+
+    assert transport.attempts <= 8
+
+
+def test_retry_succeeds_after_failures():
+    transport = RecoveringTransport(failures=2)
+    dispatcher = MotorCommandDispatcher("test", heartbeat_interval=0.2, transport=transport).start()
+    dispatcher.submit(150)
+    time.sleep(0.15)
+    dispatcher.stop(send_stop=False)
+
+    assert transport.sent[:1] == [150]
+    assert dispatcher.get_stats()['sent'] >= 1
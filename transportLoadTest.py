@@ -0,0 +1,90 @@
+import argparse
+import time
+
+import numpy as np
+
+from esp32Emulator import ESP32Emulator
+from motorTransport import HttpTransport, UdpTransport
+
+
+def run_load_test(transport, rate, duration):
+    """
+    Send alternating speeds at a fixed rate (commands/sec) for duration seconds.
+    Returns a dict with throughput, failures and latency percentiles (ms).
+    """
+    interval = 1.0 / rate if rate > 0 else 0.0
+    latencies = []
+    failures = 0
+    sent = 0
+
+    start = time.monotonic()
+    next_send = start
+    while time.monotonic() - start < duration:
+        speed = 200 if sent % 2 == 0 else -200
+        t0 = time.monotonic()
+        if transport.send(speed, speed):
+            latencies.append(time.monotonic() - t0)
+        else:
+            failures += 1
+        sent += 1
+
+        if interval:
+            next_send += interval
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+    elapsed = time.monotonic() - start
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'sent': sent,
+        'failed': failures,
+        'rate': sent / elapsed,
+        'p50': float(np.percentile(latencies_ms, 50)),
+        'p95': float(np.percentile(latencies_ms, 95)),
+        'p99': float(np.percentile(latencies_ms, 99)),
+        'max': float(latencies_ms.max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test HTTP vs UDP motor transports')
+    parser.add_argument('--target', default=None,
+                        help='ESP32 address (host[:http_port]); default starts a local emulator')
+    parser.add_argument('--udp-port', type=int, default=4210)
+    parser.add_argument('--rate', type=float, default=0, help='Commands per second (0 = as fast as possible)')
+    parser.add_argument('--duration', type=float, default=3.0, help='Seconds per transport')
+    args = parser.parse_args()
+
+    emulator = None
+    target = args.target
+    udp_port = args.udp_port
+    if target is None:
+        emulator = ESP32Emulator(http_port=0, udp_port=0).start()
+        target = f"127.0.0.1:{emulator.http_port}"
+        udp_port = emulator.udp_port
+        print(f"✓ Started local ESP32 emulator at {target} (UDP {udp_port})")
+
+    transports = [
+        HttpTransport(target),
+        UdpTransport(target, port=udp_port, wait_ack=True),
+    ]
+
+    print("=" * 60)
+    print(f"{'Transport':<10}{'Sent':>8}{'Failed':>8}{'Cmd/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    print("=" * 60)
+    try:
+        for transport in transports:
+            result = run_load_test(transport, args.rate, args.duration)
+            print(f"{transport.name:<10}{result['sent']:>8}{result['failed']:>8}{result['rate']:>10.0f}"
+                  f"{result['p50']:>9.2f}{result['p95']:>9.2f}{result['p99']:>9.2f}")
+            transport.send(0, 0)
+            transport.close()
+    finally:
+        if emulator is not None:
+            print(f"\nEmulator counters: {emulator.get_stats()}")
+            emulator.stop()
+
+
+if __name__ == "__main__":
+    main()